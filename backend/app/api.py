@@ -1,9 +1,33 @@
-import json
-from fastapi import FastAPI
-
-from app import crud, models, schemas
+import math
+import time
+from contextlib import aclosing, asynccontextmanager
+from typing import (
+    Annotated,
+    Any,
+    AsyncGenerator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+from fastapi import Depends, FastAPI, HTTPException, Query, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import async_crud, batch, metrics, models, schemas, tokens
+from app.ratelimit import Rejected, login_limiter
+from app.config import BATCH_MAX_IDS
 from app.constants import StatusCode
-from app.db import get_db
+from app.db import (
+    async_engine,
+    get_async_db,
+    get_async_read_db,
+    replica_router,
+)
+from app.executor import shutdown_executors
+from app.logger import log_response, setup_logging
+from app.responses import FastJSONResponse, encode
 
 paths = {
         "user": [
@@ -15,7 +39,137 @@ paths = {
         "message": "",
         }
 
-app = FastAPI()
+
+# unix time of the client's last commit, keeps its reads on the primary while the
+# replicas catch up. a cookie rather than server state, so every worker process sees
+# it and clients behind one address don't share it; clients that drop cookies may
+# not see their own writes for up to REPLICA_MAX_LAG_SECONDS
+WROTE_AT_COOKIE = "wrote_at"
+
+
+def client_address(request: Request) -> Optional[str]:
+    return request.client.host if request.client else None
+
+
+def wrote_at(request: Request) -> Optional[float]:
+    try:
+        return float(request.cookies[WROTE_AT_COOKIE])
+    except (KeyError, ValueError):
+        return None
+
+
+async def primary_db(request: Request) -> AsyncGenerator[AsyncSession]:
+    def committed():
+        request.state.wrote_at = time.time()
+
+    async with aclosing(get_async_db(committed)) as sessions:
+        async for session in sessions:
+            yield session
+
+
+async def read_db(request: Request) -> AsyncGenerator[AsyncSession]:
+    async with aclosing(get_async_read_db(wrote_at(request))) as sessions:
+        async for session in sessions:
+            yield session
+
+
+async def users_db(request: Request) -> AsyncGenerator[AsyncSession]:
+    # GET /users: batch reads are read-only, password checks may rehash and commit
+    db = read_db if "ids" in request.query_params else primary_db
+    async with aclosing(db(request)) as sessions:
+        async for session in sessions:
+            yield session
+
+
+# one session per request, closed by fastapi once the response is sent. writes and
+# reads that may write (logins rehash) use the primary; read-only endpoints take a
+# ReadDBSession, on a replica when DATABASE_REPLICA_URLS is set
+DBSession = Annotated[AsyncSession, Depends(primary_db)]
+ReadDBSession = Annotated[AsyncSession, Depends(read_db)]
+UsersDBSession = Annotated[AsyncSession, Depends(users_db)]
+# comma separated ids for batch reads, e.g. ?ids=1,2,3
+BatchIds = Annotated[
+    Optional[str], Query(pattern=rf"^\d+(,\d+){{0,{BATCH_MAX_IDS - 1}}}$")
+]
+
+
+def parse_ids(ids: BatchIds = None) -> Optional[List[int]]:
+    if ids is None:
+        return None
+    return [int(id_) for id_ in ids.split(",")]
+
+
+BatchIdList = Annotated[Optional[List[int]], Depends(parse_ids)]
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def require_token(
+    credentials: Annotated[Optional[HTTPAuthorizationCredentials], Depends(bearer)],
+) -> schemas.TokenClaims:
+    # signature, expiry and revocation only: no bcrypt, no database
+    claims = credentials and tokens.decode_token(credentials.credentials)
+    if not claims:
+        raise HTTPException(
+            401, "invalid or expired token", headers={"WWW-Authenticate": "Bearer"}
+        )
+    return claims
+
+
+TokenClaims = Annotated[schemas.TokenClaims, Depends(require_token)]
+
+
+def respond(route: str, content: Any) -> FastJSONResponse:
+    # encoded once; the same bytes are logged and sent
+    body = encode(content)
+    log_response(route, body)
+    return FastJSONResponse(body)
+
+
+def batch_response(
+    ids: List[int], results: Sequence[Tuple[Optional[Any], StatusCode]]
+) -> List[Any]:
+    # same shape as the single reads, missing ids keep their status code
+    return [
+        result if result else {"id": id_, "status_code": status_code}
+        for id_, (result, status_code) in zip(ids, results)
+    ]
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_executors()
+    await async_engine.dispose()
+    await replica_router.dispose()
+
+
+setup_logging()
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+
+@app.middleware("http")
+async def pin_reads_after_write(request: Request, call_next):
+    response = await call_next(request)
+    committed = getattr(request.state, "wrote_at", None)
+    if committed is not None and replica_router.replicas:
+        response.set_cookie(
+            WROTE_AT_COOKIE,
+            f"{committed:.3f}",
+            max_age=math.ceil(replica_router.max_lag),
+            httponly=True,
+            samesite="lax",
+        )
+    return response
+
+
+@app.exception_handler(Rejected)
+async def rejected(request: Request, exc: Rejected):
+    return FastJSONResponse(
+        {"detail": exc.reason},
+        status_code=429,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
 
 @app.get("/")
 async def root():
@@ -25,207 +179,220 @@ async def root():
             }
 
 
+@app.get("/internal/metrics")
+async def get_metrics():
+    return metrics.snapshot()
+
+
 # ---- users ----
 @app.get("/users")
-async def verify_user(username: str, password: str):
-    db = next(get_db())
-    result = crud.verify_user_account(db, username, password)
-    print(json.dumps({"verified": result}, indent=4))
-    return {"verified": result}
+async def verify_user(
+    request: Request,
+    db: UsersDBSession,
+    user_ids: BatchIdList,
+    username: Optional[str] = None,
+    password: Optional[str] = None,
+):
+    if user_ids is not None:
+        if username is not None or password is not None:
+            raise HTTPException(422, "ids can't be combined with username or password")
+        results = await async_crud.get_users_many(db, user_ids)
+        return respond("get_users_many", batch_response(user_ids, results))
+    if username is None or password is None:
+        raise HTTPException(422, "username and password are required")
+    with login_limiter.admit(username, client_address(request)):
+        result = await async_crud.verify_user_account(db, username, password)
+    return respond("verify_user", {"verified": result})
+
+@app.post("/login")
+async def login(request: Request, credentials: schemas.UserLogin, db: DBSession):
+    with login_limiter.admit(credentials.username, client_address(request)):
+        user = await async_crud.authenticate_user(
+            db, credentials.username, credentials.password
+        )
+    if user is None:
+        raise HTTPException(
+            401, "wrong username or password", headers={"WWW-Authenticate": "Bearer"}
+        )
+    token = tokens.issue_token(user.id, user.role)
+    # the token itself stays out of the logs
+    log_response("login", {"user_id": user.id, "expires_at": token.expires_at})
+    return FastJSONResponse(encode(token))
+
+@app.post("/logout")
+async def logout(claims: TokenClaims):
+    tokens.revoke_token(claims)
+    return respond("logout", {"status_code": StatusCode.SUCCESS})
+
+@app.get("/users/me")
+async def get_current_user(claims: TokenClaims, db: ReadDBSession):
+    result, status_code = await async_crud.get_user_good(db, claims.sub)
+    if not result:
+        return respond("get_current_user", {"status_code": status_code})
+    return respond("get_current_user", result)
 
 @app.get("/users/{user_id}")
-async def get_user_good(user_id: int):
-    db = next(get_db())
-    result, status_code = crud.get_user_good(db, user_id)
+async def get_user_good(user_id: int, db: ReadDBSession):
+    result, status_code = await async_crud.get_user_good(db, user_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    user_out = result.model_dump(mode="json")
-    print(json.dumps(user_out, indent=4))
-    return result
+        return respond("get_user_good", {"status_code": status_code})
+    return respond("get_user_good", result)
 
 @app.post("/users")
-async def create_user(user: schemas.UserCreate):
-    db = next(get_db())
-    result, status_code = crud.create_user(db, user)
+async def create_user(user: schemas.UserCreate, db: DBSession):
+    result, status_code = await async_crud.create_user(db, user)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    user_out = result.as_dict()
-    user_out.update({"role" : user_out["role"].value})
-    print(json.dumps(user_out, indent=4))
-    return user_out
+        return respond("create_user", {"status_code": status_code})
+    return respond("create_user", result)
 
 @app.patch("/users/{user_id}")
-async def update_user(user_id: int, user: schemas.UserUpdate):
-    db = next(get_db())
-    result, status_code = crud.update_user(db, user_id, user)
+async def update_user(user_id: int, user: schemas.UserUpdate, db: DBSession):
+    result, status_code = await async_crud.update_user(db, user_id, user)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    user_out = result.as_dict()
-    user_out.update({"role" : user_out["role"].value})
-    print(json.dumps(user_out, indent=4))
-    return user_out
+        return respond("update_user", {"status_code": status_code})
+    return respond("update_user", result)
 
 @app.delete("/users/{user_id}")
-async def delete_user(user_id: int):
-    db = next(get_db())
-    result, status_code = crud.delete_user(db, user_id)
+async def delete_user(user_id: int, db: DBSession):
+    result, status_code = await async_crud.delete_user(db, user_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    user_out = result.as_dict()
-    user_out.update({"role" : user_out["role"].value})
-    print(json.dumps(user_out, indent=4))
-    return user_out
+        return respond("delete_user", {"status_code": status_code})
+    return respond("delete_user", result)
 
 
 # ---- tickets ----
+@app.get("/tickets")
+async def list_tickets(
+    request: Request,
+    query: Annotated[schemas.TicketQuery, Query()],
+    db: ReadDBSession,
+    ticket_ids: BatchIdList,
+):
+    if ticket_ids is not None:
+        if request.query_params.keys() & schemas.TicketQuery.model_fields.keys():
+            raise HTTPException(422, "ids can't be combined with listing parameters")
+        results = await async_crud.get_tickets_many(db, ticket_ids)
+        return respond("get_tickets_many", batch_response(ticket_ids, results))
+    result, status_code = await async_crud.list_tickets(db, query)
+    if not result:
+        return respond("list_tickets", {"status_code": status_code})
+    return respond("list_tickets", result)
+
 @app.get("/tickets/{ticket_id}")
-async def get_ticket_good(ticket_id: int):
-    db = next(get_db())
-    result, status_code = crud.get_ticket_good(db, ticket_id)
+async def get_ticket_good(ticket_id: int, db: ReadDBSession):
+    result, status_code = await async_crud.get_ticket_good(db, ticket_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    ticket_out = result.model_dump(mode="json")
-    print(json.dumps(ticket_out, indent=4))
-    return result
+        return respond("get_ticket_good", {"status_code": status_code})
+    return respond("get_ticket_good", result)
 
 @app.post("/tickets")
-async def create_ticket(ticket: schemas.TicketCreate):
-    db = next(get_db())
-    result, status_code = crud.create_ticket(db, ticket)
-    if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    ticket_out = result.as_dict()
-    ticket_out.update({"status" : ticket_out["status"].value})
-    if result.category:
-        ticket_out.update({"category" : ticket_out["category"].value})
-    print(json.dumps(ticket_out, indent=4))
-    return ticket_out
+async def create_ticket(ticket: schemas.TicketCreate, db: DBSession):
+    result, status_code = await async_crud.create_ticket(db, ticket)
+    if not result:
+        return respond("create_ticket", {"status_code": status_code})
+    return respond("create_ticket", result)
 
 @app.patch("/tickets/{ticket_id}")
-async def update_ticket(ticket_id: int, ticket: schemas.TicketUpdate):
-    db = next(get_db())
-    result, status_code = crud.update_ticket(db, ticket_id, ticket)
-    if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    ticket_out = result.as_dict()
-    ticket_out.update({"status" : ticket_out["status"].value})
-    if result.category:
-        ticket_out.update({"category" : ticket_out["category"].value})
-    print(json.dumps(ticket_out, indent=4))
-    return ticket_out
+async def update_ticket(ticket_id: int, ticket: schemas.TicketUpdate, db: DBSession):
+    result, status_code = await async_crud.update_ticket(db, ticket_id, ticket)
+    if not result:
+        return respond("update_ticket", {"status_code": status_code})
+    return respond("update_ticket", result)
 
 @app.delete("/tickets/{ticket_id}")
-async def delete_ticket(ticket_id: int):
-    db = next(get_db())
-    result, status_code = crud.delete_ticket(db, ticket_id)
+async def delete_ticket(ticket_id: int, db: DBSession):
+    result, status_code = await async_crud.delete_ticket(db, ticket_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    ticket_out = result.as_dict()
-    ticket_out.update({"status" : ticket_out["status"].value})
-    if result.category:
-        ticket_out.update({"category" : ticket_out["category"].value})
-    print(json.dumps(ticket_out, indent=4))
-    return ticket_out
+        return respond("delete_ticket", {"status_code": status_code})
+    return respond("delete_ticket", result)
 
 
 # ---- attachments ----
+@app.get("/attachments")
+async def get_attachments_many(ids: BatchIds, db: ReadDBSession):
+    attachment_ids = parse_ids(ids)
+    results = await async_crud.get_attachments_many(db, attachment_ids)
+    return respond("get_attachments_many", batch_response(attachment_ids, results))
+
 @app.get("/attachments/{attachment_id}")
-async def get_attachment_good(attachment_id: int):
-    db = next(get_db())
-    result, status_code = crud.get_attachment_good(db, attachment_id)
+async def get_attachment_good(attachment_id: int, db: ReadDBSession):
+    result, status_code = await async_crud.get_attachment_good(db, attachment_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    attachment_out = result.model_dump(mode="json")
-    print(json.dumps(attachment_out, indent=4))
-    return result
+        return respond("get_attachment_good", {"status_code": status_code})
+    return respond("get_attachment_good", result)
 
 @app.post("/attachments")
-async def create_attachment(attachment: schemas.AttachmentCreate):
-    db = next(get_db())
-    result, status_code = crud.create_attachment(db, attachment)
+async def create_attachment(attachment: schemas.AttachmentCreate, db: DBSession):
+    result, status_code = await async_crud.create_attachment(db, attachment)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    attachment_out = result.as_dict()
-    print(json.dumps(attachment_out, indent=4))
-    return attachment_out
+        return respond("create_attachment", {"status_code": status_code})
+    return respond("create_attachment", result)
 
 @app.patch("/attachments/{attachment_id}")
-async def update_attachment(attachment_id: int, attachment: schemas.AttachmentUpdate):
-    db = next(get_db())
-    result, status_code = crud.update_attachment(db, attachment_id, attachment)
+async def update_attachment(
+    attachment_id: int, attachment: schemas.AttachmentUpdate, db: DBSession
+):
+    result, status_code = await async_crud.update_attachment(
+        db, attachment_id, attachment
+    )
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    attachment_out = result.as_dict()
-    print(json.dumps(attachment_out, indent=4))
-    return attachment_out
+        return respond("update_attachment", {"status_code": status_code})
+    return respond("update_attachment", result)
 
 @app.delete("/attachments/{attachment_id}")
-async def delete_attachment(attachment_id: int):
-    db = next(get_db())
-    result, status_code = crud.delete_attachment(db, attachment_id)
+async def delete_attachment(attachment_id: int, db: DBSession):
+    result, status_code = await async_crud.delete_attachment(db, attachment_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    attachment_out = result.as_dict()
-    print(json.dumps(attachment_out, indent=4))
-    return attachment_out
+        return respond("delete_attachment", {"status_code": status_code})
+    return respond("delete_attachment", result)
 
 
 # ---- messages ----
+@app.get("/messages")
+async def get_messages_many(ids: BatchIds, db: ReadDBSession):
+    message_ids = parse_ids(ids)
+    results = await async_crud.get_messages_many(db, message_ids)
+    return respond("get_messages_many", batch_response(message_ids, results))
+
 @app.get("/messages/{message_id}")
-async def get_message_good(message_id: int):
-    db = next(get_db())
-    result, status_code = crud.get_message_good(db, message_id)
+async def get_message_good(message_id: int, db: ReadDBSession):
+    result, status_code = await async_crud.get_message_good(db, message_id)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    message_out = result.model_dump(mode="json")
-    print(json.dumps(message_out, indent=4))
-    return result
+        return respond("get_message_good", {"status_code": status_code})
+    return respond("get_message_good", result)
 
 @app.post("/messages")
-async def create_message(message: schemas.MessageCreate):
-    db = next(get_db())
-    result, status_code = crud.create_message(db, message)
+async def create_message(message: schemas.MessageCreate, db: DBSession):
+    result, status_code = await async_crud.create_message(db, message)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    message_out = result.as_dict()
-    print(json.dumps(message_out, indent=4))
-    return message_out
+        return respond("create_message", {"status_code": status_code})
+    return respond("create_message", result)
 
 @app.patch("/messages/{message_id}")
-async def update_message(message_id: int, message: schemas.MessageUpdate):
-    db = next(get_db())
-    result, status_code = crud.update_message(db, message_id, message)
+async def update_message(
+    message_id: int, message: schemas.MessageUpdate, db: DBSession
+):
+    result, status_code = await async_crud.update_message(db, message_id, message)
     if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    message_out = result.as_dict()
-    print(json.dumps(message_out, indent=4))
-    return message_out
+        return respond("update_message", {"status_code": status_code})
+    return respond("update_message", result)
 
 @app.delete("/messages/{message_id}")
-async def delete_message(message_id: int):
-    db = next(get_db())
-    result, status_code = crud.delete_message(db, message_id)
-    if not result:
-        print(json.dumps({"status_code": status_code.value}, indent=4))
-        return {"status_code": status_code}
-    message_out = result.as_dict()
-    print(json.dumps(message_out, indent=4))
-    return message_out
+async def delete_message(message_id: int, db: DBSession):
+    result, status_code = await async_crud.delete_message(db, message_id)
+    if not result:
+        return respond("delete_message", {"status_code": status_code})
+    return respond("delete_message", result)
+
+
+# ---- batch writes ----
+@app.post("/batch")
+async def batch_write(request: schemas.BatchRequest, db: DBSession):
+    try:
+        result = await batch.apply(db, request.operations)
+    except batch.InvalidOperation as exc:
+        raise RequestValidationError(exc.errors)
+    return respond("batch_write", result)
 
 
 
@@ -0,0 +1,231 @@
+from sqlalchemy import inspect, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+from typing import Callable, List, Optional, Tuple, TypeVar
+
+from app.constants import StatusCode
+from app import crud, models, schemas, security
+from app.crud import validated
+from app.executor import run_hash
+
+# async twin of app.crud: same functions and results, awaited on an AsyncSession.
+# queries without password hashing reuse the sync crud code through run_sync,
+# which drives the async driver from a greenlet instead of a worker thread.
+
+T = TypeVar("T", bound=models.TableModels)
+
+
+def _loaded(
+    session: Session, func: Callable[..., Tuple[Optional[T], StatusCode]], *args
+) -> Tuple[Optional[T], StatusCode]:
+    # writes commit, which expires the row; lazy loads are not possible on an
+    # AsyncSession, so reload it while still inside the greenlet
+    result, status_code = func(session, *args)
+    if result is not None and inspect(result).persistent:
+        session.refresh(result)
+    return result, status_code
+
+
+# users
+@validated
+async def authenticate_user(
+    db: AsyncSession, username: str, password: str
+) -> Optional[models.User]:
+    user = await db.scalar(select(models.User).where(crud.username_is(username)))
+    if user is None:
+        return None
+    if not await run_hash(security.verify_password, password, user.hashed_password):
+        return None
+    if security.needs_rehash(user.hashed_password):
+        user.hashed_password = await run_hash(security.hash_password, password)
+        await db.commit()
+        await db.refresh(user)
+    return user
+
+
+@validated
+async def verify_user_account(db: AsyncSession, username: str, password: str) -> bool:
+    return await authenticate_user(db, username, password) is not None
+
+
+@validated
+async def verify_user_id(db: AsyncSession, user_id: int) -> bool:
+    return await db.run_sync(crud.verify_user_id, user_id)
+
+
+@validated
+async def get_user_good(
+    db: AsyncSession, user_id: int
+) -> Tuple[Optional[schemas.UserOut], StatusCode]:
+    return await db.run_sync(crud.get_user_good, user_id)
+
+
+@validated
+async def get_users_many(
+    db: AsyncSession, user_ids: List[int]
+) -> List[Tuple[Optional[schemas.UserOut], StatusCode]]:
+    return await db.run_sync(crud.get_users_many, user_ids)
+
+
+@validated
+async def create_user(
+    db: AsyncSession, user: schemas.UserCreate
+) -> Tuple[Optional[models.User], StatusCode]:
+    # taken usernames and emails are caught by their unique indexes
+    user_dict = user.model_dump(exclude={"password"})
+    user_dict["hashed_password"] = await run_hash(
+        security.hash_password, user.password
+    )
+    new_user = models.User(**user_dict)
+    db.add(new_user)
+    status_code = await db.run_sync(crud.commit_unique)
+    if status_code is not StatusCode.SUCCESS:
+        return None, status_code
+    await db.refresh(new_user)
+    return new_user, StatusCode.SUCCESS
+
+
+@validated
+async def update_user(
+    db: AsyncSession, user_id: int, updated_user: schemas.UserUpdate
+) -> Tuple[Optional[models.User], StatusCode]:
+    return await db.run_sync(_loaded, crud.update_user, user_id, updated_user)
+
+
+@validated
+async def delete_user(
+    db: AsyncSession, user_id: int
+) -> Tuple[Optional[models.User], StatusCode]:
+    return await db.run_sync(crud.delete_user, user_id)
+
+
+# tickets
+@validated
+async def verify_ticket_id(db: AsyncSession, ticket_id: int) -> bool:
+    return await db.run_sync(crud.verify_ticket_id, ticket_id)
+
+
+@validated
+async def get_ticket_good(
+    db: AsyncSession, ticket_id: int
+) -> Tuple[Optional[schemas.TicketOut], StatusCode]:
+    return await db.run_sync(crud.get_ticket_good, ticket_id)
+
+
+@validated
+async def get_tickets_many(
+    db: AsyncSession, ticket_ids: List[int]
+) -> List[Tuple[Optional[schemas.TicketOut], StatusCode]]:
+    return await db.run_sync(crud.get_tickets_many, ticket_ids)
+
+
+@validated
+async def create_ticket(
+    db: AsyncSession, ticket: schemas.TicketCreate
+) -> Tuple[Optional[models.Ticket], StatusCode]:
+    return await db.run_sync(_loaded, crud.create_ticket, ticket)
+
+
+@validated
+async def update_ticket(
+    db: AsyncSession, ticket_id: int, updated_ticket: schemas.TicketUpdate
+) -> Tuple[Optional[models.Ticket], StatusCode]:
+    return await db.run_sync(_loaded, crud.update_ticket, ticket_id, updated_ticket)
+
+
+@validated
+async def delete_ticket(
+    db: AsyncSession, ticket_id: int
+) -> Tuple[Optional[models.Ticket], StatusCode]:
+    return await db.run_sync(crud.delete_ticket, ticket_id)
+
+
+@validated
+async def list_tickets(
+    db: AsyncSession, query: schemas.TicketQuery
+) -> Tuple[Optional[schemas.TicketPage], StatusCode]:
+    return await db.run_sync(crud.list_tickets, query)
+
+
+# attachments
+@validated
+async def verify_attachment_id(db: AsyncSession, attachment_id: int) -> bool:
+    return await db.run_sync(crud.verify_attachment_id, attachment_id)
+
+
+@validated
+async def get_attachment_good(
+    db: AsyncSession, attachment_id: int
+) -> Tuple[Optional[schemas.AttachmentOut], StatusCode]:
+    return await db.run_sync(crud.get_attachment_good, attachment_id)
+
+
+@validated
+async def get_attachments_many(
+    db: AsyncSession, attachment_ids: List[int]
+) -> List[Tuple[Optional[schemas.AttachmentOut], StatusCode]]:
+    return await db.run_sync(crud.get_attachments_many, attachment_ids)
+
+
+@validated
+async def create_attachment(
+    db: AsyncSession, attachment: schemas.AttachmentCreate
+) -> Tuple[Optional[models.Attachment], StatusCode]:
+    return await db.run_sync(_loaded, crud.create_attachment, attachment)
+
+
+@validated
+async def update_attachment(
+    db: AsyncSession, attachment_id: int, updated_attachment: schemas.AttachmentUpdate
+) -> Tuple[Optional[models.Attachment], StatusCode]:
+    return await db.run_sync(
+        _loaded, crud.update_attachment, attachment_id, updated_attachment
+    )
+
+
+@validated
+async def delete_attachment(
+    db: AsyncSession, attachment_id: int
+) -> Tuple[Optional[models.Attachment], StatusCode]:
+    return await db.run_sync(crud.delete_attachment, attachment_id)
+
+
+# messages
+@validated
+async def verify_message_id(db: AsyncSession, message_id: int) -> bool:
+    return await db.run_sync(crud.verify_message_id, message_id)
+
+
+@validated
+async def get_message_good(
+    db: AsyncSession, message_id: int
+) -> Tuple[Optional[schemas.MessageOut], StatusCode]:
+    return await db.run_sync(crud.get_message_good, message_id)
+
+
+@validated
+async def get_messages_many(
+    db: AsyncSession, message_ids: List[int]
+) -> List[Tuple[Optional[schemas.MessageOut], StatusCode]]:
+    return await db.run_sync(crud.get_messages_many, message_ids)
+
+
+@validated
+async def create_message(
+    db: AsyncSession, message: schemas.MessageCreate
+) -> Tuple[Optional[models.Message], StatusCode]:
+    return await db.run_sync(_loaded, crud.create_message, message)
+
+
+@validated
+async def update_message(
+    db: AsyncSession, message_id: int, updated_message: schemas.MessageUpdate
+) -> Tuple[Optional[models.Message], StatusCode]:
+    return await db.run_sync(_loaded, crud.update_message, message_id, updated_message)
+
+
+@validated
+async def delete_message(
+    db: AsyncSession, message_id: int
+) -> Tuple[Optional[models.Message], StatusCode]:
+    return await db.run_sync(crud.delete_message, message_id)
@@ -0,0 +1,89 @@
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type
+
+from pydantic import BaseModel, ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app import async_crud, schemas
+from app.constants import StatusCode, TableName
+
+# POST /batch: an ordered list of writes applied as one unit of work. crud only
+# flushes while db.info["unit_of_work"] is set, the batch commits once at the end
+# or rolls everything back at the first operation that fails.
+
+OPERATIONS: Dict[Tuple[TableName, str], Tuple[Optional[Type[BaseModel]], Callable]] = {
+    (TableName.USERS, "create"): (schemas.UserCreate, async_crud.create_user),
+    (TableName.USERS, "update"): (schemas.UserUpdate, async_crud.update_user),
+    (TableName.USERS, "delete"): (None, async_crud.delete_user),
+    (TableName.TICKETS, "create"): (schemas.TicketCreate, async_crud.create_ticket),
+    (TableName.TICKETS, "update"): (schemas.TicketUpdate, async_crud.update_ticket),
+    (TableName.TICKETS, "delete"): (None, async_crud.delete_ticket),
+    (TableName.ATTACHMENTS, "create"): (
+        schemas.AttachmentCreate,
+        async_crud.create_attachment,
+    ),
+    (TableName.ATTACHMENTS, "update"): (
+        schemas.AttachmentUpdate,
+        async_crud.update_attachment,
+    ),
+    (TableName.ATTACHMENTS, "delete"): (None, async_crud.delete_attachment),
+    (TableName.MESSAGES, "create"): (schemas.MessageCreate, async_crud.create_message),
+    (TableName.MESSAGES, "update"): (schemas.MessageUpdate, async_crud.update_message),
+    (TableName.MESSAGES, "delete"): (None, async_crud.delete_message),
+}
+
+
+class InvalidOperation(Exception):
+    # an operation's data doesn't fit its resource, nothing was written
+    def __init__(self, index: int, error: ValidationError):
+        self.errors = [
+            {**detail, "loc": ("body", "operations", index, "data", *detail["loc"])}
+            for detail in error.errors()
+        ]
+
+
+def _resolve(value: Any, ids: List[int]) -> Any:
+    return ids[value.ref] if isinstance(value, schemas.BatchRef) else value
+
+
+async def _apply(
+    db: AsyncSession, index: int, operation: schemas.BatchOperation, ids: List[int]
+) -> Tuple[Optional[Any], StatusCode]:
+    schema, func = OPERATIONS[operation.resource, operation.op]
+    args = []
+    if operation.id is not None:
+        args.append(_resolve(operation.id, ids))
+    if schema is not None:
+        data = {key: _resolve(val, ids) for key, val in operation.data.items()}
+        try:
+            args.append(schema.model_validate(data))
+        except ValidationError as error:
+            raise InvalidOperation(index, error)
+    return await func(db, *args)
+
+
+async def apply(
+    db: AsyncSession, operations: List[schemas.BatchOperation]
+) -> Dict[str, Any]:
+    # results of the operations run so far; a failed batch reports the operation
+    # that failed last and drops the rows rolled back with it
+    results: List[Dict[str, Any]] = []
+    ids: List[int] = []
+    db.info["unit_of_work"] = True
+    try:
+        for index, operation in enumerate(operations):
+            row, status_code = await _apply(db, index, operation, ids)
+            if row is None:
+                await db.rollback()
+                results = [{**result, "result": None} for result in results]
+                results.append({"status_code": status_code, "result": None})
+                return {"committed": False, "results": results}
+            ids.append(row.id)
+            # serialized before the commit expires the rows
+            results.append({"status_code": status_code, "result": row.as_dict()})
+        await db.commit()
+    except BaseException:
+        await db.rollback()
+        raise
+    finally:
+        db.info.pop("unit_of_work", None)
+    return {"committed": True, "results": results}
@@ -4,3 +4,79 @@ from dotenv import load_dotenv
 load_dotenv()
 
 DATABASE_URL = os.getenv("DATABASE_URL", "postgresql://postgres:@localhost/help_desk_db")
+# derived from DATABASE_URL with an async driver when not set
+ASYNC_DATABASE_URL = os.getenv("ASYNC_DATABASE_URL")
+# comma separated read replicas of DATABASE_URL, used by the read-only endpoints
+# round-robin with an async driver; none by default, everything on the primary
+DATABASE_REPLICA_URLS = [
+    url.strip()
+    for url in os.getenv("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+# replica lag tolerated, in seconds: a client's reads stay on the primary this long
+# after it committed, and postgres replicas replaying further behind are skipped
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+# a replica's lag is measured again when older than this, in seconds
+REPLICA_LAG_CHECK_SECONDS = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "1"))
+
+# connection pool, applied to the sync and async engines separately
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "-1"))  # seconds, -1 = never
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "false").lower() in ("1", "true")
+
+# bcrypt cost (log2 of the key expansion rounds); stored hashes with another cost
+# are re-hashed on the next successful login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+# time one password check may take, used by python -m app.security --calibrate
+LOGIN_LATENCY_BUDGET_MS = float(os.getenv("LOGIN_LATENCY_BUDGET_MS", "250"))
+# bcrypt runs in a pool of worker processes, so logins can't starve reads
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", str(os.cpu_count() or 1)))
+# hashing calls allowed to wait for a free worker; callers beyond that wait their
+# turn before being queued
+HASH_QUEUE_SIZE = int(os.getenv("HASH_QUEUE_SIZE", "32"))
+
+# password checks (GET /users?username=&password=, POST /login): attempts allowed
+# per username and per client address, refilled continuously, and the most checks
+# running at once; anything over is answered 429 with Retry-After
+LOGIN_USERNAME_PER_MINUTE = float(os.getenv("LOGIN_USERNAME_PER_MINUTE", "10"))
+LOGIN_ADDRESS_PER_MINUTE = float(os.getenv("LOGIN_ADDRESS_PER_MINUTE", "60"))
+LOGIN_MAX_IN_FLIGHT = int(os.getenv("LOGIN_MAX_IN_FLIGHT", str(HASH_WORKERS * 4)))
+# buckets kept per limiter, least recently used are dropped first
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# HMAC key for session tokens; when unset a random key is generated at startup, so
+# tokens don't survive a restart and aren't shared between processes
+TOKEN_SECRET = os.getenv("TOKEN_SECRET", "")
+TOKEN_TTL_SECONDS = int(os.getenv("TOKEN_TTL_SECONDS", "3600"))
+
+# "boundary": validate crud arguments on the outermost call only, nested crud calls
+# are trusted; "strict": validate every call
+CRUD_VALIDATION = os.getenv("CRUD_VALIDATION", "boundary").lower()
+
+# rows validated, inserted and committed together by python -m app.db --bulk
+BULK_BATCH_SIZE = int(os.getenv("BULK_BATCH_SIZE", "5000"))
+
+# rows fetched per round trip by python -m app.export
+EXPORT_YIELD_PER = int(os.getenv("EXPORT_YIELD_PER", "1000"))
+# seconds the watermark kept by python -m app.export --state is moved back: rows are
+# stamped when their transaction starts (postgres), so one running longer than this
+# and committing after an export may still be missed by the next
+EXPORT_WATERMARK_MARGIN_SECONDS = float(
+    os.getenv("EXPORT_WATERMARK_MARGIN_SECONDS", "300")
+)
+
+# most ids accepted by one batch read, e.g. GET /tickets?ids=1,2,3
+BATCH_MAX_IDS = int(os.getenv("BATCH_MAX_IDS", "100"))
+# most operations in one POST /batch, applied in one transaction
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "100"))
+
+# logging
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# per-route overrides, e.g. "get_ticket_good=DEBUG,verify_user=WARNING"
+LOG_ROUTE_LEVELS = os.getenv("LOG_ROUTE_LEVELS", "")
+# response payloads are logged at DEBUG, cut to this many characters
+LOG_PAYLOAD_MAX_CHARS = int(os.getenv("LOG_PAYLOAD_MAX_CHARS", "2000"))
+# fraction of debug-enabled responses whose payload is logged
+LOG_PAYLOAD_SAMPLE_RATE = float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "1.0"))
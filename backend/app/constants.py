@@ -20,6 +20,8 @@ class StatusCode(Enum):
     SENDER_NOT_FOUND = 12
     RECEIVER_NOT_FOUND = 13
     SAME_SENDER_AND_RECEIVER = 14
+    # listing
+    INVALID_CURSOR = 15
 
 
 class TableName(Enum):
@@ -48,6 +50,6 @@ class TicketCategory(Enum):
     ACCOUNT = "account"
     OTHER = "other"
 
-
-
-
+class TicketSort(Enum):
+    CREATED_AT_ASC = "created_at"
+    CREATED_AT_DESC = "-created_at"
@@ -1,36 +1,184 @@
+import base64
+import binascii
+import contextvars
+import functools
+import inspect
+import json
+import re
 import pydantic
-from sqlalchemy import select
-from sqlalchemy.orm import Session
-from typing import Optional, Tuple
-
-from app.constants import StatusCode
+from datetime import datetime
+from sqlalchemy import (
+    ColumnElement,
+    Row,
+    Select,
+    UniqueConstraint,
+    func,
+    select,
+    tuple_,
+)
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, aliased
+from typing import Any, Callable, List, Optional, Tuple, TypeVar
+
+from app.config import CRUD_VALIDATION
+from app.constants import StatusCode, TicketSort
 from app import models, schemas, security
 
-
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+T = TypeVar("T")
+F = TypeVar("F", bound=Callable[..., Any])
+
+# set while a validated crud call is running, nested crud calls skip validation
+_inside_crud: contextvars.ContextVar[bool] = contextvars.ContextVar(
+    "inside_crud", default=False
+)
+
+
+def validated(func: F, mode: Optional[str] = None) -> F:
+    checked = pydantic.validate_call(
+        config=pydantic.ConfigDict(arbitrary_types_allowed=True)
+    )(func)
+    if (mode or CRUD_VALIDATION) == "strict":
+        return checked
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            if _inside_crud.get():
+                return await func(*args, **kwargs)
+            token = _inside_crud.set(True)
+            try:
+                return await checked(*args, **kwargs)
+            finally:
+                _inside_crud.reset(token)
+
+        return async_wrapper  # type: ignore[return-value]
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if _inside_crud.get():
+            return func(*args, **kwargs)
+        token = _inside_crud.set(True)
+        try:
+            return checked(*args, **kwargs)
+        finally:
+            _inside_crud.reset(token)
+
+    return wrapper  # type: ignore[return-value]
+
+
+def _commit(db: Session):
+    # a session running a unit of work (app.batch) only flushes, the whole unit is
+    # committed once at its end
+    if db.info.get("unit_of_work"):
+        db.flush()
+    else:
+        db.commit()
+
+
+# constraints writes are left to run into, and what they mean
+_UNIQUE_VIOLATIONS = {
+    "uq_users_username_lower": StatusCode.UNAME_ALREADY_EXIST,
+    "uq_users_email_lower": StatusCode.EMAIL_ALREADY_EXIST,
+    "uq_attachments_ticket_file": StatusCode.FILE_ALREADY_EXIST,
+    # postgres' name for the unnamed foreign key
+    "attachments_ticket_id_fkey": StatusCode.TICKET_NOT_FOUND,
+}
+# sqlite doesn't name the constraint, only its columns (or an expression index)
+_sqlite_unique = re.compile(r"UNIQUE constraint failed: (?:index '(\w+)'|([\w., ]+))")
+
+
+def _violated_constraint(error: IntegrityError) -> Optional[str]:
+    orig = error.orig
+    # psycopg2 diag, asyncpg through the sqlalchemy adapter
+    for source in [getattr(orig, "diag", None), orig.__cause__]:
+        name = getattr(source, "constraint_name", None)
+        if name:
+            return name
+    match = _sqlite_unique.search(str(orig))
+    if not match:
+        return None
+    if match[1]:
+        return match[1]
+    qualified = [column.split(".") for column in match[2].split(", ")]
+    table = models.Base.metadata.tables[qualified[0][0]]
+    columns = [column for _, column in qualified]
+    for constraint in table.constraints:
+        if (
+            isinstance(constraint, UniqueConstraint)
+            and constraint.columns.keys() == columns
+        ):
+            return constraint.name
+    return None
+
+
+def commit_unique(db: Session) -> StatusCode:
+    # one round trip: the database checks uniqueness on write, a violation is
+    # rolled back (in a unit of work, the whole unit) and reported with its status
+    # code
+    try:
+        _commit(db)
+    except IntegrityError as error:
+        db.rollback()
+        status_code = _UNIQUE_VIOLATIONS.get(_violated_constraint(error))
+        if status_code is None:
+            raise
+        return status_code
+    return StatusCode.SUCCESS
+
+
+@validated
 def check_same_ids(id_1: int, id_2) -> bool:
     return id_1 == id_2
 
 
+def _get_many(
+    db: Session,
+    stmt: Select,
+    id_column: ColumnElement[int],
+    ids: List[int],
+    from_row: Callable[[Row], Tuple[Optional[T], StatusCode]],
+    not_found: StatusCode,
+) -> List[Tuple[Optional[T], StatusCode]]:
+    # one statement for the whole batch, results follow the order of ids
+    rows = db.execute(stmt.where(id_column.in_(set(ids)))).all() if ids else []
+    found = {row.id: from_row(row) for row in rows}
+    return [found.get(id_, (None, not_found)) for id_ in ids]
+
+
 # TODO: prevent assigning client as assignee
 # [DONE] TODO-2: add try catch for invalid type args
 
 
 # users
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
-def verify_user_account(db: Session, username: str, password: str) -> bool:
-    result = db.execute(
-        select(models.User).where(models.User.username == username)
-    ).first()
+def username_is(username: str) -> ColumnElement[bool]:
+    # the same comparison as uq_users_username_lower, so the lookup uses it
+    return func.lower(models.User.username) == func.lower(username)
+
+
+@validated
+def authenticate_user(
+    db: Session, username: str, password: str
+) -> Optional[models.User]:
+    result = db.execute(select(models.User).where(username_is(username))).first()
     if not result:
-        return False
+        return None
     user: models.User = result[0]
-    if security.verify_password(password, user.hashed_password):
-        return True
-    return False
+    if not security.verify_password(password, user.hashed_password):
+        return None
+    if security.needs_rehash(user.hashed_password):
+        # BCRYPT_ROUNDS changed since this hash was made
+        user.hashed_password = security.hash_password(password)
+        db.commit()
+    return user
+
+
+@validated
+def verify_user_account(db: Session, username: str, password: str) -> bool:
+    return authenticate_user(db, username, password) is not None
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def verify_user_id(db: Session, user_id: int) -> bool:
     result = db.get(models.User, user_id)
     if result:
@@ -38,7 +186,7 @@ def verify_user_id(db: Session, user_id: int) -> bool:
     return False
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def get_user_good(
     db: Session, user_id: int
 ) -> Tuple[Optional[schemas.UserOut], StatusCode]:
@@ -53,20 +201,37 @@ def get_user_good(
     return user_out, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+def _user_out_from_row(row: Row) -> Tuple[Optional[schemas.UserOut], StatusCode]:
+    return schemas.UserOut.model_validate(row), StatusCode.SUCCESS
+
+
+@validated
+def get_users_many(
+    db: Session, user_ids: List[int]
+) -> List[Tuple[Optional[schemas.UserOut], StatusCode]]:
+    stmt = select(
+        models.User.id,
+        models.User.username,
+        models.User.email,
+        models.User.role,
+        models.User.created_at,
+        models.User.updated_at,
+    )
+    return _get_many(
+        db,
+        stmt,
+        models.User.id,
+        user_ids,
+        _user_out_from_row,
+        StatusCode.USER_NOT_FOUND,
+    )
+
+
+@validated
 def create_user(
     db: Session, user: schemas.UserCreate
 ) -> Tuple[Optional[models.User], StatusCode]:
-    uname_exist = db.execute(
-        select(models.User).where(models.User.username == user.username)
-    ).first()
-    email_exist = db.execute(
-        select(models.User).where(models.User.email == user.email)
-    ).first()
-    if uname_exist:
-        return None, StatusCode.UNAME_ALREADY_EXIST
-    if email_exist:
-        return None, StatusCode.EMAIL_ALREADY_EXIST
+    # taken usernames and emails are caught by their unique indexes
     user_dict = dict()
     for key, val in user.model_dump().items():
         if key == "password":
@@ -75,11 +240,13 @@ def create_user(
         user_dict.update({key: val})
     new_user = models.User(**user_dict)
     db.add(new_user)
-    db.commit()
+    status_code = commit_unique(db)
+    if status_code is not StatusCode.SUCCESS:
+        return None, status_code
     return new_user, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def update_user(
     db: Session, user_id: int, updated_user: schemas.UserUpdate
 ) -> Tuple[Optional[models.User], StatusCode]:
@@ -87,36 +254,28 @@ def update_user(
     db_user = db.get(models.User, user_id)
     if not db_user:
         return None, StatusCode.USER_NOT_FOUND
-    uname_exist = db.execute(
-        select(models.User).where(models.User.username == updated_user.username)
-    ).first()
-    email_exist = db.execute(
-        select(models.User).where(models.User.email == updated_user.email)
-    ).first()
-    if uname_exist:
-        return None, StatusCode.UNAME_ALREADY_EXIST
-    elif email_exist:
-        return None, StatusCode.EMAIL_ALREADY_EXIST
-    # main
+    # main, keeping its own username or email is fine, another user's isn't
     updated_dict = updated_user.model_dump(exclude_none=True, exclude_unset=True)
     for key, val in updated_dict.items():
         setattr(db_user, key, val)
-    db.commit()
+    status_code = commit_unique(db)
+    if status_code is not StatusCode.SUCCESS:
+        return None, status_code
     return db_user, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def delete_user(db: Session, user_id: int) -> Tuple[Optional[models.User], StatusCode]:
     db_user = db.get(models.User, user_id)
     if not db_user:
         return None, StatusCode.USER_NOT_FOUND
     db.delete(db_user)
-    db.commit()
+    _commit(db)
     return db_user, StatusCode.SUCCESS
 
 
 # tickets
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def verify_ticket_id(db: Session, ticket_id: int) -> bool:
     result = db.get(models.Ticket, ticket_id)
     if result:
@@ -124,38 +283,75 @@ def verify_ticket_id(db: Session, ticket_id: int) -> bool:
     return False
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+def _select_ticket_out() -> Select:
+    issuer = aliased(models.User)
+    assignee = aliased(models.User)
+    return (
+        select(
+            models.Ticket.id,
+            models.Ticket.title,
+            models.Ticket.status,
+            models.Ticket.category,
+            models.Ticket.description,
+            models.Ticket.created_at,
+            models.Ticket.updated_at,
+            models.Ticket.issuer_id,
+            issuer.username.label("issuer_username"),
+            models.Ticket.assignee_id,
+            assignee.username.label("assignee_username"),
+        )
+        .outerjoin(issuer, issuer.id == models.Ticket.issuer_id)
+        .outerjoin(assignee, assignee.id == models.Ticket.assignee_id)
+    )
+
+
+def _ticket_out_from_row(row: Row) -> Tuple[Optional[schemas.TicketOut], StatusCode]:
+    if row.issuer_username is None:
+        return None, StatusCode.ISSUER_NOT_FOUND
+    assignee = None
+    if row.assignee_username is not None:
+        assignee = schemas.UserRef(id=row.assignee_id, username=row.assignee_username)
+    ticket_out = schemas.TicketOut(
+        id=row.id,
+        title=row.title,
+        status=row.status,
+        category=row.category,
+        description=row.description,
+        created_at=row.created_at,
+        updated_at=row.updated_at,
+        issuer=schemas.UserRef(id=row.issuer_id, username=row.issuer_username),
+        assignee=assignee,
+    )
+    return ticket_out, StatusCode.SUCCESS
+
+
+@validated
 def get_ticket_good(
     db: Session, ticket_id: int
 ) -> Tuple[Optional[schemas.TicketOut], StatusCode]:
-    db_ticket = db.get(models.Ticket, ticket_id)
-    if not db_ticket:
+    row = db.execute(
+        _select_ticket_out().where(models.Ticket.id == ticket_id)
+    ).first()
+    if not row:
         return None, StatusCode.TICKET_NOT_FOUND
-    issuer = db.get(models.User, db_ticket.issuer_id)
-    assignee = db.get(models.User, db_ticket.assignee_id)
-    if not issuer:
-        return None, StatusCode.ISSUER_NOT_FOUND
-    ticket_dict = db_ticket.as_dict()
-    ticket_dict.update(
-        {
-            "issuer": schemas.UserRef(
-                id=ticket_dict["issuer_id"], username=issuer.username
-            ),
-        }
+    return _ticket_out_from_row(row)
+
+
+@validated
+def get_tickets_many(
+    db: Session, ticket_ids: List[int]
+) -> List[Tuple[Optional[schemas.TicketOut], StatusCode]]:
+    return _get_many(
+        db,
+        _select_ticket_out(),
+        models.Ticket.id,
+        ticket_ids,
+        _ticket_out_from_row,
+        StatusCode.TICKET_NOT_FOUND,
     )
-    if assignee:
-        ticket_dict.update(
-            {
-                "assignee": schemas.UserRef(
-                    id=ticket_dict["assignee_id"], username=assignee.username
-                )
-            }
-        )
-    ticket_out = schemas.TicketOut.model_validate(ticket_dict)
-    return ticket_out, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def create_ticket(
     db: Session, ticket: schemas.TicketCreate
 ) -> Tuple[Optional[models.Ticket], StatusCode]:
@@ -173,11 +369,11 @@ def create_ticket(
     ticket_dict = ticket.model_dump()
     new_ticket = models.Ticket(**ticket_dict)
     db.add(new_ticket)
-    db.commit()
+    _commit(db)
     return new_ticket, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def update_ticket(
     db: Session, ticket_id: int, updated_ticket: schemas.TicketUpdate
 ) -> Tuple[Optional[models.Ticket], StatusCode]:
@@ -210,11 +406,11 @@ def update_ticket(
     updated_dict = updated_ticket.model_dump(exclude_none=True, exclude_unset=True)
     for key, val in updated_dict.items():
         setattr(db_ticket, key, val)
-    db.commit()
+    _commit(db)
     return db_ticket, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def delete_ticket(
     db: Session, ticket_id: int
 ) -> Tuple[Optional[models.Ticket], StatusCode]:
@@ -222,32 +418,74 @@ def delete_ticket(
     if not db_ticket:
         return None, StatusCode.TICKET_NOT_FOUND
     db.delete(db_ticket)
-    db.commit()
+    _commit(db)
     return db_ticket, StatusCode.SUCCESS
 
 
-# attachments
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
-def check_attachment_existence(
-    db: Session, ticket_id: int, filename: str, filetype: str
-) -> bool:
-    db_file = (
-        db.execute(
-            select(models.Attachment).where(
-                models.Ticket.id == ticket_id,
-                models.Attachment.filename == filename,
-                models.Attachment.filetype == filetype,
-            )
+def _encode_cursor(created_at: datetime, ticket_id: int) -> str:
+    raw = json.dumps([created_at.isoformat(), ticket_id]).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii")
+
+
+def _decode_cursor(cursor: str) -> Optional[Tuple[datetime, int]]:
+    try:
+        created_at, ticket_id = json.loads(base64.urlsafe_b64decode(cursor))
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (binascii.Error, ValueError, TypeError):
+        return None
+
+
+@validated
+def list_tickets(
+    db: Session, query: schemas.TicketQuery
+) -> Tuple[Optional[schemas.TicketPage], StatusCode]:
+    # keyset pagination over (created_at, id), issuer/assignee joined in
+    stmt = _select_ticket_out()
+    # filters
+    if query.status is not None:
+        stmt = stmt.where(models.Ticket.status == query.status)
+    if query.active:
+        stmt = stmt.where(models.TICKET_ACTIVE)
+    if query.category is not None:
+        stmt = stmt.where(models.Ticket.category == query.category)
+    if query.issuer_id is not None:
+        stmt = stmt.where(models.Ticket.issuer_id == query.issuer_id)
+    if query.assignee_id is not None:
+        stmt = stmt.where(models.Ticket.assignee_id == query.assignee_id)
+    if query.created_after is not None:
+        stmt = stmt.where(models.Ticket.created_at >= query.created_after)
+    if query.created_before is not None:
+        stmt = stmt.where(models.Ticket.created_at < query.created_before)
+    # page
+    sort_key = tuple_(models.Ticket.created_at, models.Ticket.id)
+    descending = query.sort is TicketSort.CREATED_AT_DESC
+    if query.cursor is not None:
+        position = _decode_cursor(query.cursor)
+        if position is None:
+            return None, StatusCode.INVALID_CURSOR
+        stmt = stmt.where(
+            sort_key < tuple_(*position) if descending else sort_key > tuple_(*position)
         )
-        .scalars()
-        .first()
-    )
-    if db_file:
-        return True
-    return False
+    if descending:
+        stmt = stmt.order_by(models.Ticket.created_at.desc(), models.Ticket.id.desc())
+    else:
+        stmt = stmt.order_by(models.Ticket.created_at.asc(), models.Ticket.id.asc())
+    # one extra row tells whether there is a next page
+    rows = db.execute(stmt.limit(query.limit + 1)).all()
+    next_cursor = None
+    if len(rows) > query.limit:
+        rows = rows[: query.limit]
+        next_cursor = _encode_cursor(rows[-1].created_at, rows[-1].id)
+    items = [
+        ticket_out
+        for ticket_out, _ in map(_ticket_out_from_row, rows)
+        if ticket_out is not None
+    ]
+    return schemas.TicketPage(items=items, next_cursor=next_cursor), StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+# attachments
+@validated
 def verify_attachment_id(db: Session, attachment_id: int) -> bool:
     result = db.get(models.Attachment, attachment_id)
     if result:
@@ -255,50 +493,82 @@ def verify_attachment_id(db: Session, attachment_id: int) -> bool:
     return False
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+def _select_attachment_out() -> Select:
+    return select(
+        models.Attachment.id,
+        models.Attachment.ticket_id,
+        models.Attachment.filename,
+        models.Attachment.filetype,
+        models.Attachment.filesize,
+        models.Attachment.uploaded_at,
+        models.Attachment.updated_at,
+        models.Ticket.title.label("ticket_title"),
+    ).outerjoin(models.Ticket, models.Ticket.id == models.Attachment.ticket_id)
+
+
+def _attachment_out_from_row(
+    row: Row,
+) -> Tuple[Optional[schemas.AttachmentOut], StatusCode]:
+    if row.ticket_title is None:
+        return None, StatusCode.TICKET_NOT_FOUND
+    attachment_out = schemas.AttachmentOut(
+        id=row.id,
+        filename=row.filename,
+        filetype=row.filetype,
+        filesize=row.filesize,
+        uploaded_at=row.uploaded_at,
+        updated_at=row.updated_at,
+        ticket=schemas.TicketRef(id=row.ticket_id, title=row.ticket_title),
+    )
+    return attachment_out, StatusCode.SUCCESS
+
+
+@validated
 def get_attachment_good(
     db: Session, attachment_id: int
 ) -> Tuple[Optional[schemas.AttachmentOut], StatusCode]:
-    db_attachment = db.get(models.Attachment, attachment_id)
-    if not db_attachment:
+    row = db.execute(
+        _select_attachment_out().where(models.Attachment.id == attachment_id)
+    ).first()
+    if not row:
         return None, StatusCode.FILE_NOT_FOUND
-    ticket = db.get(models.Ticket, db_attachment.ticket_id)
-    if not ticket:
-        return None, StatusCode.TICKET_NOT_FOUND
-    attachment_dict = db_attachment.as_dict()
-    attachment_dict.update(
-        {
-            "ticket": schemas.TicketRef(
-                id=attachment_dict["ticket_id"], title=ticket.title
-            ),
-        }
+    return _attachment_out_from_row(row)
+
+
+@validated
+def get_attachments_many(
+    db: Session, attachment_ids: List[int]
+) -> List[Tuple[Optional[schemas.AttachmentOut], StatusCode]]:
+    return _get_many(
+        db,
+        _select_attachment_out(),
+        models.Attachment.id,
+        attachment_ids,
+        _attachment_out_from_row,
+        StatusCode.FILE_NOT_FOUND,
     )
-    attachment_out = schemas.AttachmentOut.model_validate(attachment_dict)
-    return attachment_out, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def create_attachment(
     db: Session, attachment: schemas.AttachmentCreate
 ) -> Tuple[Optional[models.Attachment], StatusCode]:
-    # verify
-    ticket_exist = verify_ticket_id(db, attachment.ticket_id)
-    if not ticket_exist:
-        return None, StatusCode.TICKET_NOT_FOUND
-    file_exist = check_attachment_existence(
-        db, attachment.ticket_id, attachment.filename, attachment.filetype
-    )
-    if file_exist:
-        return None, StatusCode.FILE_ALREADY_EXIST
-    # main
+    # one INSERT: a missing ticket is caught by the foreign key, a file already on
+    # the ticket by uq_attachments_ticket_file. sqlite runs without PRAGMA
+    # foreign_keys, so there the ticket is looked up first
+    if db.get_bind().dialect.name == "sqlite":
+        if not verify_ticket_id(db, attachment.ticket_id):
+            return None, StatusCode.TICKET_NOT_FOUND
     attachment_dict = attachment.model_dump()
     new_attachment = models.Attachment(**attachment_dict)
     db.add(new_attachment)
-    db.commit()
+    status_code = commit_unique(db)
+    if status_code is not StatusCode.SUCCESS:
+        return None, status_code
     return new_attachment, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def update_attachment(
     db: Session, attachment_id: int, updated_attachment: schemas.AttachmentUpdate
 ) -> Tuple[Optional[models.Attachment], StatusCode]:
@@ -314,11 +584,13 @@ def update_attachment(
     updated_dict = updated_attachment.model_dump(exclude_none=True, exclude_unset=True)
     for key, val in updated_dict.items():
         setattr(db_attachment, key, val)
-    db.commit()
+    status_code = commit_unique(db)
+    if status_code is not StatusCode.SUCCESS:
+        return None, status_code
     return db_attachment, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def delete_attachment(
     db: Session, attachment_id: int
 ) -> Tuple[Optional[models.Attachment], StatusCode]:
@@ -326,12 +598,12 @@ def delete_attachment(
     if not db_attachment:
         return None, StatusCode.FILE_NOT_FOUND
     db.delete(db_attachment)
-    db.commit()
+    _commit(db)
     return db_attachment, StatusCode.SUCCESS
 
 
 # messages
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def verify_message_id(db: Session, message_id: int) -> bool:
     result = db.get(models.Message, message_id)
     if result:
@@ -339,49 +611,74 @@ def verify_message_id(db: Session, message_id: int) -> bool:
     return False
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
-def get_message_good(
-    db: Session, message_id: int
-) -> Tuple[Optional[schemas.MessageOut], StatusCode]:
-    db_message = db.get(models.Message, message_id)
-    if not db_message:
-        return None, StatusCode.MESSAGE_NOT_FOUND
-    ticket = db.get(models.Ticket, db_message.ticket_id)
-    if not ticket:
+def _select_message_out() -> Select:
+    sender = aliased(models.User)
+    receiver = aliased(models.User)
+    return (
+        select(
+            models.Message.id,
+            models.Message.content,
+            models.Message.sent_at,
+            models.Message.edited_at,
+            models.Message.ticket_id,
+            models.Ticket.title.label("ticket_title"),
+            models.Message.sender_id,
+            sender.username.label("sender_username"),
+            models.Message.receiver_id,
+            receiver.username.label("receiver_username"),
+        )
+        .outerjoin(models.Ticket, models.Ticket.id == models.Message.ticket_id)
+        .outerjoin(sender, sender.id == models.Message.sender_id)
+        .outerjoin(receiver, receiver.id == models.Message.receiver_id)
+    )
+
+
+def _message_out_from_row(row: Row) -> Tuple[Optional[schemas.MessageOut], StatusCode]:
+    if row.ticket_title is None:
         return None, StatusCode.TICKET_NOT_FOUND
-    sender = db.get(models.User, db_message.sender_id)
-    if not sender:
+    if row.sender_username is None:
         return None, StatusCode.SENDER_NOT_FOUND
-    receiver = db.get(models.User, db_message.receiver_id)
-    if not receiver:
+    if row.receiver_username is None:
         return None, StatusCode.RECEIVER_NOT_FOUND
-    message_dict = db_message.as_dict()
-    message_dict.update(
-        {
-            "ticket": schemas.TicketRef(
-                id=message_dict["ticket_id"], title=ticket.title
-            ),
-        }
+    message_out = schemas.MessageOut(
+        id=row.id,
+        content=row.content,
+        sent_at=row.sent_at,
+        edited_at=row.edited_at,
+        ticket=schemas.TicketRef(id=row.ticket_id, title=row.ticket_title),
+        sender=schemas.UserRef(id=row.sender_id, username=row.sender_username),
+        receiver=schemas.UserRef(id=row.receiver_id, username=row.receiver_username),
     )
-    message_dict.update(
-        {
-            "sender": schemas.UserRef(
-                id=message_dict["sender_id"], username=sender.username
-            ),
-        }
-    )
-    message_dict.update(
-        {
-            "receiver": schemas.UserRef(
-                id=message_dict["receiver_id"], username=receiver.username
-            ),
-        }
-    )
-    message_out = schemas.MessageOut.model_validate(message_dict)
     return message_out, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
+def get_message_good(
+    db: Session, message_id: int
+) -> Tuple[Optional[schemas.MessageOut], StatusCode]:
+    row = db.execute(
+        _select_message_out().where(models.Message.id == message_id)
+    ).first()
+    if not row:
+        return None, StatusCode.MESSAGE_NOT_FOUND
+    return _message_out_from_row(row)
+
+
+@validated
+def get_messages_many(
+    db: Session, message_ids: List[int]
+) -> List[Tuple[Optional[schemas.MessageOut], StatusCode]]:
+    return _get_many(
+        db,
+        _select_message_out(),
+        models.Message.id,
+        message_ids,
+        _message_out_from_row,
+        StatusCode.MESSAGE_NOT_FOUND,
+    )
+
+
+@validated
 def create_message(
     db: Session, message: schemas.MessageCreate
 ) -> Tuple[Optional[models.Message], StatusCode]:
@@ -403,11 +700,11 @@ def create_message(
     message_dict = message.model_dump()
     new_message = models.Message(**message_dict)
     db.add(new_message)
-    db.commit()
+    _commit(db)
     return new_message, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def update_message(
     db: Session, message_id: int, updated_message: schemas.MessageUpdate
 ) -> Tuple[Optional[models.Message], StatusCode]:
@@ -441,11 +738,11 @@ def update_message(
     updated_dict = updated_message.model_dump(exclude_none=True, exclude_unset=True)
     for key, val in updated_dict.items():
         setattr(db_message, key, val)
-    db.commit()
+    _commit(db)
     return db_message, StatusCode.SUCCESS
 
 
-@pydantic.validate_call(config=pydantic.ConfigDict(arbitrary_types_allowed=True))
+@validated
 def delete_message(
     db: Session, message_id: int
 ) -> Tuple[Optional[models.Message], StatusCode]:
@@ -453,5 +750,5 @@ def delete_message(
     if not db_message:
         return None, StatusCode.MESSAGE_NOT_FOUND
     db.delete(db_message)
-    db.commit()
+    _commit(db)
     return db_message, StatusCode.SUCCESS
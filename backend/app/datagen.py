@@ -0,0 +1,286 @@
+import argparse
+import random
+import time
+from array import array
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterator, List, Tuple
+
+import orjson
+from sqlalchemy import insert
+
+from app import models, security
+from app.config import BULK_BATCH_SIZE
+from app.constants import TableName, TicketCategory, TicketStatus, UserRole
+from app.db import engine, reset_db, session_maker
+
+# deterministic synthetic datasets: the same seed and counts give the same rows.
+# rows reference each other by id, ids start at 1 in generation order, so the
+# output has to be loaded into empty tables
+
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+SPAN_SECONDS = 365 * 24 * 3600
+
+ROLES = {UserRole.CLIENT: 85, UserRole.SUPPORT: 12, UserRole.ADMIN: 3}
+STATUSES = {
+    TicketStatus.OPEN: 20,
+    TicketStatus.IN_PROGRESS: 25,
+    TicketStatus.RESOLVED: 35,
+    TicketStatus.CLOSED: 15,
+    TicketStatus.CANCELLED: 5,
+}
+CATEGORIES = {
+    TicketCategory.HARDWARE: 20,
+    TicketCategory.SOFTWARE: 30,
+    TicketCategory.NETWORK: 15,
+    TicketCategory.ACCESS: 15,
+    TicketCategory.ACCOUNT: 10,
+    TicketCategory.OTHER: 5,
+    None: 5,
+}
+UNASSIGNED_RATE = 0.2
+
+FIRST_NAMES = ["john", "jane", "mike", "sara", "alex", "emma", "liam", "olivia"]
+LAST_NAMES = ["doe", "smith", "tan", "lee", "wong", "garcia", "muller", "rossi"]
+SUBJECTS = {
+    TicketCategory.HARDWARE: ["laptop", "monitor", "printer", "docking station"],
+    TicketCategory.SOFTWARE: ["email client", "VPN client", "spreadsheet app"],
+    TicketCategory.NETWORK: ["wifi", "office network", "VPN connection"],
+    TicketCategory.ACCESS: ["shared drive", "badge reader", "build server"],
+    TicketCategory.ACCOUNT: ["password", "two-factor login", "mailbox"],
+    TicketCategory.OTHER: ["desk phone", "meeting room screen"],
+    None: ["something"],
+}
+PROBLEMS = ["is not working", "keeps crashing", "is very slow", "needs setting up"]
+REPLIES = [
+    "Could you send a screenshot of the error?",
+    "I've restarted it, the problem is still there.",
+    "Thanks, I'm looking into it now.",
+    "It works again, thank you!",
+    "Can you try again and tell me if it happens again?",
+]
+FILETYPES = {"png": 40, "pdf": 25, "log": 20, "txt": 10, "docx": 5}
+
+
+def _weighted(rng: random.Random, weights: Dict[Any, int]) -> Any:
+    # one draw per row, drawing a whole table's worth up front would grow with it
+    return rng.choices(list(weights), weights=list(weights.values()))[0]
+
+
+def _at(seconds: int) -> datetime:
+    return EPOCH + timedelta(seconds=seconds)
+
+
+class Generator:
+    def __init__(
+        self,
+        seed: int,
+        users: int,
+        tickets: int,
+        attachments: int,
+        messages: int,
+        password: str = "123",
+    ):
+        self.rng = random.Random(seed)
+        self.counts = {
+            TableName.USERS: users,
+            TableName.TICKETS: tickets,
+            TableName.ATTACHMENTS: attachments,
+            TableName.MESSAGES: messages,
+        }
+        self.password = password
+        # kept from earlier tables to build the rows that reference them
+        self.clients = array("q")
+        self.supports = array("q")
+        self.ticket_issuer = array("q")
+        self.ticket_assignee = array("q")  # 0 = unassigned
+        self.ticket_created = array("q")  # seconds since EPOCH
+
+    def users(self) -> Iterator[Dict[str, Any]]:
+        # at least one client and one support, tickets need both
+        fixed = [UserRole.CLIENT, UserRole.SUPPORT]
+        for i in range(1, self.counts[TableName.USERS] + 1):
+            role = fixed[i - 1] if i <= len(fixed) else _weighted(self.rng, ROLES)
+            first, last = self.rng.choice(FIRST_NAMES), self.rng.choice(LAST_NAMES)
+            username = f"{first}_{last}{i}"
+            created = self.rng.randrange(SPAN_SECONDS // 4)
+            (self.supports if role is UserRole.SUPPORT else self.clients).append(i)
+            yield {
+                "id": i,
+                "username": username,
+                "email": f"{username}@example.com",
+                "password": self.password,
+                "role": role,
+                "created_at": _at(created),
+                "updated_at": _at(created + self.rng.randrange(86400)),
+            }
+
+    def tickets(self) -> Iterator[Dict[str, Any]]:
+        for i in range(1, self.counts[TableName.TICKETS] + 1):
+            status = _weighted(self.rng, STATUSES)
+            category = _weighted(self.rng, CATEGORIES)
+            issuer = self.rng.choice(self.clients)
+            assignee = None
+            if status is not TicketStatus.OPEN or self.rng.random() > UNASSIGNED_RATE:
+                assignee = self.rng.choice(self.supports)
+            created = self.rng.randrange(SPAN_SECONDS // 4, SPAN_SECONDS)
+            self.ticket_issuer.append(issuer)
+            self.ticket_assignee.append(assignee or 0)
+            self.ticket_created.append(created)
+            subject = self.rng.choice(SUBJECTS[category])
+            problem = self.rng.choice(PROBLEMS)
+            yield {
+                "id": i,
+                "issuer_id": issuer,
+                "assignee_id": assignee,
+                "title": f"My {subject} {problem}",
+                "status": status,
+                "category": category,
+                "description": f"Since this morning my {subject} {problem}.",
+                "created_at": _at(created),
+                "updated_at": _at(created + self.rng.randrange(7 * 86400)),
+            }
+
+    def attachments(self) -> Iterator[Dict[str, Any]]:
+        for i in range(1, self.counts[TableName.ATTACHMENTS] + 1):
+            filetype = _weighted(self.rng, FILETYPES)
+            ticket = self.rng.randrange(len(self.ticket_issuer))
+            uploaded = self.ticket_created[ticket] + self.rng.randrange(86400)
+            yield {
+                "id": i,
+                "ticket_id": ticket + 1,
+                # the id keeps (ticket_id, filename, filetype) unique
+                "filename": f"attachment_{i}.{filetype}",
+                "filetype": filetype,
+                "filesize": int(self.rng.lognormvariate(11, 1.5)),
+                "uploaded_at": _at(uploaded),
+                "updated_at": _at(uploaded),
+            }
+
+    def messages(self) -> Iterator[Dict[str, Any]]:
+        # each ticket is a thread between its issuer and its assignee, or a
+        # random support for unassigned tickets; either side may write
+        for i in range(1, self.counts[TableName.MESSAGES] + 1):
+            ticket = self.rng.randrange(len(self.ticket_issuer))
+            issuer = self.ticket_issuer[ticket]
+            other = self.ticket_assignee[ticket] or self.rng.choice(self.supports)
+            sender, receiver = issuer, other
+            if self.rng.random() < 0.5:
+                sender, receiver = receiver, sender
+            sent = self.ticket_created[ticket] + self.rng.randrange(14 * 86400)
+            yield {
+                "id": i,
+                "ticket_id": ticket + 1,
+                "sender_id": sender,
+                "receiver_id": receiver,
+                "content": self.rng.choice(REPLIES),
+                "sent_at": _at(sent),
+                "edited_at": _at(sent),
+            }
+
+    def tables(self) -> Iterator[Tuple[TableName, Iterator[Dict[str, Any]]]]:
+        # in dependency order, each table is generated once the previous one is done
+        yield TableName.USERS, self.users()
+        yield TableName.TICKETS, self.tickets()
+        yield TableName.ATTACHMENTS, self.attachments()
+        yield TableName.MESSAGES, self.messages()
+
+
+def write_json(generator: Generator, path: str):
+    # the app/datasets.json layout, written row by row
+    with open(path, "wb") as file:
+        file.write(b"{")
+        for t, (tablename, rows) in enumerate(generator.tables()):
+            file.write(b', "' if t else b'"')
+            file.write(tablename.value.encode() + b'": [')
+            for r, row in enumerate(rows):
+                file.write(b",\n" if r else b"\n")
+                file.write(orjson.dumps(row))
+            file.write(b"\n]")
+        file.write(b"}\n")
+
+
+def write_ndjson(generator: Generator, path: str):
+    with open(path, "wb") as file:
+        for tablename, rows in generator.tables():
+            for row in rows:
+                file.write(orjson.dumps({"table": tablename.value, "row": row}))
+                file.write(b"\n")
+
+
+_models = {
+    TableName.USERS: models.User,
+    TableName.TICKETS: models.Ticket,
+    TableName.ATTACHMENTS: models.Attachment,
+    TableName.MESSAGES: models.Message,
+}
+
+
+def write_db(generator: Generator, batch_size: int = BULK_BATCH_SIZE):
+    # straight inserts, the rows are consistent by construction. every user gets
+    # the same password, hashed once
+    reset_db(engine)
+    hashed_password = security.hash_password(generator.password)
+    with session_maker() as db:
+        for tablename, rows in generator.tables():
+            batch = []
+            for row in rows:
+                # ids come from the sequences, in the same order
+                del row["id"]
+                if tablename is TableName.USERS:
+                    del row["password"]
+                    row["hashed_password"] = hashed_password
+                batch.append(row)
+                if len(batch) == batch_size:
+                    db.execute(insert(_models[tablename]), batch)
+                    db.commit()
+                    batch = []
+            if batch:
+                db.execute(insert(_models[tablename]), batch)
+                db.commit()
+
+
+def main(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.datagen",
+        description="Generate a deterministic synthetic help desk dataset.",
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--users", type=int, default=1_000)
+    parser.add_argument("--tickets", type=int, default=5_000)
+    parser.add_argument("--attachments", type=int, default=2_000)
+    parser.add_argument("--messages", type=int, default=20_000)
+    parser.add_argument("--password", default="123", help="every user's password")
+    parser.add_argument("--format", choices=["json", "ndjson", "db"], default="json")
+    parser.add_argument(
+        "--out", help="output file for json/ndjson; db replaces the database"
+    )
+    args = parser.parse_args(argv)
+    if args.format != "db" and not args.out:
+        parser.error("--out is required for json and ndjson")
+    if args.tickets and args.users < 2:
+        parser.error("tickets need at least 2 users, a client and a support")
+    if (args.attachments or args.messages) and not args.tickets:
+        parser.error("attachments and messages need at least 1 ticket")
+
+    generator = Generator(
+        args.seed,
+        args.users,
+        args.tickets,
+        args.attachments,
+        args.messages,
+        args.password,
+    )
+    start = time.perf_counter()
+    if args.format == "json":
+        write_json(generator, args.out)
+    elif args.format == "ndjson":
+        write_ndjson(generator, args.out)
+    else:
+        write_db(generator)
+    elapsed = time.perf_counter() - start
+    rows = sum(generator.counts.values())
+    print(f"[*] {rows} rows in {elapsed:.1f}s ({rows / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
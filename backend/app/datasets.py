@@ -0,0 +1,127 @@
+import json
+from typing import IO, Any, Iterator, List, Tuple
+
+from app.constants import TableName
+
+# single pass, bounded memory readers for dataset files. two formats:
+#   .json             {"users": [...], "tickets": [...], ...}, as app/datasets.json
+#   .ndjson / .jsonl  one {"table": "users", "row": {...}} per line
+# rows are handed out in file order, so tables must come in dependency order:
+# users, tickets, attachments, messages
+
+READ_SIZE = 1 << 16
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+
+_decoder = json.JSONDecoder()
+_whitespace = " \t\n\r"
+_delimiters = _whitespace + ",]}"
+
+
+class _Reader:
+    # a window over the file: values are decoded with raw_decode from the buffer,
+    # which is refilled and trimmed to what hasn't been consumed yet
+    def __init__(self, file: IO[str]):
+        self.file = file
+        self.buffer = ""
+        self.pos = 0
+
+    def _fill(self) -> bool:
+        data = self.file.read(READ_SIZE)
+        if not data:
+            return False
+        self.buffer = self.buffer[self.pos :] + data
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        # next non-whitespace character, "" at the end of the file
+        while True:
+            while (
+                self.pos < len(self.buffer) and self.buffer[self.pos] in _whitespace
+            ):
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def take(self, expected: str) -> str:
+        char = self.peek()
+        if not char or char not in expected:
+            raise json.JSONDecodeError(
+                f"Expecting one of {expected!r}", self.buffer, self.pos
+            )
+        self.pos += 1
+        return char
+
+    def value(self) -> Any:
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                # the value may be cut by the end of the buffer
+                if self._fill():
+                    continue
+                raise
+            # so may a number: "12" of "123", "1.5" of "1.5e3"
+            cut = end == len(self.buffer) or (
+                isinstance(value, (int, float))
+                and self.buffer[end] not in _delimiters
+            )
+            if cut and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_rows(file: IO[str]) -> Iterator[Tuple[str, Any]]:
+    reader = _Reader(file)
+    reader.take("{")
+    if reader.peek() == "}":
+        return
+    while True:
+        table = reader.value()
+        reader.take(":")
+        reader.take("[")
+        if reader.peek() == "]":
+            reader.take("]")
+        else:
+            while True:
+                yield table, reader.value()
+                if reader.take(",]") == "]":
+                    break
+        if reader.take(",}") == "}":
+            return
+
+
+def iter_ndjson_rows(file: IO[str]) -> Iterator[Tuple[str, Any]]:
+    for line in file:
+        if line.strip():
+            record = json.loads(line)
+            yield record["table"], record["row"]
+
+
+def read_dataset(
+    datasets_path: str, chunk_size: int
+) -> Iterator[Tuple[TableName, List[Any]]]:
+    # consecutive rows of one table, at most chunk_size at a time; tables that
+    # aren't in TableName are skipped
+    with open(datasets_path, "r") as file:
+        if datasets_path.endswith(NDJSON_SUFFIXES):
+            rows = iter_ndjson_rows(file)
+        else:
+            rows = iter_json_rows(file)
+        known = {tablename.value for tablename in TableName}
+        chunk: List[Any] = []
+        chunk_table = None
+        for table, row in rows:
+            if table not in known:
+                continue
+            if chunk and (table != chunk_table or len(chunk) == chunk_size):
+                yield TableName(chunk_table), chunk
+                chunk = []
+            chunk_table = table
+            chunk.append(row)
+        if chunk:
+            yield TableName(chunk_table), chunk
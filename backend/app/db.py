@@ -1,15 +1,137 @@
-from typing import Generator, Optional
-from sqlalchemy import Connection, Engine, create_engine, inspect
+from collections import Counter
+from contextlib import nullcontext
+from typing import (
+    Any,
+    AsyncGenerator,
+    Callable,
+    Dict,
+    Generator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+)
+from alembic import command
+from alembic.config import Config
+from pydantic import TypeAdapter
+from sqlalchemy import (
+    URL,
+    ColumnElement,
+    Connection,
+    Engine,
+    MetaData,
+    Table,
+    create_engine,
+    event,
+    func,
+    insert,
+    inspect,
+    make_url,
+    select,
+)
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import Session, sessionmaker
 
-from app.constants import TableName
-from app import crud, schemas
-from app.config import DATABASE_URL
+from app.constants import StatusCode, TableName
+from app import crud, metrics, models, schemas, security
+from app.datasets import read_dataset
+from app.replicas import ReplicaRouter
+from app.executor import get_hash_executor
+from app.config import (
+    ASYNC_DATABASE_URL,
+    BULK_BATCH_SIZE,
+    DATABASE_REPLICA_URLS,
+    DATABASE_URL,
+    DB_MAX_OVERFLOW,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    HASH_WORKERS,
+)
 import json
+import logging
+import os
+import time
 
-engine = create_engine(DATABASE_URL)  # , echo=True
+logger = logging.getLogger(__name__)
+
+# backend/alembic.ini, the schema is managed by the migrations in backend/migrations
+ALEMBIC_INI = os.path.join(os.path.dirname(os.path.dirname(__file__)), "alembic.ini")
+# the revision matching databases made with create_all before the migrations
+BASELINE_REVISION = "0001"
+
+# async driver used for each sync backend in DATABASE_URL
+ASYNC_DRIVERS = {
+    "postgresql": "asyncpg",
+    "sqlite": "aiosqlite",
+}
+
+
+def to_async_url(database_url: str | URL) -> URL:
+    url = make_url(database_url)
+    backend = url.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f'No async driver for "{backend}", set ASYNC_DATABASE_URL')
+    return url.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}")
+
+
+def pool_options() -> Dict[str, Any]:
+    return {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+        "pool_pre_ping": DB_POOL_PRE_PING,
+    }
+
+
+engine = create_engine(
+    DATABASE_URL, poolclass=metrics.instrumented_pool(), **pool_options()
+)  # , echo=True
 session_maker = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL or to_async_url(DATABASE_URL),
+    poolclass=metrics.instrumented_pool(asyncio=True),
+    **pool_options(),
+)
+async_session_maker = async_sessionmaker(
+    autocommit=False, autoflush=False, bind=async_engine
+)
+
+# read-only endpoints, see app.replicas
+replica_router = ReplicaRouter(
+    async_engine,
+    [
+        create_async_engine(
+            to_async_url(url),
+            poolclass=metrics.instrumented_pool(asyncio=True),
+            **pool_options(),
+        )
+        for url in DATABASE_REPLICA_URLS
+    ],
+)
+
+metrics.register("db_pool", lambda: metrics.pool_status(engine.pool))
+metrics.register("async_db_pool", lambda: metrics.pool_status(async_engine.pool))
+metrics.register(
+    "replica_db_pools",
+    lambda: {
+        str(i): metrics.pool_status(replica.pool)
+        for i, replica in enumerate(replica_router.replicas)
+    },
+)
+metrics.register("replicas", replica_router.status)
+
+
+@event.listens_for(Session, "after_commit")
+def _committed(session: Session):
+    # lets the caller keep the client's next reads on the primary, see app.replicas
+    on_commit = session.info.get("on_commit")
+    if on_commit is not None:
+        on_commit()
+
 
 def get_db() -> Generator[Session]:
     session = session_maker()
@@ -17,50 +139,106 @@ def get_db() -> Generator[Session]:
         yield session
     finally:
         session.close()
-        print("closed db session")
+        logger.debug("closed db session")
+
+
+async def get_async_db(
+    on_commit: Optional[Callable[[], None]] = None,
+) -> AsyncGenerator[AsyncSession]:
+    session = async_session_maker(info={"on_commit": on_commit})
+    try:
+        yield session
+    finally:
+        await session.close()
+        logger.debug("closed async db session")
+
+
+async def get_async_read_db(
+    wrote_at: Optional[float] = None,
+) -> AsyncGenerator[AsyncSession]:
+    # a replica unless there is none, the client just wrote or replicas lag too far
+    bind = await replica_router.read_engine(wrote_at)
+    session = async_session_maker(bind=bind)
+    try:
+        yield session
+    finally:
+        await session.close()
+        logger.debug("closed async read db session")
 
 
 def init_db(
     bind: Engine | Connection = engine,
     datasets_path: str | None = None,
     limit: int | None = None,
+    bulk: bool = False,
 ):
-    db_exists = inspect(engine).get_table_names()
+    db_exists = inspect(bind).get_table_names()
     if db_exists:
         print("[*] Database already exists.")
         return
+    upgrade_db(bind)
     print("[*] Database initialized.")
-    from app.models import Base
-
-    Base.metadata.create_all(bind=bind)
     if not datasets_path:
         return
-    insert_data(datasets_path, TableName.USERS, bind, limit)
-    insert_data(datasets_path, TableName.TICKETS, bind, limit)
-    insert_data(datasets_path, TableName.ATTACHMENTS, bind, limit)
-    insert_data(datasets_path, TableName.MESSAGES, bind, limit)
+    if bulk:
+        bulk_insert_data(datasets_path, bind, limit)
+        return
+    insert_data(datasets_path, bind, limit)
 
 
 def drop_db(bind: Engine | Connection = engine):
     from app.models import Base
 
     Base.metadata.drop_all(bind=bind)
+    Table("alembic_version", MetaData()).drop(bind, checkfirst=True)
     print("[*] Database dropped.")
 
 
+def upgrade_db(bind: Engine | Connection = engine, revision: str = "head"):
+    # an engine gets a transaction committed here, a connection is left to its owner
+    with bind.begin() if isinstance(bind, Engine) else nullcontext(bind) as connection:
+        config = Config(ALEMBIC_INI)
+        config.attributes["connection"] = connection
+        tables = inspect(connection).get_table_names()
+        if tables and "alembic_version" not in tables:
+            command.stamp(config, BASELINE_REVISION)
+        command.upgrade(config, revision)
+
+
 def reset_db(
     bind: Engine | Connection = engine,
     datasets_path: Optional[str] = None,
     limit: int | None = None,
+    bulk: bool = False,
 ):
     drop_db(bind)
-    init_db(bind, datasets_path, limit)
+    init_db(bind, datasets_path, limit, bulk)
 
 
 # ---- inserting sample data ----
+def read_limited(
+    datasets_path: str, chunk_size: int, limit: int | None = None
+) -> Generator[Tuple[TableName, List[Any]]]:
+    # streams the dataset once, keeping at most limit rows of each table
+    taken: Counter = Counter()
+    for tablename, rows in read_dataset(datasets_path, chunk_size):
+        if limit:
+            rows = rows[: limit - taken[tablename]]
+        taken[tablename] += len(rows)
+        if rows:
+            yield tablename, rows
+
+
+_create_functions: Dict[TableName, Tuple[type, Callable]] = {
+    TableName.USERS: (schemas.UserCreate, crud.create_user),
+    TableName.TICKETS: (schemas.TicketCreate, crud.create_ticket),
+    TableName.ATTACHMENTS: (schemas.AttachmentCreate, crud.create_attachment),
+    TableName.MESSAGES: (schemas.MessageCreate, crud.create_message),
+}
+
+
 def insert_data(
     datasets_path: str,
-    tablename: TableName,
     bind: Engine | Connection = engine,
     limit: int | None = None,
 ):
@@ -69,47 +247,236 @@ def insert_data(
     db = session_maker()
 
     try:
-        with open(datasets_path, "r") as file:
-            try:
-                dataset_json = json.load(file)
-            except json.JSONDecodeError:
-                print(f'[!] File "{datasets_path}" is not json')
-                return
-        if not dataset_json:
-            print("no data")
-            return None
-        # create entries
-        print(f"[*] Inserting {tablename.value.capitalize()}...")
-        for i, entry in enumerate(dataset_json[tablename.value]):
-            if limit:
-                if i == limit:
-                    break
-
-            obj = None
-            if tablename is TableName.USERS:
-                user = schemas.UserCreate(**entry)
-                obj = crud.create_user(db, user)
-            elif tablename is TableName.TICKETS:
-                ticket = schemas.TicketCreate(**entry)
-                obj = crud.create_ticket(db, ticket)
-            elif tablename is TableName.ATTACHMENTS:
-                attachment = schemas.AttachmentCreate(**entry)
-                obj = crud.create_attachment(db, attachment)
-            elif tablename is TableName.MESSAGES:
-                message = schemas.MessageCreate(**entry)
-                obj = crud.create_message(db, message)
-
-            print(f"\t [+] {{{i}}} {obj}")
-        print(f"[*] {tablename.value.capitalize()} inserted.")
-
+        current = None
+        i = 0
+        for tablename, rows in read_limited(datasets_path, BULK_BATCH_SIZE, limit):
+            if tablename is not current:
+                if current:
+                    print(f"[*] {current.value.capitalize()} inserted.")
+                print(f"[*] Inserting {tablename.value.capitalize()}...")
+                current = tablename
+                i = 0
+            # create entries
+            schema, create = _create_functions[tablename]
+            for entry in rows:
+                obj = create(db, schema(**entry))
+                print(f"\t [+] {{{i}}} {obj}")
+                i += 1
+        if current:
+            print(f"[*] {current.value.capitalize()} inserted.")
+    except json.JSONDecodeError:
+        print(f'[!] File "{datasets_path}" is not json')
     finally:
         db.close()
 
 
+# ---- bulk loading ----
+# the same checks as the crud create functions, run once per batch with one IN query
+# per referenced table, then one executemany INSERT and one commit per batch
+def _existing(db: Session, column: ColumnElement, values: Set[Any]) -> Set[Any]:
+    if not values:
+        return set()
+    return set(db.scalars(select(column).where(column.in_(values))))
+
+
+def _check_users(db: Session, users: List[schemas.UserCreate]) -> List[StatusCode]:
+    # case-insensitive, as uq_users_username_lower and uq_users_email_lower
+    usernames = _existing(
+        db, func.lower(models.User.username), {u.username.lower() for u in users}
+    )
+    emails = _existing(
+        db, func.lower(models.User.email), {u.email.lower() for u in users}
+    )
+    status_codes = []
+    for user in users:
+        if user.username.lower() in usernames:
+            status_codes.append(StatusCode.UNAME_ALREADY_EXIST)
+        elif user.email.lower() in emails:
+            status_codes.append(StatusCode.EMAIL_ALREADY_EXIST)
+        else:
+            # later rows of the batch can't reuse them either
+            usernames.add(user.username.lower())
+            emails.add(user.email.lower())
+            status_codes.append(StatusCode.SUCCESS)
+    return status_codes
+
+
+def _check_tickets(
+    db: Session, tickets: List[schemas.TicketCreate]
+) -> List[StatusCode]:
+    user_ids = {t.issuer_id for t in tickets} | {
+        t.assignee_id for t in tickets if t.assignee_id is not None
+    }
+    users = _existing(db, models.User.id, user_ids)
+    status_codes = []
+    for ticket in tickets:
+        if ticket.issuer_id not in users:
+            status_codes.append(StatusCode.ISSUER_NOT_FOUND)
+        elif ticket.assignee_id is not None and ticket.assignee_id not in users:
+            status_codes.append(StatusCode.ASSIGNEE_NOT_FOUND)
+        elif ticket.issuer_id == ticket.assignee_id:
+            status_codes.append(StatusCode.SAME_ISSUER_AND_ASSIGNEE)
+        else:
+            status_codes.append(StatusCode.SUCCESS)
+    return status_codes
+
+
+def _check_attachments(
+    db: Session, attachments: List[schemas.AttachmentCreate]
+) -> List[StatusCode]:
+    ticket_ids = {a.ticket_id for a in attachments}
+    tickets = _existing(db, models.Ticket.id, ticket_ids)
+    files = {
+        tuple(row)
+        for row in db.execute(
+            select(
+                models.Attachment.ticket_id,
+                models.Attachment.filename,
+                models.Attachment.filetype,
+            ).where(models.Attachment.ticket_id.in_(ticket_ids))
+        )
+    }
+    status_codes = []
+    for attachment in attachments:
+        file = (attachment.ticket_id, attachment.filename, attachment.filetype)
+        if attachment.ticket_id not in tickets:
+            status_codes.append(StatusCode.TICKET_NOT_FOUND)
+        elif file in files:
+            status_codes.append(StatusCode.FILE_ALREADY_EXIST)
+        else:
+            files.add(file)
+            status_codes.append(StatusCode.SUCCESS)
+    return status_codes
+
+
+def _check_messages(
+    db: Session, messages: List[schemas.MessageCreate]
+) -> List[StatusCode]:
+    tickets = _existing(db, models.Ticket.id, {m.ticket_id for m in messages})
+    users = _existing(
+        db,
+        models.User.id,
+        {m.sender_id for m in messages} | {m.receiver_id for m in messages},
+    )
+    status_codes = []
+    for message in messages:
+        if not message.content:
+            status_codes.append(StatusCode.CONTENT_IS_EMPTY)
+        elif message.ticket_id not in tickets:
+            status_codes.append(StatusCode.TICKET_NOT_FOUND)
+        elif message.sender_id not in users:
+            status_codes.append(StatusCode.SENDER_NOT_FOUND)
+        elif message.receiver_id not in users:
+            status_codes.append(StatusCode.RECEIVER_NOT_FOUND)
+        elif message.sender_id == message.receiver_id:
+            status_codes.append(StatusCode.SAME_SENDER_AND_RECEIVER)
+        else:
+            status_codes.append(StatusCode.SUCCESS)
+    return status_codes
+
+
+def _user_rows(users: List[schemas.UserCreate]) -> List[Dict[str, Any]]:
+    # bcrypt dominates seeding, hash the whole batch across the hashing processes
+    passwords = [user.password for user in users]
+    chunksize = max(1, len(passwords) // (HASH_WORKERS * 4))
+    hashed_passwords = get_hash_executor().map(
+        security.hash_password, passwords, chunksize=chunksize
+    )
+    return [
+        user.model_dump(exclude={"password"}, exclude_none=True)
+        | {"hashed_password": hashed_password}
+        for user, hashed_password in zip(users, hashed_passwords)
+    ]
+
+
+def _rows(entries: List[Any]) -> List[Dict[str, Any]]:
+    # unset timestamps are left to the server defaults
+    return [entry.model_dump(exclude_none=True) for entry in entries]
+
+
+_bulk_tables: Dict[TableName, Tuple[type, type, Callable, Callable]] = {
+    TableName.USERS: (schemas.UserCreate, models.User, _check_users, _user_rows),
+    TableName.TICKETS: (
+        schemas.TicketCreate,
+        models.Ticket,
+        _check_tickets,
+        _rows,
+    ),
+    TableName.ATTACHMENTS: (
+        schemas.AttachmentCreate,
+        models.Attachment,
+        _check_attachments,
+        _rows,
+    ),
+    TableName.MESSAGES: (
+        schemas.MessageCreate,
+        models.Message,
+        _check_messages,
+        _rows,
+    ),
+}
+_adapters = {schema: TypeAdapter(List[schema]) for schema, *_ in _bulk_tables.values()}
+
+
+def _report(tablename: TableName, counts: Counter, elapsed: float):
+    inserted = counts[StatusCode.SUCCESS]
+    rate = inserted / elapsed if elapsed else 0
+    print(
+        f"[*] {inserted} {tablename.value} inserted in {elapsed:.2f}s"
+        f" ({rate:,.0f} rows/s)"
+    )
+    for status_code, count in counts.items():
+        if status_code is not StatusCode.SUCCESS:
+            print(f"\t [-] {count} skipped: {status_code.name}")
+
+
+def bulk_insert_data(
+    datasets_path: str,
+    bind: Engine | Connection = engine,
+    limit: int | None = None,
+    batch_size: int = BULK_BATCH_SIZE,
+) -> Dict[TableName, Counter]:
+    # returns the status code count of every table's rows
+    session_maker = sessionmaker(autocommit=False, autoflush=False, bind=bind)
+    results: Dict[TableName, Counter] = {}
+    current = None
+    start = time.perf_counter()
+    with session_maker() as db:
+        try:
+            for tablename, rows in read_limited(datasets_path, batch_size, limit):
+                schema, model, check, to_rows = _bulk_tables[tablename]
+                if tablename is not current:
+                    if current:
+                        _report(current, results[current], time.perf_counter() - start)
+                    print(f"[*] Bulk inserting {tablename.value.capitalize()}...")
+                    current = tablename
+                    start = time.perf_counter()
+                    results.setdefault(tablename, Counter())
+                batch = _adapters[schema].validate_python(rows)
+                status_codes = check(db, batch)
+                results[tablename].update(status_codes)
+                accepted = [
+                    entry
+                    for entry, status_code in zip(batch, status_codes)
+                    if status_code is StatusCode.SUCCESS
+                ]
+                if accepted:
+                    db.execute(insert(model), to_rows(accepted))
+                    db.commit()
+        except json.JSONDecodeError:
+            print(f'[!] File "{datasets_path}" is not json')
+        if current:
+            _report(current, results[current], time.perf_counter() - start)
+    return results
+
+
 if __name__ == "__main__":
     import sys
 
     argv = sys.argv
+    # --bulk goes with any command loading data
+    bulk = "--bulk" in argv
+    argv = [arg for arg in argv if arg != "--bulk"]
 
     def print_usage():
         print(
@@ -121,10 +488,16 @@ if __name__ == "__main__":
             "\tpython -m db --init\n",
             '\tpython -m db --init --data "app/datasets.json"\n',
             '\tpython -m db --init --data "app/datasets.json" --limit 1\n',
+            "[Upgrade database: apply new migrations]\n",
+            "\tpython -m db --upgrade\n",
             "[Reset database]\n",
             "\tpython -m db --reset\n",
             '\tpython -m db --reset --data "app/datasets.json"\n',
             '\tpython -m db --reset --data "app/datasets.json" --limit 1\n',
+            "[Bulk load: batched checks and inserts, parallel hashing]\n",
+            '\tpython -m db --reset --data "app/datasets.json" --bulk\n',
+            "[Newline-delimited input: one {\"table\": ..., \"row\": ...} per line]\n",
+            '\tpython -m db --reset --data "datasets.ndjson" --bulk\n',
         )
 
     if len(argv) not in [2, 4, 6]:
@@ -136,6 +509,8 @@ if __name__ == "__main__":
             drop_db()
         elif argv[1] == "--init":
             init_db()
+        elif argv[1] == "--upgrade":
+            upgrade_db()
         elif argv[1] == "--reset":
             reset_db()
         else:
@@ -143,12 +518,12 @@ if __name__ == "__main__":
     elif len(argv) == 4:
         if argv[1] == "--init" and argv[2] == "--data":
             try:
-                init_db(datasets_path=argv[3])
+                init_db(datasets_path=argv[3], bulk=bulk)
             except FileNotFoundError:
                 print(f'File "{argv[3]}" not found.')
         elif argv[1] == "--reset" and argv[2] == "--data":
             try:
-                reset_db(datasets_path=argv[3])
+                reset_db(datasets_path=argv[3], bulk=bulk)
             except FileNotFoundError:
                 print(f'File "{argv[3]}" not found.')
         else:
@@ -156,14 +531,14 @@ if __name__ == "__main__":
     elif len(argv) == 6:
         if argv[1] == "--init" and argv[2] == "--data" and argv[4] == "--limit":
             try:
-                init_db(datasets_path=argv[3], limit=int(argv[5]))
+                init_db(datasets_path=argv[3], limit=int(argv[5]), bulk=bulk)
             except FileNotFoundError:
                 print(f'File "{argv[3]}" not found.')
             except ValueError:
                 print(f'Limit "{argv[5]}" is not an integer.')
         elif argv[1] == "--reset" and argv[2] == "--data" and argv[4] == "--limit":
             try:
-                reset_db(datasets_path=argv[3], limit=int(argv[5]))
+                reset_db(datasets_path=argv[3], limit=int(argv[5]), bulk=bulk)
             except FileNotFoundError:
                 print(f'File "{argv[3]}" not found.')
             except ValueError:
@@ -0,0 +1,78 @@
+import asyncio
+import functools
+import multiprocessing
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, Optional, ParamSpec, TypeVar
+
+from app import metrics
+from app.config import HASH_QUEUE_SIZE, HASH_WORKERS
+
+P = ParamSpec("P")
+R = TypeVar("R")
+
+_hash_executor: Optional[ProcessPoolExecutor] = None
+# asyncio primitives are bound to one event loop, keep a semaphore per loop
+_hash_slots: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+_hash_stats = {"submitted": 0, "waiting": 0, "completed": 0}
+
+
+def get_hash_executor() -> ProcessPoolExecutor:
+    global _hash_executor
+    if _hash_executor is None:
+        # spawn: forking a process that already runs the logging and pool threads
+        # is unsafe
+        _hash_executor = ProcessPoolExecutor(
+            max_workers=HASH_WORKERS, mp_context=multiprocessing.get_context("spawn")
+        )
+    return _hash_executor
+
+
+def shutdown_executors():
+    global _hash_executor
+    if _hash_executor is not None:
+        _hash_executor.shutdown(wait=True, cancel_futures=True)
+        _hash_executor = None
+
+
+def _hash_slot() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    slot = _hash_slots.get(loop)
+    if slot is None:
+        # HASH_WORKERS running plus HASH_QUEUE_SIZE queued in the pool
+        slot = asyncio.Semaphore(HASH_WORKERS + HASH_QUEUE_SIZE)
+        _hash_slots[loop] = slot
+    return slot
+
+
+async def run_hash(func: Callable[P, R], *args: P.args, **kwargs: P.kwargs) -> R:
+    # runs in a worker process: func must be a module-level function and its
+    # arguments picklable
+    loop = asyncio.get_running_loop()
+    slot = _hash_slot()
+    _hash_stats["waiting"] += 1
+    try:
+        await slot.acquire()
+    finally:
+        _hash_stats["waiting"] -= 1
+    try:
+        _hash_stats["submitted"] += 1
+        return await loop.run_in_executor(
+            get_hash_executor(), functools.partial(func, *args, **kwargs)
+        )
+    finally:
+        _hash_stats["completed"] += 1
+        slot.release()
+
+
+def hash_pool_status() -> Dict[str, int]:
+    return {
+        "workers": HASH_WORKERS,
+        "queue_size": HASH_QUEUE_SIZE,
+        "in_flight": _hash_stats["submitted"] - _hash_stats["completed"],
+        "waiting": _hash_stats["waiting"],
+        "completed": _hash_stats["completed"],
+    }
+
+
+metrics.register("hash_pool", hash_pool_status)
@@ -0,0 +1,180 @@
+import argparse
+import csv
+import json
+import os
+import time
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from typing import IO, Any, Dict, List, Optional
+
+import orjson
+from sqlalchemy import Column, ColumnElement, exists, func, or_, select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.config import EXPORT_WATERMARK_MARGIN_SECONDS, EXPORT_YIELD_PER
+from app.db import session_maker
+
+# dumps of tickets with their attachments and messages. rows are streamed through
+# server-side cursors (yield_per), EXPORT_YIELD_PER at a time, so memory doesn't grow
+# with the table. with a watermark only rows changed at or after it are exported:
+# tickets by updated_at, attachments by updated_at, messages by edited_at. the
+# watermark kept between runs overlaps the previous export, rows exported twice are
+# meant to be upserted by id
+
+# (model, column telling when a row last changed)
+TABLES = {
+    "tickets": (models.Ticket, models.Ticket.updated_at),
+    "attachments": (models.Attachment, models.Attachment.updated_at),
+    "messages": (models.Message, models.Message.edited_at),
+}
+
+
+def _columns(model: type) -> List[Column]:
+    return list(model.__table__.columns)
+
+
+def _ticket_changed(since: datetime) -> ColumnElement[bool]:
+    # the ticket itself or anything attached to it
+    return or_(
+        models.Ticket.updated_at >= since,
+        exists().where(
+            models.Attachment.ticket_id == models.Ticket.id,
+            models.Attachment.updated_at >= since,
+        ),
+        exists().where(
+            models.Message.ticket_id == models.Ticket.id,
+            models.Message.edited_at >= since,
+        ),
+    )
+
+
+def export_ndjson(
+    db: Session,
+    out: IO[bytes],
+    since: Optional[datetime] = None,
+    yield_per: int = EXPORT_YIELD_PER,
+) -> int:
+    # one ticket per line, with its attachments and messages nested
+    stmt = select(*_columns(models.Ticket)).order_by(models.Ticket.id)
+    if since is not None:
+        stmt = stmt.where(_ticket_changed(since))
+    result = db.execute(stmt.execution_options(yield_per=yield_per))
+    exported = 0
+    for rows in result.partitions():
+        tickets = {
+            row.id: row._asdict() | {"attachments": [], "messages": []}
+            for row in rows
+        }
+        # the children of the whole chunk, one query per table
+        for key in ["attachments", "messages"]:
+            model, _ = TABLES[key]
+            children = db.execute(
+                select(*_columns(model))
+                .where(model.ticket_id.in_(tickets))
+                .order_by(model.id)
+            )
+            for child in children:
+                tickets[child.ticket_id][key].append(child._asdict())
+        for ticket in tickets.values():
+            out.write(orjson.dumps(ticket) + b"\n")
+        exported += len(tickets)
+    return exported
+
+
+def _csv_value(value: Any) -> Any:
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def export_csv(
+    db: Session,
+    out_dir: str,
+    since: Optional[datetime] = None,
+    yield_per: int = EXPORT_YIELD_PER,
+) -> Dict[str, int]:
+    # one <table>.csv per table
+    os.makedirs(out_dir, exist_ok=True)
+    exported = {}
+    for name, (model, changed_at) in TABLES.items():
+        columns = _columns(model)
+        stmt = select(*columns).order_by(model.id)
+        if since is not None:
+            stmt = stmt.where(changed_at >= since)
+        with open(os.path.join(out_dir, f"{name}.csv"), "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow([column.name for column in columns])
+            exported[name] = 0
+            for row in db.execute(stmt.execution_options(yield_per=yield_per)):
+                writer.writerow([_csv_value(value) for value in row])
+                exported[name] += 1
+    return exported
+
+
+def database_now(db: Session) -> datetime:
+    now = db.scalar(select(func.now()))
+    if isinstance(now, str):
+        # sqlite: CURRENT_TIMESTAMP, UTC without an offset
+        now = datetime.fromisoformat(now).replace(tzinfo=timezone.utc)
+    return now
+
+
+def export_watermark(db: Session) -> datetime:
+    # timestamps are as coarse as a second (sqlite) and taken when the writing
+    # transaction starts (postgres now()), so rows committed after an export can
+    # carry a time before it: the next export starts a margin earlier
+    return database_now(db) - timedelta(seconds=EXPORT_WATERMARK_MARGIN_SECONDS)
+
+
+def main(argv: List[str] | None = None):
+    parser = argparse.ArgumentParser(
+        prog="python -m app.export",
+        description="Export tickets with their attachments and messages.",
+    )
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument(
+        "--out", required=True, help="file for ndjson, directory for csv"
+    )
+    parser.add_argument(
+        "--since",
+        type=datetime.fromisoformat,
+        help="only rows changed at or after this time (ISO 8601)",
+    )
+    parser.add_argument(
+        "--state",
+        help="json file keeping the watermark between runs: read as --since when"
+        " present, then set to the time this export started less"
+        " EXPORT_WATERMARK_MARGIN_SECONDS",
+    )
+    args = parser.parse_args(argv)
+
+    since = args.since
+    if since is None and args.state and os.path.exists(args.state):
+        with open(args.state, "r") as file:
+            since = datetime.fromisoformat(json.load(file)["watermark"])
+
+    start = time.perf_counter()
+    with session_maker() as db:
+        # taken first: rows changed while the export runs are exported again next
+        # time rather than missed
+        watermark = export_watermark(db)
+        if args.format == "ndjson":
+            with open(args.out, "wb") as file:
+                exported = {"tickets": export_ndjson(db, file, since)}
+        else:
+            exported = export_csv(db, args.out, since)
+    elapsed = time.perf_counter() - start
+
+    if args.state:
+        with open(args.state, "w") as file:
+            json.dump({"watermark": watermark.isoformat()}, file)
+    counts = ", ".join(f"{count} {name}" for name, count in exported.items())
+    since_text = f" changed since {since.isoformat()}" if since else ""
+    print(f"[*] Exported {counts}{since_text} in {elapsed:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+import atexit
+import json
+import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, Optional
+
+from pydantic import BaseModel
+
+from app.config import (
+    LOG_LEVEL,
+    LOG_PAYLOAD_MAX_CHARS,
+    LOG_PAYLOAD_SAMPLE_RATE,
+    LOG_ROUTE_LEVELS,
+)
+
+ROOT_LOGGER = "app"
+ROUTE_LOGGER = "app.api"
+
+_listener: Optional[QueueListener] = None
+
+
+class JSONFormatter(logging.Formatter):
+    # runs on the listener thread, so payload serialization stays off the hot path
+    def format(self, record: logging.LogRecord) -> str:
+        entry: Dict[str, Any] = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", {}))
+        if hasattr(record, "payload"):
+            entry["payload"] = _serialize_payload(record.payload)
+        if record.exc_info:
+            entry["exc_info"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str)
+
+
+class DeferredQueueHandler(QueueHandler):
+    # the stock QueueHandler formats in the caller's thread; hand the record over
+    # as is and let the listener do the formatting
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+
+def _serialize_payload(payload: Any) -> Any:
+    if isinstance(payload, bytes):
+        text = payload.decode()
+    elif isinstance(payload, BaseModel):
+        text = payload.model_dump_json()
+    else:
+        text = json.dumps(payload, default=str)
+    if len(text) > LOG_PAYLOAD_MAX_CHARS:
+        return text[:LOG_PAYLOAD_MAX_CHARS] + f"...<{len(text)} chars>"
+    return json.loads(text)
+
+
+def _parse_route_levels(spec: str) -> Dict[str, str]:
+    levels = dict()
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        route, level = item.split("=", 1)
+        levels[route.strip()] = level.strip().upper()
+    return levels
+
+
+def setup_logging():
+    global _listener
+    if _listener is not None:
+        return
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(JSONFormatter())
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+
+    root = logging.getLogger(ROOT_LOGGER)
+    root.setLevel(LOG_LEVEL)
+    root.addHandler(DeferredQueueHandler(log_queue))
+    root.propagate = False
+    for route, level in _parse_route_levels(LOG_ROUTE_LEVELS).items():
+        logging.getLogger(f"{ROUTE_LOGGER}.{route}").setLevel(level)
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    global _listener
+    if _listener is None:
+        return
+    _listener.stop()
+    _listener = None
+    root = logging.getLogger(ROOT_LOGGER)
+    for handler in list(root.handlers):
+        if isinstance(handler, DeferredQueueHandler):
+            root.removeHandler(handler)
+
+
+def route_logger(route: str) -> logging.Logger:
+    return logging.getLogger(f"{ROUTE_LOGGER}.{route}")
+
+
+def log_response(route: str, payload: Any):
+    # nothing is built or queued unless debug is on for this route
+    logger = route_logger(route)
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if LOG_PAYLOAD_SAMPLE_RATE < 1.0 and random.random() >= LOG_PAYLOAD_SAMPLE_RATE:
+        return
+    logger.debug("response", extra={"fields": {"route": route}, "payload": payload})
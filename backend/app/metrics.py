@@ -0,0 +1,88 @@
+import threading
+import time
+from typing import Any, Callable, Dict
+
+from sqlalchemy import exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+
+# name -> callable returning a json-ready snapshot, served by /internal/metrics
+_sources: Dict[str, Callable[[], Dict[str, Any]]] = dict()
+
+
+def register(name: str, source: Callable[[], Dict[str, Any]]):
+    _sources[name] = source
+
+
+def snapshot() -> Dict[str, Dict[str, Any]]:
+    return {name: source() for name, source in _sources.items()}
+
+
+class PoolMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+
+    def record_wait(self, seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+
+    def as_dict(self, pool: Pool) -> Dict[str, Any]:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            wait = {
+                "total_ms": round(self.wait_total * 1000, 3),
+                "avg_ms": (
+                    round(self.wait_total * 1000 / attempts, 3) if attempts else 0.0
+                ),
+                "max_ms": round(self.wait_max * 1000, 3),
+            }
+            counters = {"checkouts": self.checkouts, "timeouts": self.timeouts}
+        status = dict()
+        if isinstance(pool, QueuePool):
+            status = {
+                "size": pool.size(),
+                "checked_in": pool.checkedin(),
+                "checked_out": pool.checkedout(),
+                "overflow": pool.overflow(),
+            }
+        return {**status, **counters, "wait": wait}
+
+
+def _instrumented(base: type[QueuePool], metrics: PoolMetrics) -> type[QueuePool]:
+    # a subclass per engine; recreate() and dispose() keep using the same class,
+    # so the counters survive a pool reset
+    class InstrumentedPool(base):
+        def _do_get(self):
+            start = time.perf_counter()
+            try:
+                connection = super()._do_get()
+            except exc.TimeoutError:
+                metrics.record_wait(time.perf_counter() - start, timed_out=True)
+                raise
+            metrics.record_wait(time.perf_counter() - start)
+            return connection
+
+    InstrumentedPool.__name__ = f"Instrumented{base.__name__}"
+    # sqlalchemy names a pool's logger after its class module: keep it under
+    # sqlalchemy.pool rather than app, whose handlers write the structured log
+    InstrumentedPool.__module__ = base.__module__
+    return InstrumentedPool
+
+
+def instrumented_pool(asyncio: bool = False) -> type[QueuePool]:
+    metrics = PoolMetrics()
+    pool_class = _instrumented(AsyncAdaptedQueuePool if asyncio else QueuePool, metrics)
+    pool_class.metrics = metrics
+    return pool_class
+
+
+def pool_status(pool: Pool) -> Dict[str, Any]:
+    return pool.metrics.as_dict(pool)
@@ -1,4 +1,4 @@
-from sqlalchemy import DateTime, ForeignKey, func, Enum
+from sqlalchemy import DateTime, ForeignKey, Index, UniqueConstraint, func, Enum, text
 from sqlalchemy.orm import (
     DeclarativeBase,
     Mapped,
@@ -21,8 +21,8 @@ class User(Base):
     __tablename__ = "users"
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     # details
-    username: Mapped[str] = mapped_column(unique=True, nullable=False)
-    email: Mapped[str] = mapped_column(unique=True, index=True)
+    username: Mapped[str] = mapped_column(nullable=False)
+    email: Mapped[str] = mapped_column()
     hashed_password: Mapped[str] = mapped_column(nullable=False)
     role: Mapped[UserRole] = mapped_column(Enum(UserRole), nullable=False)
     # dates
@@ -62,14 +62,42 @@ class User(Base):
         }
 
 
+# case-insensitive uniqueness, checked by the database on write; lookups compare
+# lower() on both sides to use them
+Index("uq_users_username_lower", func.lower(User.username), unique=True)
+Index("uq_users_email_lower", func.lower(User.email), unique=True)
+
+
 # tickets
+# tickets not closed out yet (GET /tickets?active=true). the planner only uses the
+# partial index for queries with this same predicate, values inlined
+TICKET_ACTIVE = text("status IN ('OPEN', 'IN_PROGRESS')")
+
+
 class Ticket(Base):
     __tablename__ = "tickets"
+    __table_args__ = (
+        # keyset pagination of listings
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        # listings filtered by status, in keyset order
+        Index("ix_tickets_status_created_at", "status", "created_at", "id"),
+        # an agent's tickets by status; also serves assignee_id alone
+        Index("ix_tickets_assignee_id_status", "assignee_id", "status"),
+        # the active queue in keyset order, a fraction of the table once resolved
+        # tickets pile up
+        Index(
+            "ix_tickets_active_created_at",
+            "created_at",
+            "id",
+            postgresql_where=TICKET_ACTIVE,
+            sqlite_where=TICKET_ACTIVE,
+        ),
+    )
     # ids
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
     issuer_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
     assignee_id: Mapped[Optional[int]] = mapped_column(
-        ForeignKey("users.id"), nullable=True, default=None, index=True
+        ForeignKey("users.id"), nullable=True, default=None
     )
     # details
     title: Mapped[str] = mapped_column(nullable=False, index=True)
@@ -119,9 +147,15 @@ class Ticket(Base):
 # attachments
 class Attachment(Base):
     __tablename__ = "attachments"
+    __table_args__ = (
+        # one file per name and type on a ticket; also serves ticket_id alone
+        UniqueConstraint(
+            "ticket_id", "filename", "filetype", name="uq_attachments_ticket_file"
+        ),
+    )
     # ids
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"), index=True)
+    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"))
     # details
     filename: Mapped[str] = mapped_column(nullable=False)
     filetype: Mapped[str] = mapped_column(nullable=False)
@@ -152,11 +186,17 @@ class Attachment(Base):
 # messages
 class Message(Base):
     __tablename__ = "messages"
+    __table_args__ = (
+        # a ticket's thread in order; also serves ticket_id alone
+        Index("ix_messages_ticket_id_sent_at", "ticket_id", "sent_at"),
+        # a user's inbox, latest first; also serves receiver_id alone
+        Index("ix_messages_receiver_id_sent_at", "receiver_id", "sent_at"),
+    )
     # ids
     id: Mapped[int] = mapped_column(primary_key=True, index=True)
-    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"), index=True)
+    ticket_id: Mapped[int] = mapped_column(ForeignKey("tickets.id"))
     sender_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
-    receiver_id: Mapped[int] = mapped_column(ForeignKey("users.id"), index=True)
+    receiver_id: Mapped[int] = mapped_column(ForeignKey("users.id"))
     # details
     content: Mapped[str] = mapped_column(nullable=False)
     # TODO: emojis
@@ -0,0 +1,129 @@
+import math
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+from app import metrics
+from app.config import (
+    LOGIN_ADDRESS_PER_MINUTE,
+    LOGIN_MAX_IN_FLIGHT,
+    LOGIN_USERNAME_PER_MINUTE,
+    RATE_LIMIT_MAX_KEYS,
+)
+
+# admission control in front of password checks: a token bucket per username and
+# per client address, and a cap on the password checks running at once. all of it
+# is checked before the database or bcrypt are touched
+
+
+class Rejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    def __init__(self, per_minute: float, max_keys: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = per_minute
+        self.rate = per_minute / 60  # tokens per second
+        self.max_keys = max_keys
+        # key -> (tokens, last refill), least recently used first
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _tokens(self, key: str, now: float) -> float:
+        tokens, last = self._buckets.get(key, (self.capacity, now))
+        return min(self.capacity, tokens + (now - last) * self.rate)
+
+    def wait(self, key: str, now: Optional[float] = None) -> float:
+        # like take, but leaves the bucket as it is
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            return max(0.0, (1 - self._tokens(key, now)) / self.rate)
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        # 0 when a token was taken, else seconds until one is available
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            tokens = self._tokens(key, now)
+            self._buckets.pop(key, None)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[key] = (tokens, now)
+            if len(self._buckets) > self.max_keys:
+                # the oldest bucket has had the longest time to refill
+                self._buckets.popitem(last=False)
+            return wait
+
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
+
+
+class LoginLimiter:
+    def __init__(self):
+        self.usernames = TokenBuckets(LOGIN_USERNAME_PER_MINUTE)
+        self.addresses = TokenBuckets(LOGIN_ADDRESS_PER_MINUTE)
+        self.max_in_flight = LOGIN_MAX_IN_FLIGHT
+        self.in_flight = 0
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        self.usernames.clear()
+        self.addresses.clear()
+        self.counters = {
+            "admitted": 0,
+            "limited_address": 0,
+            "limited_username": 0,
+            "rejected_busy": 0,
+        }
+
+    def _reject(self, reason: str, retry_after: float):
+        self.counters[reason] += 1
+        raise Rejected(reason, max(1, math.ceil(retry_after)))
+
+    @contextmanager
+    def admit(self, username: str, address: Optional[str]) -> Iterator[None]:
+        # raises Rejected instead of entering when over a limit
+        with self._lock:
+            if self.in_flight >= self.max_in_flight:
+                self._reject("rejected_busy", 1)
+            # both buckets are checked before either is charged: a locked username
+            # doesn't use up its address's budget
+            if address is not None:
+                wait = self.addresses.wait(address)
+                if wait:
+                    self._reject("limited_address", wait)
+            # logins match usernames case-insensitively, so do their buckets
+            wait = self.usernames.wait(username.lower())
+            if wait:
+                self._reject("limited_username", wait)
+            if address is not None:
+                self.addresses.take(address)
+            self.usernames.take(username.lower())
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def status(self) -> Dict[str, int]:
+        return {
+            **self.counters,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+        }
+
+
+login_limiter = LoginLimiter()
+metrics.register("login_limiter", login_limiter.status)
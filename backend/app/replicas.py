@@ -0,0 +1,113 @@
+import math
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from app.config import REPLICA_LAG_CHECK_SECONDS, REPLICA_MAX_LAG_SECONDS
+
+# read-only endpoints read from replicas of the primary, round-robin. a client that
+# committed within the last max_lag seconds reads from the primary so it sees its
+# own writes, replicas lagging further behind are skipped, and with no replica
+# left reads fall back to the primary. the time of the client's last commit comes
+# with the request (the api keeps it in a cookie), so any worker process can tell
+
+# seconds the replica is behind: 0 when it replayed all it received, which keeps an
+# idle primary from looking like lag
+_LAG_QUERIES = {
+    "postgresql": (
+        "SELECT CASE WHEN NOT pg_is_in_recovery()"
+        " OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+        " ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+    ),
+}
+
+
+class ReplicaRouter:
+    def __init__(
+        self,
+        primary: AsyncEngine,
+        replicas: List[AsyncEngine],
+        max_lag: float = REPLICA_MAX_LAG_SECONDS,
+    ):
+        self.primary = primary
+        self.replicas = replicas
+        self.max_lag = max_lag
+        self._turn = 0
+        # replica -> (lag, measured at)
+        self._lags: Dict[AsyncEngine, Tuple[float, float]] = {}
+        self._lock = threading.Lock()
+        self.counters: Dict[str, int] = {}
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self._lags.clear()
+        self.counters = {
+            "replica": 0,
+            "primary_no_replicas": 0,
+            "primary_read_after_write": 0,
+            "primary_lagging": 0,
+            "lagging_skipped": 0,
+        }
+
+    def _wrote_recently(self, wrote_at: Optional[float]) -> bool:
+        # wrote_at is a unix time sent by the client: one from the future doesn't pin
+        if wrote_at is None:
+            return False
+        return 0 <= time.time() - wrote_at < self.max_lag
+
+    def _next_replica(self) -> AsyncEngine:
+        with self._lock:
+            replica = self.replicas[self._turn % len(self.replicas)]
+            self._turn += 1
+        return replica
+
+    async def _lag(self, replica: AsyncEngine, now: float) -> float:
+        query = _LAG_QUERIES.get(replica.dialect.name)
+        if query is None:
+            return 0.0
+        lag, measured = self._lags.get(replica, (0.0, -math.inf))
+        if now - measured < REPLICA_LAG_CHECK_SECONDS:
+            return lag
+        try:
+            async with replica.connect() as connection:
+                lag = float(await connection.scalar(text(query)) or 0)
+        except (DBAPIError, OSError):
+            # unreachable counts as too far behind until the next check
+            lag = math.inf
+        self._lags[replica] = (lag, now)
+        return lag
+
+    async def read_engine(self, wrote_at: Optional[float] = None) -> AsyncEngine:
+        now = time.monotonic()
+        if not self.replicas:
+            self.counters["primary_no_replicas"] += 1
+            return self.primary
+        if self._wrote_recently(wrote_at):
+            self.counters["primary_read_after_write"] += 1
+            return self.primary
+        for _ in range(len(self.replicas)):
+            replica = self._next_replica()
+            if await self._lag(replica, now) <= self.max_lag:
+                self.counters["replica"] += 1
+                return replica
+            self.counters["lagging_skipped"] += 1
+        self.counters["primary_lagging"] += 1
+        return self.primary
+
+    def status(self) -> Dict[str, Any]:
+        with self._lock:
+            lags = [self._lags.get(replica, (None,))[0] for replica in self.replicas]
+        return {
+            "replicas": len(self.replicas),
+            "lag_seconds": lags,
+            "reads": dict(self.counters),
+        }
+
+    async def dispose(self):
+        for replica in self.replicas:
+            await replica.dispose()
@@ -0,0 +1,55 @@
+from functools import cache
+from typing import Any, List
+
+import orjson
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter
+
+from app import models, schemas
+
+# response bodies are serialized once, straight to bytes: pydantic models through
+# their compiled TypeAdapter, everything else through orjson, which handles the
+# UserRole/TicketStatus/TicketCategory enums and datetimes natively
+
+
+@cache
+def adapter(model: type) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+# compile the adapters for the response models up front
+for _model in (
+    schemas.UserOut,
+    schemas.TicketOut,
+    schemas.TicketPage,
+    schemas.AttachmentOut,
+    schemas.MessageOut,
+):
+    adapter(_model)
+    adapter(List[_model])
+
+
+def _default(obj: Any) -> Any:
+    # models nested in lists/dicts, e.g. batch reads
+    if isinstance(obj, BaseModel):
+        return orjson.Fragment(adapter(type(obj)).dump_json(obj))
+    if isinstance(obj, models.Base):
+        return obj.as_dict()
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+def encode(content: Any) -> bytes:
+    if isinstance(content, BaseModel):
+        return adapter(type(content)).dump_json(content)
+    if isinstance(content, models.Base):
+        content = content.as_dict()
+    return orjson.dumps(content, default=_default)
+
+
+class FastJSONResponse(Response):
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return encode(content)
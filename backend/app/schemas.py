@@ -1,8 +1,22 @@
 from datetime import datetime
-from typing import Optional
-from pydantic import BaseModel, ConfigDict, EmailStr
-
-from app.constants import UserRole, TicketStatus, TicketCategory
+from typing import Any, Dict, List, Literal, Optional, Union
+from pydantic import (
+    BaseModel,
+    ConfigDict,
+    EmailStr,
+    Field,
+    field_validator,
+    model_validator,
+)
+
+from app.config import BATCH_MAX_OPERATIONS
+from app.constants import (
+    TableName,
+    UserRole,
+    TicketStatus,
+    TicketCategory,
+    TicketSort,
+)
 
 
 class ORMBase(BaseModel):
@@ -40,6 +54,25 @@ class UserRef(ORMBase):
     username: str
 
 
+class UserLogin(ORMBase):
+    username: str
+    password: str
+
+
+# session tokens
+class TokenClaims(ORMBase):
+    sub: int  # user id
+    role: UserRole
+    exp: int  # unix time
+    jti: str  # token id, used for revocation
+
+
+class TokenOut(ORMBase):
+    access_token: str
+    token_type: str = "bearer"
+    expires_at: int
+
+
 # tickets
 class TicketBase(ORMBase):
     title: str
@@ -75,6 +108,25 @@ class TicketRef(ORMBase):
     title: str
 
 
+class TicketQuery(ORMBase):
+    status: Optional[TicketStatus] = None
+    # only tickets still open or in progress
+    active: bool = False
+    category: Optional[TicketCategory] = None
+    issuer_id: Optional[int] = None
+    assignee_id: Optional[int] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+    sort: TicketSort = TicketSort.CREATED_AT_DESC
+    limit: int = Field(default=20, ge=1, le=100)
+    cursor: Optional[str] = None
+
+
+class TicketPage(ORMBase):
+    items: List[TicketOut]
+    next_cursor: Optional[str] = None
+
+
 # attachments
 class AttachmentBase(ORMBase):
     filename: str
@@ -125,3 +177,55 @@ class MessageOut(MessageBase):
     sender: UserRef
     receiver: UserRef
     ticket: TicketRef
+
+
+# batch writes, POST /batch
+class BatchRef(BaseModel):
+    # the id of the row an earlier operation of the same batch wrote
+    ref: int = Field(ge=0)
+
+
+class BatchOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    resource: TableName
+    # the row to update or delete
+    id: Optional[Union[int, BatchRef]] = None
+    # fields of the resource's Create/Update schema; ids may be given as a BatchRef
+    data: Dict[str, Any] = {}
+
+    @field_validator("data")
+    @classmethod
+    def parse_refs(cls, data: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            key: BatchRef.model_validate(val) if isinstance(val, dict) else val
+            for key, val in data.items()
+        }
+
+    @model_validator(mode="after")
+    def check_shape(self) -> "BatchOperation":
+        if (self.id is None) != (self.op == "create"):
+            raise ValueError("update and delete take an id, create doesn't")
+        if self.op == "delete" and self.data:
+            raise ValueError("delete takes no data")
+        return self
+
+    def refs(self) -> List[BatchRef]:
+        values = [self.id, *self.data.values()]
+        return [val for val in values if isinstance(val, BatchRef)]
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation] = Field(
+        min_length=1, max_length=BATCH_MAX_OPERATIONS
+    )
+
+    @model_validator(mode="after")
+    def check_refs(self) -> "BatchRequest":
+        for i, operation in enumerate(self.operations):
+            for ref in operation.refs():
+                if ref.ref >= i:
+                    raise ValueError(
+                        f"operation {i} refers to operation {ref.ref}, only earlier"
+                        " operations can be referred to"
+                    )
+        return self
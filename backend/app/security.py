@@ -1,11 +1,70 @@
+import time
+
 import bcrypt
 
-def hash_password(plain_password: str) -> str:
+from app.config import BCRYPT_ROUNDS, LOGIN_LATENCY_BUDGET_MS
+
+def hash_password(plain_password: str, rounds: int = BCRYPT_ROUNDS) -> str:
     plain_bytes = plain_password.encode("utf-8")
-    hashed_bytes = bcrypt.hashpw(plain_bytes, bcrypt.gensalt())
+    hashed_bytes = bcrypt.hashpw(plain_bytes, bcrypt.gensalt(rounds))
     return hashed_bytes.decode("utf-8")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     plain_bytes = plain_password.encode("utf-8")
     hashed_bytes = hashed_password.encode("utf-8")
     return bcrypt.checkpw(plain_bytes, hashed_bytes)
+
+def hash_rounds(hashed_password: str) -> int:
+    # "$2b$<rounds>$<salt + hash>"
+    return int(hashed_password.split("$")[2])
+
+def needs_rehash(hashed_password: str, rounds: int = BCRYPT_ROUNDS) -> bool:
+    return hash_rounds(hashed_password) != rounds
+
+def calibrate(budget_ms: float = LOGIN_LATENCY_BUDGET_MS) -> list[tuple[int, float]]:
+    # hash time per cost, from the minimum up to the first cost over the budget
+    timings = []
+    for rounds in range(4, 32):
+        start = time.perf_counter()
+        hash_password("calibration", rounds)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        timings.append((rounds, elapsed_ms))
+        if elapsed_ms > budget_ms:
+            break
+    return timings
+
+
+if __name__ == "__main__":
+    import sys
+
+    argv = sys.argv
+
+    def print_usage():
+        print(
+            "Usage:\n",
+            "----------------------------------------------------------\n",
+            "[Recommend a bcrypt cost for the login latency budget]\n",
+            "\tpython -m app.security --calibrate\n",
+            "\tpython -m app.security --calibrate --budget-ms 250\n",
+        )
+
+    budget_ms = LOGIN_LATENCY_BUDGET_MS
+    if len(argv) == 4 and argv[1] == "--calibrate" and argv[2] == "--budget-ms":
+        try:
+            budget_ms = float(argv[3])
+        except ValueError:
+            print(f'Budget "{argv[3]}" is not a number.')
+            sys.exit(1)
+    elif argv[1:] != ["--calibrate"]:
+        print_usage()
+        sys.exit(1)
+
+    timings = calibrate(budget_ms)
+    for rounds, elapsed_ms in timings:
+        mark = " (current)" if rounds == BCRYPT_ROUNDS else ""
+        print(f"\tcost {rounds:>2}: {elapsed_ms:9.1f} ms{mark}")
+    fitting = [rounds for rounds, elapsed_ms in timings if elapsed_ms <= budget_ms]
+    if fitting:
+        print(f"[*] Recommended BCRYPT_ROUNDS={fitting[-1]} for {budget_ms:g} ms")
+    else:
+        print(f"[*] Even the minimum cost takes longer than {budget_ms:g} ms")
@@ -0,0 +1,69 @@
+import base64
+import hashlib
+import hmac
+import secrets
+import threading
+import time
+import uuid
+from typing import Dict, Optional
+
+import pydantic
+
+from app import schemas
+from app.config import TOKEN_SECRET, TOKEN_TTL_SECONDS
+from app.constants import UserRole
+
+# session tokens: "<payload>.<signature>", both base64url without padding. the
+# payload is the json of schemas.TokenClaims, the signature its HMAC-SHA256.
+# checking a token costs one HMAC and a dict lookup, no bcrypt and no database
+
+_key = (TOKEN_SECRET or secrets.token_hex(32)).encode("utf-8")
+
+# revoked token ids -> expiry, pruned once the token would have expired anyway
+_revoked: Dict[str, int] = {}
+_revoked_lock = threading.Lock()
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.urlsafe_b64encode(data).rstrip(b"=").decode("ascii")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.urlsafe_b64decode(text + "=" * (-len(text) % 4))
+
+
+def _sign(payload: str) -> str:
+    return _b64encode(hmac.digest(_key, payload.encode("ascii"), hashlib.sha256))
+
+
+def issue_token(
+    user_id: int, role: UserRole, ttl: int = TOKEN_TTL_SECONDS
+) -> schemas.TokenOut:
+    claims = schemas.TokenClaims(
+        sub=user_id, role=role, exp=int(time.time()) + ttl, jti=uuid.uuid4().hex
+    )
+    payload = _b64encode(claims.model_dump_json().encode("utf-8"))
+    return schemas.TokenOut(
+        access_token=f"{payload}.{_sign(payload)}", expires_at=claims.exp
+    )
+
+
+def decode_token(token: str) -> Optional[schemas.TokenClaims]:
+    payload, _, signature = token.partition(".")
+    try:
+        if not hmac.compare_digest(signature, _sign(payload)):
+            return None
+        claims = schemas.TokenClaims.model_validate_json(_b64decode(payload))
+    except (TypeError, ValueError, pydantic.ValidationError):
+        return None
+    if claims.exp <= time.time() or claims.jti in _revoked:
+        return None
+    return claims
+
+
+def revoke_token(claims: schemas.TokenClaims):
+    now = time.time()
+    with _revoked_lock:
+        for jti in [jti for jti, exp in _revoked.items() if exp <= now]:
+            del _revoked[jti]
+        _revoked[claims.jti] = claims.exp
@@ -0,0 +1,95 @@
+# creating attachments next to a large table: the old existence pre-check (a
+# SELECT over attachments x tickets) then INSERT, against crud.create_attachment
+# sending only the INSERT, with uq_attachments_ticket_file and the ticket foreign
+# key reporting duplicates and missing tickets (postgres; on sqlite the ticket is
+# still looked up first). replaces the database with synthetic data
+#   python -m benchmarks.bench_attachments [attachments, default 1000000] [creates, 200]
+import sys
+import time
+import warnings
+from typing import Callable
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas
+from app.constants import StatusCode
+from app.datagen import Generator, write_db
+from app.db import session_maker
+
+# the cartesian product is the point
+warnings.filterwarnings("ignore", "SELECT statement has a cartesian product")
+
+
+def precheck_create(
+    db: Session, attachment: schemas.AttachmentCreate
+) -> StatusCode:
+    # crud.create_attachment before the constraints
+    if db.get(models.Ticket, attachment.ticket_id) is None:
+        return StatusCode.TICKET_NOT_FOUND
+    exists = db.execute(
+        select(models.Attachment).where(
+            models.Ticket.id == attachment.ticket_id,
+            models.Attachment.filename == attachment.filename,
+            models.Attachment.filetype == attachment.filetype,
+        )
+    ).first()
+    if exists:
+        return StatusCode.FILE_ALREADY_EXIST
+    db.add(models.Attachment(**attachment.model_dump()))
+    db.commit()
+    return StatusCode.SUCCESS
+
+
+def optimistic_create(
+    db: Session, attachment: schemas.AttachmentCreate
+) -> StatusCode:
+    return crud.create_attachment(db, attachment)[1]
+
+
+def files(name: str, tickets: int, creates: int, ticket_offset: int = 1):
+    return [
+        schemas.AttachmentCreate(
+            ticket_id=i % tickets + ticket_offset,
+            filename=f"{name}_{i}.png",
+            filetype="png",
+            filesize=1024,
+        )
+        for i in range(creates)
+    ]
+
+
+def measure(name: str, create: Callable, tickets: int, creates: int):
+    with session_maker() as db:
+        existing = files(name, tickets, creates)
+        for label, attachments, expected in [
+            ("new", existing, StatusCode.SUCCESS),
+            ("duplicate", existing, StatusCode.FILE_ALREADY_EXIST),
+            (
+                "no ticket",
+                files(name, tickets, creates, ticket_offset=tickets + 1),
+                StatusCode.TICKET_NOT_FOUND,
+            ),
+        ]:
+            start = time.perf_counter()
+            for attachment in attachments:
+                assert create(db, attachment) is expected
+            elapsed = (time.perf_counter() - start) / creates * 1000
+            print(f"\t{name:>10} {label:>9}: {elapsed:8.2f} ms/attachment")
+
+
+def main():
+    attachments = int(sys.argv[1]) if len(sys.argv) > 1 else 1_000_000
+    creates = int(sys.argv[2]) if len(sys.argv) > 2 else 200
+    tickets = max(1, attachments // 10)
+    start = time.perf_counter()
+    write_db(Generator(0, max(2, tickets // 50), tickets, attachments, 0))
+    elapsed = time.perf_counter() - start
+    print(f"[*] {tickets} tickets, {attachments} attachments loaded in {elapsed:.0f}s")
+    # the pre-check scans attachments for every ticket row it joins, keep it short
+    measure("pre-check", precheck_create, tickets, max(1, creates // 20))
+    measure("optimistic", optimistic_create, tickets, creates)
+
+
+if __name__ == "__main__":
+    main()
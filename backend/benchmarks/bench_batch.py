@@ -0,0 +1,102 @@
+# a ticket with a message and an attachment: three POSTs (three transactions,
+# three commits) against one POST /batch (one transaction, one commit).
+# replaces the database
+#   python -m benchmarks.bench_batch [threads, default 300]
+import asyncio
+import sys
+import time
+
+import httpx
+from sqlalchemy import event
+
+from app import crud, schemas, constants
+from app.api import app
+from app.db import async_engine, get_db, reset_db
+
+commits = 0
+
+
+@event.listens_for(async_engine.sync_engine, "commit")
+def count(*args):
+    global commits
+    commits += 1
+
+
+def seed():
+    db = next(get_db())
+    try:
+        reset_db(bind=db.get_bind())
+        for i in range(2):
+            crud.create_user(
+                db,
+                schemas.UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@gmail.com",
+                    password="123",
+                    role=constants.UserRole.CLIENT,
+                ),
+            )
+    finally:
+        db.close()
+
+
+def ticket(i: int) -> dict:
+    return {
+        "issuer_id": 1,
+        "title": f"Benchmark ticket {i}",
+        "status": "open",
+        "description": "Benchmark ticket",
+    }
+
+
+def message(ticket_id) -> dict:
+    return {"ticket_id": ticket_id, "sender_id": 1, "receiver_id": 2, "content": "hi"}
+
+
+def attachment(ticket_id) -> dict:
+    return {"ticket_id": ticket_id, "filename": "log", "filetype": "txt", "filesize": 1}
+
+
+async def separate(client: httpx.AsyncClient, i: int):
+    response = await client.post("/tickets", json=ticket(i))
+    ticket_id = response.json()["id"]
+    for path, data in [("/messages", message), ("/attachments", attachment)]:
+        response = await client.post(path, json=data(ticket_id))
+        response.raise_for_status()
+
+
+async def batched(client: httpx.AsyncClient, i: int):
+    operations = [
+        {"op": "create", "resource": resource, "data": data}
+        for resource, data in [
+            ("tickets", ticket(i)),
+            ("messages", message({"ref": 0})),
+            ("attachments", attachment({"ref": 0})),
+        ]
+    ]
+    response = await client.post("/batch", json={"operations": operations})
+    assert response.json()["committed"]
+
+
+async def main():
+    global commits
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 300
+    seed()
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    print(f"[*] ticket + message + attachment x{threads}")
+    async with client:
+        for label, write in [("3 POSTs", separate), ("POST /batch", batched)]:
+            commits = 0
+            start = time.perf_counter()
+            for i in range(threads):
+                await write(client, i)
+            elapsed = (time.perf_counter() - start) / threads * 1000
+            print(
+                f"\t{label:>12}: {elapsed:6.2f} ms/thread"
+                f"  {commits / threads:3.1f} commits/thread"
+            )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
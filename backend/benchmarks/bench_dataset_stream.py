@@ -0,0 +1,61 @@
+# peak memory and time to read a dataset: json.load against app.datasets streaming
+#   python -m benchmarks.bench_dataset_stream [messages, default 300000]
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from app.datasets import read_dataset
+
+CHUNK_SIZE = 5_000
+
+
+def write_dataset(path: str, messages: int):
+    with open(path, "w") as file:
+        file.write('{"users": [], "tickets": [], "attachments": [], "messages": [')
+        for i in range(messages):
+            message = {
+                "ticket_id": i % 1000 + 1,
+                "sender_id": 1,
+                "receiver_id": 2,
+                "content": f"message {i}: the printer on the second floor is jammed",
+            }
+            file.write(("," if i else "") + json.dumps(message))
+        file.write("]}")
+
+
+def json_load(path: str) -> int:
+    with open(path) as file:
+        return sum(len(rows) for rows in json.load(file).values())
+
+
+def streamed(path: str) -> int:
+    return sum(len(rows) for _, rows in read_dataset(path, CHUNK_SIZE))
+
+
+def measure(func, path: str):
+    tracemalloc.start()
+    start = time.perf_counter()
+    rows = func(path)
+    elapsed = time.perf_counter() - start
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return rows, elapsed, peak / 2**20
+
+
+def main():
+    messages = int(sys.argv[1]) if len(sys.argv) > 1 else 300_000
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "datasets.json")
+        write_dataset(path, messages)
+        size = os.path.getsize(path) / 2**20
+        print(f"{messages} messages, {size:.1f} MiB")
+        for name, func in [("json.load", json_load), ("read_dataset", streamed)]:
+            rows, elapsed, peak = measure(func, path)
+            print(f"\t{name:>12}: {rows} rows {elapsed:6.2f}s  peak {peak:8.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
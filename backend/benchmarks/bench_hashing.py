@@ -0,0 +1,56 @@
+# password checks per second through the bcrypt process pool, per worker count
+#   python -m benchmarks.bench_hashing [worker counts, default 1 2 4 <cpus>]
+import asyncio
+import os
+import subprocess
+import sys
+import time
+
+LOGINS = 64
+
+
+async def logins_per_second() -> float:
+    from app import executor, security
+
+    hashed = security.hash_password("123")
+    # warm up: start the worker processes
+    await asyncio.gather(
+        *(
+            executor.run_hash(security.verify_password, "123", hashed)
+            for _ in range(executor.HASH_WORKERS)
+        )
+    )
+    start = time.perf_counter()
+    await asyncio.gather(
+        *(
+            executor.run_hash(security.verify_password, "123", hashed)
+            for _ in range(LOGINS)
+        )
+    )
+    elapsed = time.perf_counter() - start
+    executor.shutdown_executors()
+    return LOGINS / elapsed
+
+
+def main():
+    if os.getenv("BENCH_CHILD"):
+        print(f"{asyncio.run(logins_per_second()):.1f}")
+        return
+    counts = [int(arg) for arg in sys.argv[1:]]
+    counts = counts or sorted({1, 2, 4, os.cpu_count() or 1})
+    print(f"{LOGINS} concurrent logins, {os.cpu_count()} cpus")
+    for workers in counts:
+        # HASH_WORKERS is read at import, run each count in a fresh interpreter
+        env = dict(os.environ, HASH_WORKERS=str(workers), BENCH_CHILD="1")
+        out = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_hashing"],
+            env=env,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        print(f"\t{workers:>3} workers: {float(out.stdout):8.1f} logins/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+# EXPLAIN ANALYZE of the hot queries with the indexes of migration 0002, then with
+# the indexes of 0001 they replaced. replaces the database with synthetic data,
+# postgres only
+#   python -m benchmarks.bench_indexes [tickets, default 100000] [messages, 500000]
+import sys
+import time
+from typing import List, Tuple
+
+from sqlalchemy import Connection, Select, func, select, text
+
+from app import models
+from app.constants import TicketStatus
+from app.datagen import Generator, write_db
+from app.db import engine
+
+LIMIT = 50
+
+# built by migration 0002
+NEW_INDEXES = [
+    "ix_tickets_created_at_id",
+    "ix_tickets_status_created_at",
+    "ix_tickets_assignee_id_status",
+    "ix_tickets_active_created_at",
+    "ix_messages_ticket_id_sent_at",
+    "ix_messages_receiver_id_sent_at",
+]
+# the 0001 side of migration 0002
+OLD_INDEXES = [
+    "ix_tickets_assignee_id ON tickets (assignee_id)",
+    "ix_messages_ticket_id ON messages (ticket_id)",
+    "ix_messages_receiver_id ON messages (receiver_id)",
+]
+
+Ticket, Message = models.Ticket, models.Message
+
+
+def busiest(connection: Connection, column) -> int:
+    return connection.scalar(
+        select(column)
+        .where(column.is_not(None))
+        .group_by(column)
+        .order_by(func.count().desc())
+        .limit(1)
+    )
+
+
+def cases(connection: Connection) -> List[Tuple[str, str, Select]]:
+    # (query, the index meant for it, statement)
+    assignee = busiest(connection, Ticket.assignee_id)
+    ticket = busiest(connection, Message.ticket_id)
+    receiver = busiest(connection, Message.receiver_id)
+    return [
+        (
+            "tickets, keyset page",
+            "ix_tickets_created_at_id",
+            select(Ticket).order_by(Ticket.created_at, Ticket.id).limit(LIMIT),
+        ),
+        (
+            "tickets by status, keyset page",
+            "ix_tickets_status_created_at",
+            select(Ticket)
+            .where(Ticket.status == TicketStatus.OPEN)
+            .order_by(Ticket.created_at, Ticket.id)
+            .limit(LIMIT),
+        ),
+        (
+            "an agent's tickets in progress",
+            "ix_tickets_assignee_id_status",
+            select(Ticket).where(
+                Ticket.assignee_id == assignee,
+                Ticket.status == TicketStatus.IN_PROGRESS,
+            ),
+        ),
+        (
+            "active tickets, oldest first (GET /tickets?active=true)",
+            "ix_tickets_active_created_at",
+            select(Ticket)
+            .where(models.TICKET_ACTIVE)
+            .order_by(Ticket.created_at, Ticket.id)
+            .limit(LIMIT),
+        ),
+        (
+            "a ticket's thread",
+            "ix_messages_ticket_id_sent_at",
+            select(Message)
+            .where(Message.ticket_id == ticket)
+            .order_by(Message.sent_at)
+            .limit(LIMIT),
+        ),
+        (
+            "an inbox, latest first",
+            "ix_messages_receiver_id_sent_at",
+            select(Message)
+            .where(Message.receiver_id == receiver)
+            .order_by(Message.sent_at.desc())
+            .limit(LIMIT),
+        ),
+    ]
+
+
+def explain(connection: Connection, stmt: Select) -> List[str]:
+    sql = stmt.compile(engine, compile_kwargs={"literal_binds": True})
+    return list(connection.scalars(text(f"EXPLAIN (ANALYZE, BUFFERS) {sql}")))
+
+
+def index_size(connection: Connection, name: str) -> str:
+    return connection.scalar(text(f"SELECT pg_size_pretty(pg_relation_size('{name}'))"))
+
+
+def main():
+    if engine.dialect.name != "postgresql":
+        sys.exit("postgres only: EXPLAIN output differs elsewhere")
+    tickets = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    messages = int(sys.argv[2]) if len(sys.argv) > 2 else 500_000
+    start = time.perf_counter()
+    write_db(Generator(0, tickets // 50, tickets, tickets // 2, messages))
+    with engine.connect() as connection:
+        connection.execute(text("ANALYZE"))
+        connection.commit()
+        elapsed = time.perf_counter() - start
+        print(f"[*] {tickets} tickets, {messages} messages loaded in {elapsed:.0f}s")
+
+        queries = cases(connection)
+        plans = {query: [explain(connection, stmt)] for query, _, stmt in queries}
+        sizes = {index: index_size(connection, index) for _, index, _ in queries}
+        # postgres DDL is transactional: back to 0001 for a moment, then rolled back
+        for index in NEW_INDEXES:
+            connection.execute(text(f"DROP INDEX {index}"))
+        for index in OLD_INDEXES:
+            connection.execute(text(f"CREATE INDEX {index}"))
+        for query, _, stmt in queries:
+            plans[query].append(explain(connection, stmt))
+        connection.rollback()
+
+    for query, index, _ in queries:
+        print(f"\n[*] {query}: {index} ({sizes[index]})")
+        for label, plan in zip(["0002", "0001"], plans[query]):
+            print(f"\t{label}:")
+            for line in plan:
+                print(f"\t\t{line}")
+
+
+if __name__ == "__main__":
+    main()
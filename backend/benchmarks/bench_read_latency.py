@@ -0,0 +1,108 @@
+# p99 latency of GET /tickets/{id} with and without concurrent logins: reads run
+# on the event loop through the async driver, bcrypt in the hash process pool, so
+# logins should barely move read latency. replaces the database
+#   python -m benchmarks.bench_read_latency
+import asyncio
+import os
+import statistics
+import time
+
+import httpx
+
+# measure the logins themselves, not the login rate limiter
+os.environ.setdefault("LOGIN_USERNAME_PER_MINUTE", "1e9")
+os.environ.setdefault("LOGIN_ADDRESS_PER_MINUTE", "1e9")
+os.environ.setdefault("LOGIN_MAX_IN_FLIGHT", "1000")
+
+from app import crud, schemas, constants
+from app.api import app
+from app.db import get_db, reset_db
+
+TICKET_REQUESTS = 200
+TICKET_CONCURRENCY = 10
+LOGIN_CONCURRENCY = 10
+
+
+def seed() -> int:
+    db = next(get_db())
+    try:
+        reset_db(bind=db.get_bind())
+        roles = [constants.UserRole.CLIENT, constants.UserRole.SUPPORT]
+        for i, role in enumerate(roles):
+            crud.create_user(
+                db,
+                schemas.UserCreate(
+                    username=f"user{i}",
+                    email=f"user{i}@gmail.com",
+                    password="123",
+                    role=role,
+                ),
+            )
+        ticket, _ = crud.create_ticket(
+            db,
+            schemas.TicketCreate(
+                issuer_id=1,
+                title="Benchmark ticket",
+                status=constants.TicketStatus.OPEN,
+                description="Benchmark ticket",
+            ),
+        )
+        return ticket.id
+    finally:
+        db.close()
+
+
+def percentile(samples: list[float], pct: float) -> float:
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct))]
+
+
+async def measure_tickets(client: httpx.AsyncClient, ticket_id: int) -> list[float]:
+    latencies: list[float] = []
+    queue = iter(range(TICKET_REQUESTS))
+
+    async def worker():
+        for _ in queue:
+            start = time.perf_counter()
+            response = await client.get(f"/tickets/{ticket_id}")
+            response.raise_for_status()
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker() for _ in range(TICKET_CONCURRENCY)))
+    return latencies
+
+
+async def login_forever(client: httpx.AsyncClient, stop: asyncio.Event):
+    while not stop.is_set():
+        response = await client.get(
+            "/users", params={"username": "user0", "password": "123"}
+        )
+        response.raise_for_status()
+
+
+async def main():
+    ticket_id = seed()
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    async with client:
+        idle = await measure_tickets(client, ticket_id)
+
+        stop = asyncio.Event()
+        logins = [
+            asyncio.create_task(login_forever(client, stop))
+            for _ in range(LOGIN_CONCURRENCY)
+        ]
+        loaded = await measure_tickets(client, ticket_id)
+        stop.set()
+        await asyncio.gather(*logins)
+
+    print(f"GET /tickets/{{id}} x{TICKET_REQUESTS} (concurrency {TICKET_CONCURRENCY})")
+    for label, samples in [("idle", idle), (f"{LOGIN_CONCURRENCY} logins", loaded)]:
+        print(
+            f"\t{label:>10}: p50 {statistics.median(samples):7.2f} ms"
+            f"  p99 {percentile(samples, 0.99):7.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
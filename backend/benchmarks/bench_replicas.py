@@ -0,0 +1,99 @@
+# GET /tickets/{id} throughput with reads on the primary only, then spread over
+# replicas by app.replicas. replicas are the primary's database again unless
+# DATABASE_REPLICA_URLS is set: that measures the routing overhead, real replicas
+# also take the read load off the primary. replaces the database
+#   python -m benchmarks.bench_replicas [requests, default 2000] [replicas, 2]
+import asyncio
+import sys
+import time
+from unittest import mock
+
+import httpx
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from app import crud, metrics, schemas, constants
+from app.api import app
+from app.config import DATABASE_REPLICA_URLS
+from app.db import (
+    async_engine,
+    get_db,
+    pool_options,
+    replica_router,
+    reset_db,
+    to_async_url,
+)
+
+CONCURRENCY = 10
+
+
+def seed():
+    db = next(get_db())
+    try:
+        reset_db(bind=db.get_bind())
+        crud.create_user(
+            db,
+            schemas.UserCreate(
+                username="user0",
+                email="user0@gmail.com",
+                password="123",
+                role=constants.UserRole.CLIENT,
+            ),
+        )
+        crud.create_ticket(
+            db,
+            schemas.TicketCreate(
+                issuer_id=1,
+                title="Benchmark ticket",
+                status=constants.TicketStatus.OPEN,
+                description="Benchmark ticket",
+            ),
+        )
+    finally:
+        db.close()
+
+
+async def measure(client: httpx.AsyncClient, requests: int) -> float:
+    queue = iter(range(requests))
+
+    async def worker():
+        for _ in queue:
+            response = await client.get("/tickets/1")
+            response.raise_for_status()
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(CONCURRENCY)))
+    return requests / (time.perf_counter() - start)
+
+
+async def main():
+    requests = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    count = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    seed()
+    urls = DATABASE_REPLICA_URLS or [async_engine.url] * count
+    replicas = [
+        create_async_engine(
+            to_async_url(url),
+            poolclass=metrics.instrumented_pool(asyncio=True),
+            **pool_options(),
+        )
+        for url in urls
+    ]
+    transport = httpx.ASGITransport(app=app)
+    client = httpx.AsyncClient(transport=transport, base_url="http://bench")
+    print(f"[*] GET /tickets/1 x{requests} (concurrency {CONCURRENCY})")
+    async with client:
+        for label, engines in [("primary", []), (f"{len(urls)} replicas", replicas)]:
+            with mock.patch.object(replica_router, "replicas", engines):
+                replica_router.reset()
+                await measure(client, requests // 10)  # warm the pools
+                rate = await measure(client, requests)
+                checkouts = [
+                    metrics.pool_status(engine.pool)["checkouts"] for engine in engines
+                ]
+            print(f"\t{label:>12}: {rate:8.0f} req/s  replica checkouts {checkouts}")
+    for replica in replicas:
+        await replica.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
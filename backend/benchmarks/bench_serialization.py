@@ -0,0 +1,57 @@
+# response encoding cost for a page of tickets: the old path (model_dump for the
+# log, then jsonable_encoder + json.dumps in JSONResponse) against responses.encode
+#   python -m benchmarks.bench_serialization
+import json
+import timeit
+from datetime import datetime, timezone
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from app import schemas
+from app.constants import TicketCategory, TicketStatus
+from app.responses import encode
+
+ITEMS = 1_000
+RUNS = 50
+
+
+def build_page() -> schemas.TicketPage:
+    now = datetime.now(timezone.utc)
+    items = [
+        schemas.TicketOut(
+            id=i,
+            title=f"ticket {i}",
+            status=TicketStatus.OPEN,
+            category=TicketCategory.SOFTWARE,
+            description="printer on the second floor is out of toner " * 4,
+            created_at=now,
+            updated_at=now,
+            issuer=schemas.UserRef(id=i, username=f"user{i}"),
+            assignee=schemas.UserRef(id=i + 1, username=f"agent{i}"),
+        )
+        for i in range(ITEMS)
+    ]
+    return schemas.TicketPage(items=items, next_cursor="abc")
+
+
+def old_path(page: schemas.TicketPage) -> bytes:
+    json.dumps(page.model_dump(), default=str)  # payload log
+    return JSONResponse(jsonable_encoder(page)).body
+
+
+def ms_per_run(func, page) -> float:
+    return timeit.timeit(lambda: func(page), number=RUNS) / RUNS * 1e3
+
+
+def main():
+    page = build_page()
+    assert json.loads(old_path(page)) == json.loads(encode(page))
+    old, new = ms_per_run(old_path, page), ms_per_run(encode, page)
+    print(f"page of {ITEMS} tickets, {RUNS} runs")
+    print(f"\t{'jsonable_encoder + json':>24}: {old:8.2f} ms")
+    print(f"\t{'responses.encode':>24}: {new:8.2f} ms  ({old / new:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,109 @@
+# statements and latency per user write: looking the username and email up before
+# writing (the old crud) against writing under the unique indexes and mapping a
+# violation. replaces the database
+#   python -m benchmarks.bench_user_writes [users, default 500]
+import os
+import sys
+import time
+from typing import Callable
+
+# the database round trips, not bcrypt
+os.environ.setdefault("BCRYPT_ROUNDS", "4")
+
+from sqlalchemy import event, select
+from sqlalchemy.orm import Session
+
+from app import crud, models, schemas, security
+from app.constants import StatusCode, UserRole
+from app.db import engine, reset_db, session_maker
+
+statements = 0
+
+
+@event.listens_for(engine, "before_cursor_execute")
+def count(*args):
+    global statements
+    statements += 1
+
+
+def lookup_create(db: Session, user: schemas.UserCreate) -> StatusCode:
+    if db.scalar(select(models.User.id).where(models.User.username == user.username)):
+        return StatusCode.UNAME_ALREADY_EXIST
+    if db.scalar(select(models.User.id).where(models.User.email == user.email)):
+        return StatusCode.EMAIL_ALREADY_EXIST
+    user_dict = user.model_dump(exclude={"password"})
+    user_dict["hashed_password"] = security.hash_password(user.password)
+    db.add(models.User(**user_dict))
+    db.commit()
+    return StatusCode.SUCCESS
+
+
+def lookup_update(db: Session, user_id: int, user: schemas.UserUpdate) -> StatusCode:
+    db_user = db.get(models.User, user_id)
+    if db.scalar(select(models.User.id).where(models.User.username == user.username)):
+        return StatusCode.UNAME_ALREADY_EXIST
+    if db.scalar(select(models.User.id).where(models.User.email == user.email)):
+        return StatusCode.EMAIL_ALREADY_EXIST
+    for key, val in user.model_dump(exclude_none=True).items():
+        setattr(db_user, key, val)
+    db.commit()
+    return StatusCode.SUCCESS
+
+
+def measure(label: str, calls: Callable, n: int):
+    global statements
+    statements = 0
+    start = time.perf_counter()
+    calls()
+    elapsed = (time.perf_counter() - start) / n * 1000
+    print(f"\t{label:>24}: {elapsed:6.2f} ms  {statements / n:4.1f} statements/user")
+
+
+def run(name: str, create: Callable, update: Callable, users: int):
+    reset_db(engine)
+    print(f"[*] {name}")
+    with session_maker() as db:
+        new = [
+            schemas.UserCreate(
+                username=f"user{i}",
+                email=f"user{i}@example.com",
+                password="123",
+                role=UserRole.CLIENT,
+            )
+            for i in range(users)
+        ]
+        renamed = [
+            schemas.UserUpdate(username=f"agent{i}", email=f"agent{i}@example.com")
+            for i in range(users)
+        ]
+
+        def creates():
+            for user in new:
+                assert create(db, user) is StatusCode.SUCCESS
+
+        def updates():
+            for user_id, user in enumerate(renamed, start=1):
+                assert update(db, user_id, user) is StatusCode.SUCCESS
+
+        def duplicates():
+            for user in new:
+                assert create(db, user) is not StatusCode.SUCCESS
+
+        measure("create", creates, users)
+        measure("create taken username", duplicates, users)
+        measure("update", updates, users)
+
+
+def main():
+    users = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    run("look up, then write", lookup_create, lookup_update, users)
+    run(
+        "write, map violations",
+        lambda db, user: crud.create_user(db, user)[1],
+        lambda db, user_id, user: crud.update_user(db, user_id, user)[1],
+        users,
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,51 @@
+# per-call cost of crud argument validation in "strict" and "boundary" mode
+#   python -m benchmarks.bench_validation
+import timeit
+
+from sqlalchemy.orm import Session
+from app import crud, schemas
+from app.db import get_db
+
+CALLS = 20_000
+
+
+def build(mode: str):
+    # same shape as crud.create_message: a public call making nested helper calls
+    def check_same_ids(id_1: int, id_2) -> bool:
+        return id_1 == id_2
+
+    check_same_ids = crud.validated(check_same_ids, mode)
+
+    def create_message(db: Session, message: schemas.MessageCreate) -> bool:
+        check_same_ids(message.sender_id, message.ticket_id)
+        return check_same_ids(message.sender_id, message.receiver_id)
+
+    return check_same_ids, crud.validated(create_message, mode)
+
+
+def per_call_us(func, *args) -> float:
+    return timeit.timeit(lambda: func(*args), number=CALLS) / CALLS * 1e6
+
+
+def main():
+    db = next(get_db())
+    message = schemas.MessageCreate(
+        sender_id=1, receiver_id=2, ticket_id=1, content="hi"
+    )
+    try:
+        raw_helper = crud.check_same_ids.__wrapped__
+        print(f"per call, {CALLS} calls")
+        print(f"\t{'unvalidated helper':>28}: {per_call_us(raw_helper, 1, 2):7.2f} us")
+        for mode in ["strict", "boundary"]:
+            helper, public = build(mode)
+            print(f"\t{mode + ' helper':>28}: {per_call_us(helper, 1, 2):7.2f} us")
+            print(
+                f"\t{mode + ' public + 2 nested':>28}:"
+                f" {per_call_us(public, db, message):7.2f} us"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
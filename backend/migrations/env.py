@@ -0,0 +1,48 @@
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine, pool
+
+from app.config import DATABASE_URL
+from app.models import Base
+
+config = context.config
+target_metadata = Base.metadata
+
+# app.db.upgrade_db hands over its own connection and keeps the app's logging;
+# the alembic command line configures logging from alembic.ini
+connection = config.attributes.get("connection")
+if connection is None and config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+
+def run_migrations_offline():
+    # alembic upgrade head --sql: print the DDL instead of running it
+    context.configure(
+        url=DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations(connection):
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        # sqlite can't ALTER most things, tables are copied instead
+        render_as_batch=connection.dialect.name == "sqlite",
+    )
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+elif connection is not None:
+    run_migrations(connection)
+else:
+    with create_engine(DATABASE_URL, poolclass=pool.NullPool).connect() as connection:
+        run_migrations(connection)
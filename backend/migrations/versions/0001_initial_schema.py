@@ -0,0 +1,128 @@
+"""initial schema
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18 12:54:28.688249
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0001"
+down_revision: Union[str, Sequence[str], None] = None
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# the schema init_db used to create with Base.metadata.create_all
+ENUMS = [
+    sa.Enum("CLIENT", "SUPPORT", "ADMIN", name="userrole"),
+    sa.Enum(
+        "OPEN", "IN_PROGRESS", "RESOLVED", "CLOSED", "CANCELLED", name="ticketstatus"
+    ),
+    sa.Enum(
+        "HARDWARE",
+        "SOFTWARE",
+        "NETWORK",
+        "ACCESS",
+        "ACCOUNT",
+        "OTHER",
+        name="ticketcategory",
+    ),
+]
+
+
+def _timestamp(name: str) -> sa.Column:
+    return sa.Column(
+        name,
+        sa.DateTime(timezone=True),
+        server_default=sa.func.now(),
+        nullable=False,
+    )
+
+
+def upgrade() -> None:
+    userrole, ticketstatus, ticketcategory = ENUMS
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("username", sa.String(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("role", userrole, nullable=False),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("username"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "tickets",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("issuer_id", sa.Integer(), nullable=False),
+        sa.Column("assignee_id", sa.Integer(), nullable=True),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("status", ticketstatus, nullable=False),
+        sa.Column("category", ticketcategory, nullable=True),
+        sa.Column("description", sa.String(), nullable=False),
+        _timestamp("created_at"),
+        _timestamp("updated_at"),
+        sa.ForeignKeyConstraint(["assignee_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["issuer_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_tickets_assignee_id", "tickets", ["assignee_id"])
+    op.create_index("ix_tickets_id", "tickets", ["id"])
+    op.create_index("ix_tickets_issuer_id", "tickets", ["issuer_id"])
+    op.create_index("ix_tickets_title", "tickets", ["title"])
+
+    op.create_table(
+        "attachments",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticket_id", sa.Integer(), nullable=False),
+        sa.Column("filename", sa.String(), nullable=False),
+        sa.Column("filetype", sa.String(), nullable=False),
+        sa.Column("filesize", sa.Integer(), nullable=False),
+        _timestamp("uploaded_at"),
+        _timestamp("updated_at"),
+        sa.ForeignKeyConstraint(["ticket_id"], ["tickets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_attachments_id", "attachments", ["id"])
+    op.create_index("ix_attachments_ticket_id", "attachments", ["ticket_id"])
+
+    op.create_table(
+        "messages",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("ticket_id", sa.Integer(), nullable=False),
+        sa.Column("sender_id", sa.Integer(), nullable=False),
+        sa.Column("receiver_id", sa.Integer(), nullable=False),
+        sa.Column("content", sa.String(), nullable=False),
+        _timestamp("sent_at"),
+        _timestamp("edited_at"),
+        sa.ForeignKeyConstraint(["receiver_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["sender_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["ticket_id"], ["tickets.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_messages_id", "messages", ["id"])
+    op.create_index("ix_messages_receiver_id", "messages", ["receiver_id"])
+    op.create_index("ix_messages_sender_id", "messages", ["sender_id"])
+    op.create_index("ix_messages_ticket_id", "messages", ["ticket_id"])
+
+
+def downgrade() -> None:
+    # indexes go with their tables
+    op.drop_table("messages")
+    op.drop_table("attachments")
+    op.drop_table("tickets")
+    op.drop_table("users")
+    # postgres keeps enum types around after their tables
+    for enum in ENUMS:
+        enum.drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,36 @@
+"""attachment file unique
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 13:40:12.519305
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0003"
+down_revision: Union[str, Sequence[str], None] = "0002"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# crud.create_attachment inserts and maps a violation to FILE_ALREADY_EXIST,
+# instead of looking for the file first. rows that would break the constraint
+# have to be cleaned up by hand before upgrading
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("attachments") as batch_op:
+        batch_op.create_unique_constraint(
+            "uq_attachments_ticket_file", ["ticket_id", "filename", "filetype"]
+        )
+        batch_op.drop_index("ix_attachments_ticket_id")
+
+
+def downgrade() -> None:
+    with op.batch_alter_table("attachments") as batch_op:
+        batch_op.create_index("ix_attachments_ticket_id", ["ticket_id"])
+        batch_op.drop_constraint("uq_attachments_ticket_file", type_="unique")
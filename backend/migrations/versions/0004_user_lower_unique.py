@@ -0,0 +1,48 @@
+"""user lower unique
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 14:21:07.118842
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = "0004"
+down_revision: Union[str, Sequence[str], None] = "0003"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# usernames and emails unique regardless of case. crud inserts and updates users
+# without looking them up first and maps a violation of these indexes to
+# UNAME_ALREADY_EXIST / EMAIL_ALREADY_EXIST. users differing only by case have to
+# be renamed by hand before upgrading
+
+# 0001 left the username constraint unnamed: the name postgres gives it, which
+# batch mode also uses for the copy of the table on sqlite
+NAMING = {"uq": "%(table_name)s_%(column_0_name)s_key"}
+
+
+def upgrade() -> None:
+    with op.batch_alter_table("users", naming_convention=NAMING) as batch_op:
+        batch_op.drop_constraint("users_username_key", type_="unique")
+        batch_op.drop_index("ix_users_email")
+    op.create_index(
+        "uq_users_username_lower", "users", [sa.text("lower(username)")], unique=True
+    )
+    op.create_index(
+        "uq_users_email_lower", "users", [sa.text("lower(email)")], unique=True
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("uq_users_email_lower", table_name="users")
+    op.drop_index("uq_users_username_lower", table_name="users")
+    with op.batch_alter_table("users", naming_convention=NAMING) as batch_op:
+        batch_op.create_index("ix_users_email", ["email"], unique=True)
+        batch_op.create_unique_constraint("users_username_key", ["username"])
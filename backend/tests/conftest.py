@@ -0,0 +1,46 @@
+import os
+
+from sqlalchemy import URL, create_engine, make_url, text
+
+import app.config as config
+
+# pytest -n <workers> (pytest-xdist): every worker runs against its own database,
+# the configured one suffixed with the worker id, so resets and rollbacks of one
+# worker never meet another's. runs before app.db builds its engines from the config
+
+
+def worker_url(database_url: str, worker: str) -> URL:
+    url = make_url(database_url)
+    if url.get_backend_name() != "sqlite":
+        return url.set(database=f"{url.database}_{worker}")
+    if url.database in (None, "", ":memory:"):
+        return url
+    root, ext = os.path.splitext(url.database)
+    return url.set(database=f"{root}_{worker}{ext}")
+
+
+def create_database(server_url: str, database: str):
+    # sqlite creates its files on connect
+    engine = create_engine(server_url, isolation_level="AUTOCOMMIT")
+    try:
+        with engine.connect() as connection:
+            exists = connection.scalar(
+                text("SELECT 1 FROM pg_database WHERE datname = :name"),
+                {"name": database},
+            )
+            if not exists:
+                connection.execute(text(f'CREATE DATABASE "{database}"'))
+    finally:
+        engine.dispose()
+
+
+worker = os.getenv("PYTEST_XDIST_WORKER")
+if worker:
+    url = worker_url(config.DATABASE_URL, worker)
+    if url.get_backend_name() == "postgresql":
+        create_database(config.DATABASE_URL, url.database)
+    config.DATABASE_URL = url.render_as_string(hide_password=False)
+    if config.ASYNC_DATABASE_URL:
+        config.ASYNC_DATABASE_URL = worker_url(
+            config.ASYNC_DATABASE_URL, worker
+        ).render_as_string(hide_password=False)
@@ -0,0 +1,86 @@
+import functools
+import unittest
+
+from sqlalchemy import Connection, literal, select, text
+from sqlalchemy.orm import Session
+
+from app import models, schemas, security
+from app.db import engine, reset_db, session_maker
+from app.ratelimit import login_limiter
+
+# shared setup of the crud tests: the schema is migrated once per run and every
+# test runs inside a transaction rolled back when it ends. the session joins that
+# transaction through savepoints, so crud's commits and rollbacks only release or
+# roll back a savepoint and nothing a test writes outlives it
+
+_schema_ready = False
+
+
+def _has_rows() -> bool:
+    with engine.connect() as connection:
+        return any(
+            connection.scalar(select(literal(1)).select_from(table).limit(1))
+            for table in models.Base.metadata.sorted_tables
+        )
+
+
+def prepare_schema():
+    # reset once per run, and again when tests outside these (API tests reset the
+    # database their own way) left rows behind
+    global _schema_ready
+    if not _schema_ready or _has_rows():
+        reset_db(engine)
+        _schema_ready = True
+
+
+def restart_ids(connection: Connection):
+    # postgres sequences ignore rollbacks, tests expect ids from 1; sqlite reuses
+    # rolled back rowids by itself
+    if connection.dialect.name != "postgresql":
+        return
+    for table in models.Base.metadata.sorted_tables:
+        connection.execute(
+            text("SELECT setval(pg_get_serial_sequence(:table, 'id'), 1, false)"),
+            {"table": table.name},
+        )
+
+
+@functools.cache
+def hashed_password(password: str) -> str:
+    # bcrypt is slow on purpose, fixture passwords are hashed once per run
+    return security.hash_password(password)
+
+
+def create_user(db: Session, user: schemas.UserCreate) -> models.User:
+    # crud.create_user for fixture data, with a cached hash
+    user_dict = user.model_dump(exclude={"password"})
+    db_user = models.User(**user_dict, hashed_password=hashed_password(user.password))
+    db.add(db_user)
+    db.commit()
+    return db_user
+
+
+class RollbackTestCase(unittest.TestCase):
+
+    def setUp(self):
+        prepare_schema()
+        self.connection = engine.connect()
+        # pysqlite only begins a transaction before DML, so the outermost RELEASE
+        # SAVEPOINT would commit: it's begun by hand, the pool resets the level
+        sqlite = self.connection.dialect.name == "sqlite"
+        if sqlite:
+            self.connection.execution_options(isolation_level="AUTOCOMMIT")
+        self.transaction = self.connection.begin()
+        if sqlite:
+            self.connection.exec_driver_sql("BEGIN")
+        self.db = session_maker(
+            bind=self.connection, join_transaction_mode="create_savepoint"
+        )
+        restart_ids(self.connection)
+        login_limiter.reset()
+        self.addCleanup(self.rollback)
+
+    def rollback(self):
+        self.db.close()
+        self.transaction.rollback()
+        self.connection.close()
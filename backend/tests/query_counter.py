@@ -0,0 +1,25 @@
+import contextlib
+import re
+from typing import Generator, List
+
+from sqlalchemy import Connection, Engine, event
+
+_savepoint = re.compile(r"(RELEASE |ROLLBACK TO )?SAVEPOINT ")
+
+
+@contextlib.contextmanager
+def count_statements(bind: Engine | Connection) -> Generator[List[str]]:
+    # collects every statement sent to the database inside the block
+    statements: List[str] = []
+    engine = bind.engine
+
+    def before_cursor_execute(conn, cursor, statement, parameters, context, many):
+        # savepoints of tests.fixtures.RollbackTestCase aren't queries
+        if not _savepoint.match(statement):
+            statements.append(statement)
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
@@ -0,0 +1,183 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import event, func, select
+from app import crud, models, schemas, constants
+from app.api import app
+from app.db import async_engine, get_db, reset_db
+
+SUCCESS = constants.StatusCode.SUCCESS.value
+
+
+def create(resource: str, **data) -> dict:
+    return {"op": "create", "resource": resource, "data": data}
+
+
+def thread(title: str = "Printer on fire") -> list:
+    # a ticket, a message on it and an attachment to it, by reference
+    return [
+        create(
+            "tickets",
+            issuer_id=1,
+            title=title,
+            status="open",
+            description="the office smells of burnt toner",
+        ),
+        create(
+            "messages",
+            ticket_id={"ref": 0},
+            sender_id=1,
+            receiver_id=2,
+            content="smoke coming out",
+        ),
+        create(
+            "attachments",
+            ticket_id={"ref": 0},
+            filename="fire",
+            filetype="jpg",
+            filesize=2048,
+        ),
+    ]
+
+
+class TestAPIBatch(unittest.TestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        for i in [1, 2]:
+            crud.create_user(
+                db,
+                schemas.UserCreate.model_validate(
+                    {
+                        "username": f"user{i}",
+                        "email": f"user{i}@gmail.com",
+                        "password": "123",
+                        "role": constants.UserRole.CLIENT,
+                    }
+                ),
+            )
+        db.close()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def count(self, model) -> int:
+        db = next(get_db())
+        try:
+            return db.scalar(select(func.count()).select_from(model))
+        finally:
+            db.close()
+
+    def test_refs_one_commit(self):
+        commits = []
+        listen = (async_engine.sync_engine, "commit", lambda conn: commits.append(1))
+        event.listen(*listen)
+        try:
+            response = self.client.post("/batch", json={"operations": thread()})
+        finally:
+            event.remove(*listen)
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertTrue(body["committed"])
+        self.assertEqual([r["status_code"] for r in body["results"]], [SUCCESS] * 3)
+        ticket, message, attachment = [r["result"] for r in body["results"]]
+        self.assertEqual(message["ticket_id"], ticket["id"])
+        self.assertEqual(attachment["ticket_id"], ticket["id"])
+        self.assertEqual(len(commits), 1)
+        self.assertEqual(self.count(models.Message), 1)
+
+    def test_update_and_delete_by_ref(self):
+        operations = thread() + [
+            {
+                "op": "update",
+                "resource": "tickets",
+                "id": {"ref": 0},
+                "data": {"status": "in_progress"},
+            },
+            {"op": "delete", "resource": "attachments", "id": {"ref": 2}},
+        ]
+        response = self.client.post("/batch", json={"operations": operations})
+        body = response.json()
+        self.assertTrue(body["committed"])
+        self.assertEqual(body["results"][3]["result"]["status"], "in_progress")
+        self.assertEqual(self.count(models.Attachment), 0)
+
+    def test_failure_rolls_back(self):
+        operations = thread() + [
+            create(
+                "attachments",
+                ticket_id={"ref": 0},
+                filename="fire",
+                filetype="jpg",
+                filesize=10,
+            )
+        ]
+        response = self.client.post("/batch", json={"operations": operations})
+        self.assertEqual(response.status_code, 200)
+        body = response.json()
+        self.assertFalse(body["committed"])
+        self.assertEqual(
+            [r["status_code"] for r in body["results"]],
+            [SUCCESS] * 3 + [constants.StatusCode.FILE_ALREADY_EXIST.value],
+        )
+        self.assertTrue(all(r["result"] is None for r in body["results"]))
+        for model in [models.Ticket, models.Message, models.Attachment]:
+            self.assertEqual(self.count(model), 0)
+
+    def test_missing_row_rolls_back(self):
+        operations = thread() + [
+            {"op": "delete", "resource": "messages", "id": 100},
+        ]
+        body = self.client.post("/batch", json={"operations": operations}).json()
+        self.assertFalse(body["committed"])
+        self.assertEqual(
+            body["results"][-1]["status_code"],
+            constants.StatusCode.MESSAGE_NOT_FOUND.value,
+        )
+        self.assertEqual(self.count(models.Ticket), 0)
+
+    def test_rollback_leaves_no_rows(self):
+        operations = thread()[:2] + [
+            create(
+                "messages",
+                ticket_id={"ref": 0},
+                sender_id=1,
+                receiver_id=999,
+                content="anyone?",
+            )
+        ]
+        body = self.client.post("/batch", json={"operations": operations}).json()
+        self.assertFalse(body["committed"])
+        response = self.client.post(
+            "/messages",
+            json={"ticket_id": 1, "sender_id": 1, "receiver_id": 2, "content": "hi"},
+        )
+        self.assertEqual(
+            response.json()["status_code"],
+            constants.StatusCode.TICKET_NOT_FOUND.value,
+        )
+        self.assertEqual(self.count(models.Message), 0)
+
+    def test_invalid_batch(self):
+        operations = thread()
+        for name, batch in [
+            ("empty", []),
+            ("forward ref", [operations[1], operations[0]]),
+            ("update without id", [{"op": "update", "resource": "tickets"}]),
+            ("unknown resource", [create("comments", content="hi")]),
+        ]:
+            with self.subTest(name):
+                response = self.client.post("/batch", json={"operations": batch})
+                self.assertEqual(response.status_code, 422)
+
+    def test_invalid_data_rolls_back(self):
+        operations = thread() + [create("messages", ticket_id={"ref": 0})]
+        response = self.client.post("/batch", json={"operations": operations})
+        self.assertEqual(response.status_code, 422)
+        loc = response.json()["detail"][0]["loc"]
+        self.assertEqual(loc[:4], ["body", "operations", 3, "data"])
+        self.assertEqual(self.count(models.Ticket), 0)
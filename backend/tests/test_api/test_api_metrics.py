@@ -0,0 +1,68 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, exc
+from app import metrics
+from app.api import app
+from app.config import DATABASE_URL
+from app.db import get_db, reset_db
+
+
+class TestAPIMetrics(unittest.TestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        db.close()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def test_pool_metrics(self):
+        before = self.client.get("/internal/metrics").json()["async_db_pool"]
+        for ticket_id in range(5):
+            self.client.get(f"/tickets/{ticket_id}")
+        after = self.client.get("/internal/metrics").json()["async_db_pool"]
+
+        self.assertEqual(after["checked_out"], 0)
+        self.assertGreaterEqual(after["checkouts"], before["checkouts"] + 5)
+        self.assertIn("overflow", after)
+        self.assertIn("max_ms", after["wait"])
+
+
+class TestPoolMetrics(unittest.TestCase):
+
+    def test_timeout_counted(self):
+        engine = create_engine(
+            DATABASE_URL,
+            poolclass=metrics.instrumented_pool(),
+            pool_size=1,
+            max_overflow=0,
+            pool_timeout=0.1,
+        )
+        try:
+            with engine.connect():
+                with self.assertRaises(exc.TimeoutError):
+                    engine.connect()
+            status = metrics.pool_status(engine.pool)
+        finally:
+            engine.dispose()
+
+        self.assertEqual(status["checkouts"], 1)
+        self.assertEqual(status["timeouts"], 1)
+        self.assertEqual(status["checked_out"], 0)
+        self.assertGreaterEqual(status["wait"]["max_ms"], 100)
+
+    def test_pool_logger(self):
+        engine = create_engine(DATABASE_URL, poolclass=metrics.instrumented_pool())
+        try:
+            self.assertTrue(engine.pool.logger.name.startswith("sqlalchemy.pool."))
+        finally:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from app import crud, schemas, constants
+from app.api import app
+from app.config import LOGIN_USERNAME_PER_MINUTE
+from app.db import get_db, reset_db
+from app.ratelimit import TokenBuckets, login_limiter
+
+
+class TestTokenBuckets(unittest.TestCase):
+
+    def test_refill(self):
+        buckets = TokenBuckets(per_minute=2)
+        self.assertEqual(buckets.take("a", now=0), 0)
+        self.assertEqual(buckets.take("a", now=0), 0)
+        self.assertAlmostEqual(buckets.take("a", now=0), 30)
+        # other keys have their own bucket
+        self.assertEqual(buckets.take("b", now=0), 0)
+        # one token back after 30s
+        self.assertEqual(buckets.take("a", now=30), 0)
+        self.assertGreater(buckets.take("a", now=30), 0)
+
+    def test_wait_takes_nothing(self):
+        buckets = TokenBuckets(per_minute=1)
+        self.assertEqual(buckets.wait("a", now=0), 0)
+        self.assertEqual(buckets.take("a", now=0), 0)
+        self.assertAlmostEqual(buckets.wait("a", now=0), 60)
+        self.assertAlmostEqual(buckets.wait("a", now=0), 60)
+
+    def test_max_keys(self):
+        buckets = TokenBuckets(per_minute=1, max_keys=2)
+        for key in ["a", "b", "c"]:
+            buckets.take(key, now=0)
+        # "a" was dropped and starts over with a full bucket
+        self.assertEqual(buckets.take("a", now=0), 0)
+        self.assertGreater(buckets.take("c", now=0), 0)
+
+
+class TestAPIRateLimit(unittest.TestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        crud.create_user(
+            db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+        db.close()
+        login_limiter.reset()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        login_limiter.reset()
+
+    def verify(self, username: str = "user1"):
+        return self.client.get(
+            "/users", params={"username": username, "password": "wrong"}
+        )
+
+    def test_username_limit(self):
+        # refills are test_refill's; slow bcrypt on a busy machine (parallel runs)
+        # must not earn the username another token halfway
+        with mock.patch.object(login_limiter.usernames, "rate", 1e-6):
+            for _ in range(int(LOGIN_USERNAME_PER_MINUTE)):
+                self.assertEqual(self.verify().status_code, 200)
+            response = self.verify()
+            self.assertEqual(response.status_code, 429)
+            self.assertGreaterEqual(int(response.headers["Retry-After"]), 1)
+            # login shares the username's bucket
+            response = self.client.post(
+                "/login", json={"username": "user1", "password": "123"}
+            )
+            self.assertEqual(response.status_code, 429)
+            # as does the username in another case
+            self.assertEqual(self.verify("USER1").status_code, 429)
+        # other usernames are not affected
+        self.assertEqual(self.verify("user2").status_code, 200)
+
+        counters = self.client.get("/internal/metrics").json()["login_limiter"]
+        self.assertEqual(counters["limited_username"], 3)
+        self.assertEqual(counters["admitted"], LOGIN_USERNAME_PER_MINUTE + 1)
+        self.assertEqual(counters["in_flight"], 0)
+
+    def test_limited_username_spares_address(self):
+        with mock.patch.object(login_limiter.usernames, "rate", 1e-6):
+            for _ in range(int(LOGIN_USERNAME_PER_MINUTE)):
+                self.verify()
+            with mock.patch.object(login_limiter.addresses, "capacity", 1):
+                # the address's one token isn't spent on the locked username
+                self.assertEqual(self.verify().status_code, 429)
+                self.assertEqual(self.verify("user2").status_code, 200)
+
+    def test_in_flight_cap(self):
+        max_in_flight = login_limiter.max_in_flight
+        login_limiter.max_in_flight = 0
+        try:
+            response = self.verify()
+        finally:
+            login_limiter.max_in_flight = max_in_flight
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response.headers["Retry-After"], "1")
+        self.assertEqual(login_limiter.counters["rejected_busy"], 1)
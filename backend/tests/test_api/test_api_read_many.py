@@ -0,0 +1,85 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from app import crud, schemas, constants
+from app.api import app
+from app.config import BATCH_MAX_IDS
+from app.db import get_db, reset_db
+
+
+class TestAPIReadMany(unittest.TestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        crud.create_user(
+            db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+        crud.create_ticket(
+            db,
+            schemas.TicketCreate.model_validate(
+                {
+                    "issuer_id": 1,
+                    "title": "Computer won't start after power outage",
+                    "status": constants.TicketStatus.OPEN,
+                    "description": "My desktop computer refuses to turn on.",
+                }
+            ),
+        )
+        db.close()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def test_tickets_by_ids(self):
+        response = self.client.get("/tickets", params={"ids": "1,100"})
+        self.assertEqual(response.status_code, 200)
+        found, missing = response.json()
+        self.assertEqual(found["issuer"]["username"], "user1")
+        self.assertEqual(
+            missing,
+            {"id": 100, "status_code": constants.StatusCode.TICKET_NOT_FOUND.value},
+        )
+
+    def test_tickets_by_ids_with_filters(self):
+        for params in [{"status": "open"}, {"issuer_id": 1}, {"cursor": "abc"}]:
+            with self.subTest(params=params):
+                response = self.client.get("/tickets", params={"ids": "1", **params})
+                self.assertEqual(response.status_code, 422)
+
+    def test_users_by_ids(self):
+        response = self.client.get("/users", params={"ids": "1"})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()[0]["username"], "user1")
+
+    def test_users_by_ids_with_credentials(self):
+        for params in [{"username": "user1"}, {"username": "user1", "password": "123"}]:
+            with self.subTest(params=params):
+                response = self.client.get("/users", params={"ids": "1", **params})
+                self.assertEqual(response.status_code, 422)
+
+    def test_verify_still_requires_credentials(self):
+        response = self.client.get("/users", params={"username": "user1"})
+        self.assertEqual(response.status_code, 422)
+
+    def test_invalid_ids(self):
+        too_many = ",".join(["1"] * (BATCH_MAX_IDS + 1))
+        for ids in ["a,b", "1,,2", too_many]:
+            with self.subTest(ids=ids):
+                response = self.client.get("/messages", params={"ids": ids})
+                self.assertEqual(response.status_code, 422)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
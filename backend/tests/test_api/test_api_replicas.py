@@ -0,0 +1,167 @@
+import asyncio
+import os
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, pool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.orm import Session
+from app import crud, schemas, constants
+from app.api import WROTE_AT_COOKIE, app
+from app.db import (
+    async_engine,
+    get_db,
+    replica_router,
+    reset_db,
+    to_async_url,
+    upgrade_db,
+)
+from app.replicas import ReplicaRouter
+
+
+def seed(db: Session, title: str):
+    crud.create_user(
+        db,
+        schemas.UserCreate.model_validate(
+            {
+                "username": "user1",
+                "email": "user1@gmail.com",
+                "password": "123",
+                "role": constants.UserRole.CLIENT,
+            }
+        ),
+    )
+    crud.create_ticket(
+        db,
+        schemas.TicketCreate.model_validate(
+            {
+                "issuer_id": 1,
+                "title": title,
+                "status": constants.TicketStatus.OPEN,
+                "description": "My desktop computer refuses to turn on.",
+            }
+        ),
+    )
+
+
+class TestAPIReplicas(unittest.TestCase):
+    # the replica is a second database, an sqlite file with different data, so the
+    # responses tell which one was read
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        seed(db, "on the primary")
+        db.close()
+
+        self.tmpdir = tempfile.TemporaryDirectory()
+        url = f"sqlite:///{os.path.join(self.tmpdir.name, 'replica.db')}"
+        replica = create_engine(url)
+        upgrade_db(replica)
+        with Session(replica) as replica_db:
+            seed(replica_db, "on the replica")
+        replica.dispose()
+        self.replica = create_async_engine(to_async_url(url), poolclass=pool.NullPool)
+
+        patch = mock.patch.object(replica_router, "replicas", [self.replica])
+        patch.start()
+        self.addCleanup(patch.stop)
+        replica_router.reset()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+        self.tmpdir.cleanup()
+
+    def test_reads_on_replica(self):
+        response = self.client.get("/tickets/1")
+        self.assertEqual(response.json()["title"], "on the replica")
+        response = self.client.get("/tickets", params={"limit": 10})
+        self.assertEqual(response.json()["items"][0]["title"], "on the replica")
+        self.assertEqual(replica_router.counters["replica"], 2)
+
+    def test_read_after_write_on_primary(self):
+        response = self.client.patch("/tickets/1", json={"title": "renamed"})
+        self.assertEqual(response.json()["title"], "renamed")
+        response = self.client.get("/tickets/1")
+        self.assertEqual(response.json()["title"], "renamed")
+        self.assertEqual(replica_router.counters["primary_read_after_write"], 1)
+
+    def test_read_after_write_per_client(self):
+        # kept by the writer's cookie: another client, even at the same address,
+        # still reads the replica
+        self.client.patch("/tickets/1", json={"title": "renamed"})
+        with TestClient(app) as other:
+            response = other.get("/tickets/1")
+        self.assertEqual(response.json()["title"], "on the replica")
+
+    def test_future_write_time_ignored(self):
+        self.client.cookies.set(WROTE_AT_COOKIE, str(time.time() + 3600))
+        response = self.client.get("/tickets/1")
+        self.assertEqual(response.json()["title"], "on the replica")
+
+    def test_batch_user_reads_on_replica(self):
+        response = self.client.get("/users", params={"ids": "1"})
+        self.assertEqual(response.json()[0]["username"], "user1")
+        self.assertEqual(replica_router.counters["replica"], 1)
+
+    def test_back_on_replica_after_lag_tolerance(self):
+        self.client.patch("/tickets/1", json={"title": "renamed"})
+        with mock.patch.object(replica_router, "max_lag", 0.0):
+            response = self.client.get("/tickets/1")
+        self.assertEqual(response.json()["title"], "on the replica")
+
+    def test_writes_on_primary(self):
+        response = self.client.post(
+            "/tickets",
+            json={
+                "issuer_id": 1,
+                "title": "new",
+                "status": "open",
+                "description": "new",
+            },
+        )
+        self.assertEqual(response.json()["id"], 2)
+        with mock.patch.object(replica_router, "max_lag", 0.0):
+            response = self.client.get("/tickets/2")
+        self.assertEqual(
+            response.json()["status_code"],
+            constants.StatusCode.TICKET_NOT_FOUND.value,
+        )
+
+
+class TestReplicaLag(unittest.TestCase):
+
+    def setUp(self):
+        if async_engine.dialect.name != "postgresql":
+            self.skipTest("replica lag is measured on postgres only")
+
+    def read_engine(self, url) -> tuple:
+        async def pick():
+            replica = create_async_engine(url, poolclass=pool.NullPool)
+            router = ReplicaRouter(async_engine, [replica], max_lag=1.0)
+            try:
+                return await router.read_engine() is replica, router.counters
+            finally:
+                await replica.dispose()
+                await async_engine.dispose()
+
+        return asyncio.run(pick())
+
+    def test_caught_up_replica_is_used(self):
+        # the primary itself isn't in recovery: no lag
+        on_replica, counters = self.read_engine(async_engine.url)
+        self.assertTrue(on_replica)
+        self.assertEqual(counters["replica"], 1)
+
+    def test_unreachable_replica_is_skipped(self):
+        url = async_engine.url.set(database="no_such_db")
+        on_replica, counters = self.read_engine(url)
+        self.assertFalse(on_replica)
+        self.assertEqual(counters["lagging_skipped"], 1)
+        self.assertEqual(counters["primary_lagging"], 1)
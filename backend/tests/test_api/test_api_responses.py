@@ -0,0 +1,37 @@
+import json
+import unittest
+from datetime import datetime, timezone
+
+from app import models, schemas
+from app.constants import StatusCode, TicketStatus, UserRole
+from app.responses import encode
+
+
+class TestEncode(unittest.TestCase):
+    def test_orm_object(self):
+        now = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        user = models.User(
+            id=1,
+            username="a",
+            email="a@x.com",
+            hashed_password="h",
+            role=UserRole.ADMIN,
+            created_at=now,
+            updated_at=now,
+        )
+        self.assertEqual(json.loads(encode(user)), user.as_dict() | {"role": "admin"})
+
+    def test_nested_models(self):
+        now = datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        ticket = schemas.TicketOut(
+            id=1,
+            title="t",
+            status=TicketStatus.OPEN,
+            description="d",
+            created_at=now,
+            issuer=schemas.UserRef(id=2, username="u"),
+        )
+        missing = {"id": 5, "status_code": StatusCode.TICKET_NOT_FOUND}
+        body = json.loads(encode([ticket, missing]))
+        self.assertEqual(body[0], json.loads(ticket.model_dump_json()))
+        self.assertEqual(body[1]["status_code"], StatusCode.TICKET_NOT_FOUND.value)
@@ -0,0 +1,66 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from app import crud, schemas, constants
+from app.api import app
+from app.db import async_engine, get_db, reset_db
+
+
+class TestAPISession(unittest.TestCase):
+
+    def setUp(self):
+        self.db = next(get_db())
+        # reset db
+        reset_db(bind=self.db.get_bind())
+        existing_user, _ = crud.create_user(
+            self.db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "old",
+                    "email": "old@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+        self.existing_user_id = existing_user.id if existing_user else None
+        self.db.close()
+        # keep one event loop for the whole test, the async pool is bound to it
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def test_connection_returned_after_response(self):
+        if self.existing_user_id is None:
+            self.skipTest("existing user was not created")
+        user_id = self.existing_user_id
+
+        response = self.client.get(f"/users/{user_id}")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["username"], "old")
+        self.assertEqual(async_engine.pool.checkedout(), 0)
+
+    def test_connection_returned_on_not_found(self):
+        response = self.client.get("/tickets/100")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.json()["status_code"], constants.StatusCode.TICKET_NOT_FOUND.value
+        )
+        self.assertEqual(async_engine.pool.checkedout(), 0)
+
+    def test_more_requests_than_pool_capacity(self):
+        if self.existing_user_id is None:
+            self.skipTest("existing user was not created")
+        user_id = self.existing_user_id
+
+        # default pool holds 5 + 10 overflow connections
+        for _ in range(50):
+            response = self.client.get(f"/users/{user_id}")
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(async_engine.pool.checkedout(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
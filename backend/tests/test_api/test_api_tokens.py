@@ -0,0 +1,85 @@
+import unittest
+
+from fastapi.testclient import TestClient
+from app import crud, schemas, constants, tokens
+from app.api import app
+from app.db import get_db, reset_db
+from app.ratelimit import login_limiter
+
+
+class TestAPITokens(unittest.TestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        crud.create_user(
+            db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.SUPPORT,
+                }
+            ),
+        )
+        db.close()
+        login_limiter.reset()
+        self.client = TestClient(app)
+        self.client.__enter__()
+
+    def tearDown(self):
+        self.client.__exit__(None, None, None)
+
+    def login(self, password: str = "123"):
+        return self.client.post(
+            "/login", json={"username": "user1", "password": password}
+        )
+
+    def auth(self, token: str):
+        return {"Authorization": f"Bearer {token}"}
+
+    def test_login(self):
+        response = self.login()
+        self.assertEqual(response.status_code, 200)
+        claims = tokens.decode_token(response.json()["access_token"])
+        self.assertEqual(claims.sub, 1)
+        self.assertEqual(claims.role, constants.UserRole.SUPPORT)
+        self.assertEqual(claims.exp, response.json()["expires_at"])
+
+    def test_wrong_password(self):
+        self.assertEqual(self.login("1234").status_code, 401)
+
+    def test_current_user(self):
+        token = self.login().json()["access_token"]
+        response = self.client.get("/users/me", headers=self.auth(token))
+        self.assertEqual(response.json()["username"], "user1")
+
+    def test_invalid_tokens(self):
+        token = self.login().json()["access_token"]
+        payload, signature = token.split(".")
+        expired = tokens.issue_token(1, constants.UserRole.ADMIN, ttl=-1)
+        for bad in [
+            None,
+            "",
+            "garbage",
+            f"{payload}.{signature[:-2]}",
+            f"{tokens.issue_token(1, constants.UserRole.ADMIN).access_token[:-1]}x",
+            expired.access_token,
+        ]:
+            with self.subTest(token=bad):
+                headers = self.auth(bad) if bad is not None else {}
+                response = self.client.get("/users/me", headers=headers)
+                self.assertEqual(response.status_code, 401)
+
+    def test_logout(self):
+        token = self.login().json()["access_token"]
+        response = self.client.post("/logout", headers=self.auth(token))
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get("/users/me", headers=self.auth(token))
+        self.assertEqual(response.status_code, 401)
+        # other sessions stay valid
+        other = self.login().json()["access_token"]
+        response = self.client.get("/users/me", headers=self.auth(other))
+        self.assertEqual(response.status_code, 200)
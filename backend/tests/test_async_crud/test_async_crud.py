@@ -0,0 +1,133 @@
+import unittest
+
+import pydantic
+from app import async_crud, models, schemas, constants, security
+from app.config import BCRYPT_ROUNDS
+from app.db import async_engine, async_session_maker, get_db, reset_db
+
+
+class TestAsyncCrud(unittest.IsolatedAsyncioTestCase):
+
+    def setUp(self):
+        db = next(get_db())
+        # reset db
+        reset_db(bind=db.get_bind())
+        db.close()
+        self.user_dicts = [
+            {
+                "username": "user1",
+                "email": "user1@gmail.com",
+                "password": "123",
+                "role": constants.UserRole.CLIENT,
+            },
+            {
+                "username": "user2",
+                "email": "user2@gmail.com",
+                "password": "123",
+                "role": constants.UserRole.SUPPORT,
+            },
+        ]
+        self.test_ticket_dict = {
+            "issuer_id": 1,
+            "assignee_id": 2,
+            "title": "Computer won't start after power outage",
+            "status": constants.TicketStatus.IN_PROGRESS,
+            "category": constants.TicketCategory.HARDWARE,
+            "description": "My desktop computer refuses to turn on.",
+        }
+
+    async def asyncSetUp(self):
+        self.db = async_session_maker()
+        for user_dict in self.user_dicts:
+            await async_crud.create_user(
+                self.db, schemas.UserCreate.model_validate(user_dict)
+            )
+
+    async def asyncTearDown(self):
+        await self.db.close()
+        # pooled connections belong to this test's event loop
+        await async_engine.dispose()
+
+    async def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    await async_crud.get_ticket_good(arg, 1)
+
+    async def test_verify_user_account(self):
+        self.assertTrue(await async_crud.verify_user_account(self.db, "user1", "123"))
+        self.assertFalse(await async_crud.verify_user_account(self.db, "user1", "1"))
+        self.assertFalse(await async_crud.verify_user_account(self.db, "none", "123"))
+
+    async def test_rehash_outdated_cost(self):
+        user = await self.db.get(models.User, 1)
+        user.hashed_password = security.hash_password("123", rounds=4)
+        await self.db.commit()
+
+        user = await async_crud.authenticate_user(self.db, "user1", "123")
+        self.assertEqual(user.id, 1)
+        self.assertEqual(security.hash_rounds(user.hashed_password), BCRYPT_ROUNDS)
+
+    async def test_existing_username(self):
+        user_dict = self.user_dicts[0].copy()
+        user_dict["email"] = "new@gmail.com"
+        result_user, status_code = await async_crud.create_user(
+            self.db, schemas.UserCreate.model_validate(user_dict)
+        )
+        self.assertIsNone(result_user)
+        self.assertEqual(status_code, constants.StatusCode.UNAME_ALREADY_EXIST)
+
+    async def test_attachment_already_exist(self):
+        await async_crud.create_ticket(
+            self.db, schemas.TicketCreate.model_validate(self.test_ticket_dict)
+        )
+        attachment_create = schemas.AttachmentCreate(
+            ticket_id=1, filename="screenshot.png", filetype="png", filesize=2048
+        )
+        _, status_code = await async_crud.create_attachment(self.db, attachment_create)
+        self.assertEqual(status_code, constants.StatusCode.SUCCESS)
+        result_attachment, status_code = await async_crud.create_attachment(
+            self.db, attachment_create
+        )
+        self.assertIsNone(result_attachment)
+        self.assertEqual(status_code, constants.StatusCode.FILE_ALREADY_EXIST)
+
+    async def test_ticket_lifecycle(self):
+        ticket_create = schemas.TicketCreate.model_validate(self.test_ticket_dict)
+        result_ticket, status_code = await async_crud.create_ticket(
+            self.db, ticket_create
+        )
+        if result_ticket is None:
+            self.fail("valid ticket not created")
+        self.assertEqual(status_code, constants.StatusCode.SUCCESS)
+        # loaded without lazy loading on the async session
+        result_ticket_dict = result_ticket.as_dict()
+        self.assertEqual(result_ticket_dict["title"], self.test_ticket_dict["title"])
+
+        ticket_out, _ = await async_crud.get_ticket_good(self.db, result_ticket.id)
+        if ticket_out is None:
+            self.fail("read ticket failed")
+        self.assertEqual(ticket_out.issuer.username, "user1")
+        self.assertEqual(ticket_out.assignee.username, "user2")
+
+        ticket_update = schemas.TicketUpdate(status=constants.TicketStatus.RESOLVED)
+        updated_ticket, _ = await async_crud.update_ticket(
+            self.db, result_ticket.id, ticket_update
+        )
+        if updated_ticket is None:
+            self.fail("update ticket failed")
+        self.assertEqual(
+            updated_ticket.as_dict()["status"], constants.TicketStatus.RESOLVED
+        )
+
+        deleted_ticket, _ = await async_crud.delete_ticket(self.db, result_ticket.id)
+        if deleted_ticket is None:
+            self.fail("delete ticket failed")
+        self.assertEqual(deleted_ticket.as_dict()["id"], result_ticket_dict["id"])
+        _, status_code = await async_crud.get_ticket_good(self.db, result_ticket.id)
+        self.assertEqual(status_code, constants.StatusCode.TICKET_NOT_FOUND)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
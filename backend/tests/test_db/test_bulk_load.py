@@ -0,0 +1,102 @@
+import json
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import select
+from app import models
+from app.constants import StatusCode, TableName
+from app.db import bulk_insert_data, get_db, reset_db
+
+DATASETS_PATH = os.path.join(os.path.dirname(__file__), "../../app/datasets.json")
+
+
+def user(username: str, email: str):
+    return {"username": username, "email": email, "password": "1", "role": "client"}
+
+
+class TestBulkLoad(unittest.TestCase):
+
+    def setUp(self):
+        self.db = next(get_db())
+
+    def tearDown(self):
+        self.db.close()
+
+    def snapshot(self):
+        snapshot = {
+            "users": self.db.execute(
+                select(models.User.id, models.User.username, models.User.role)
+            ).all(),
+            "tickets": self.db.execute(
+                select(models.Ticket.id, models.Ticket.title, models.Ticket.issuer_id)
+            ).all(),
+            "attachments": self.db.execute(
+                select(models.Attachment.ticket_id, models.Attachment.filename)
+            ).all(),
+            "messages": self.db.execute(
+                select(models.Message.ticket_id, models.Message.content)
+            ).all(),
+        }
+        # release the table locks, reset_db drops the tables
+        self.db.rollback()
+        return snapshot
+
+    def test_same_rows_as_crud_insert(self):
+        reset_db(bind=self.db.get_bind(), datasets_path=DATASETS_PATH, limit=4)
+        expected = self.snapshot()
+        reset_db(
+            bind=self.db.get_bind(), datasets_path=DATASETS_PATH, limit=4, bulk=True
+        )
+        self.assertEqual(self.snapshot(), expected)
+        self.assertEqual(len(expected["users"]), 4)
+
+    def test_invalid_rows_skipped(self):
+        reset_db(bind=self.db.get_bind())
+        dataset = {
+            "users": [
+                user("a", "a@x.com"),
+                user("a", "b@x.com"),
+                user("b", "a@x.com"),
+                user("c", "c@x.com"),
+            ],
+            "tickets": [
+                {"issuer_id": 1, "title": "t", "status": "open", "description": "d"},
+                {"issuer_id": 9, "title": "t", "status": "open", "description": "d"},
+            ],
+            "messages": [
+                {"ticket_id": 1, "sender_id": 1, "receiver_id": 2, "content": "hi"},
+                {"ticket_id": 1, "sender_id": 1, "receiver_id": 1, "content": "hi"},
+                {"ticket_id": 1, "sender_id": 1, "receiver_id": 9, "content": "hi"},
+            ],
+        }
+        with tempfile.NamedTemporaryFile("w", suffix=".json", delete=False) as file:
+            json.dump(dataset, file)
+        try:
+            results = bulk_insert_data(file.name, self.db.get_bind(), batch_size=2)
+        finally:
+            os.remove(file.name)
+
+        self.assertEqual(
+            results[TableName.USERS],
+            {
+                StatusCode.SUCCESS: 2,
+                StatusCode.UNAME_ALREADY_EXIST: 1,
+                StatusCode.EMAIL_ALREADY_EXIST: 1,
+            },
+        )
+        self.assertEqual(
+            results[TableName.TICKETS],
+            {StatusCode.SUCCESS: 1, StatusCode.ISSUER_NOT_FOUND: 1},
+        )
+        self.assertEqual(
+            results[TableName.MESSAGES],
+            {
+                StatusCode.SUCCESS: 1,
+                StatusCode.SAME_SENDER_AND_RECEIVER: 1,
+                StatusCode.RECEIVER_NOT_FOUND: 1,
+            },
+        )
+        self.assertEqual(
+            [user.username for user in self.snapshot()["users"]], ["a", "c"]
+        )
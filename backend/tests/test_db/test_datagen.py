@@ -0,0 +1,57 @@
+import os
+import tempfile
+import unittest
+
+from sqlalchemy import func, select
+from app import models
+from app.constants import StatusCode, TableName, UserRole
+from app.datagen import Generator, main
+from app.db import bulk_insert_data, get_db, reset_db
+
+SCALE = ["--users=5", "--tickets=10", "--attachments=10", "--messages=30"]
+
+
+def generate(seed: int):
+    generator = Generator(seed, users=20, tickets=40, attachments=30, messages=100)
+    return {tablename: list(rows) for tablename, rows in generator.tables()}
+
+
+class TestDatagen(unittest.TestCase):
+
+    def test_deterministic(self):
+        self.assertEqual(generate(1), generate(1))
+        self.assertNotEqual(generate(1), generate(2))
+
+    def test_references(self):
+        tables = generate(3)
+        roles = {user["id"]: user["role"] for user in tables[TableName.USERS]}
+        tickets = {ticket["id"]: ticket for ticket in tables[TableName.TICKETS]}
+        for ticket in tickets.values():
+            self.assertIn(ticket["issuer_id"], roles)
+            if ticket["assignee_id"] is not None:
+                self.assertIs(roles[ticket["assignee_id"]], UserRole.SUPPORT)
+        for attachment in tables[TableName.ATTACHMENTS]:
+            self.assertIn(attachment["ticket_id"], tickets)
+        for message in tables[TableName.MESSAGES]:
+            issuer = tickets[message["ticket_id"]]["issuer_id"]
+            self.assertIn(issuer, (message["sender_id"], message["receiver_id"]))
+            self.assertNotEqual(message["sender_id"], message["receiver_id"])
+
+    def test_outputs_load(self):
+        db = next(get_db())
+        try:
+            with tempfile.TemporaryDirectory() as tmp:
+                for fmt in ["json", "ndjson"]:
+                    path = os.path.join(tmp, f"data.{fmt}")
+                    main(SCALE + [f"--format={fmt}", f"--out={path}"])
+                    with self.subTest(format=fmt):
+                        reset_db(bind=db.get_bind())
+                        results = bulk_insert_data(path, db.get_bind())
+                        for tablename in TableName:
+                            self.assertEqual(
+                                set(results[tablename]), {StatusCode.SUCCESS}
+                            )
+            main(SCALE + ["--format=db"])
+            self.assertEqual(db.scalar(select(func.count(models.Message.id))), 30)
+        finally:
+            db.close()
@@ -0,0 +1,70 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from app import datasets
+from app.constants import TableName
+
+DATASETS_PATH = os.path.join(os.path.dirname(__file__), "../../app/datasets.json")
+
+
+class TestDatasetReaders(unittest.TestCase):
+
+    def setUp(self):
+        # small reads so values get cut by the buffer end
+        self.read_size = datasets.READ_SIZE
+        datasets.READ_SIZE = 7
+
+    def tearDown(self):
+        datasets.READ_SIZE = self.read_size
+
+    def test_same_as_json_load(self):
+        with open(DATASETS_PATH) as file:
+            expected = [
+                (table, row) for table, rows in json.load(file).items() for row in rows
+            ]
+        with open(DATASETS_PATH) as file:
+            self.assertEqual(list(datasets.iter_json_rows(file)), expected)
+
+    def test_values_cut_by_buffer(self):
+        text = ' { "users" : [ 1234567890123, -1.5e10, "a\\"b,]", true ] , "x": [] } '
+        self.assertEqual(
+            list(datasets.iter_json_rows(io.StringIO(text))),
+            [
+                ("users", 1234567890123),
+                ("users", -1.5e10),
+                ("users", 'a"b,]'),
+                ("users", True),
+            ],
+        )
+
+    def test_malformed(self):
+        for text in ['{"users": [1, 2}', '{"users": [1 2]}', '{"users": 1}', "[]"]:
+            with self.subTest(text=text):
+                with self.assertRaises(json.JSONDecodeError):
+                    list(datasets.iter_json_rows(io.StringIO(text)))
+
+    def test_read_dataset_chunks(self):
+        lines = [
+            {"table": "users", "row": {"id": 1}},
+            {"table": "users", "row": {"id": 2}},
+            {"table": "users", "row": {"id": 3}},
+            {"table": "unknown", "row": {"id": 1}},
+            {"table": "tickets", "row": {"id": 1}},
+        ]
+        with tempfile.NamedTemporaryFile("w", suffix=".ndjson", delete=False) as file:
+            file.write("\n".join(json.dumps(line) for line in lines) + "\n\n")
+        try:
+            chunks = list(datasets.read_dataset(file.name, chunk_size=2))
+        finally:
+            os.remove(file.name)
+        self.assertEqual(
+            chunks,
+            [
+                (TableName.USERS, [{"id": 1}, {"id": 2}]),
+                (TableName.USERS, [{"id": 3}]),
+                (TableName.TICKETS, [{"id": 1}]),
+            ],
+        )
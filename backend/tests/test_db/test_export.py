@@ -0,0 +1,82 @@
+import csv
+import io
+import os
+import tempfile
+import unittest
+
+import orjson
+from app import crud, schemas
+from app.constants import TicketStatus
+from app.datagen import Generator, write_db
+from app.db import get_db
+from app.export import export_csv, export_ndjson, export_watermark
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        write_db(Generator(0, users=10, tickets=30, attachments=20, messages=90))
+        self.db = next(get_db())
+
+    def tearDown(self):
+        self.db.close()
+
+    def ndjson(self, **kwargs):
+        out = io.BytesIO()
+        exported = export_ndjson(self.db, out, yield_per=7, **kwargs)
+        lines = [orjson.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(exported, len(lines))
+        return lines
+
+    def csv_rows(self, **kwargs):
+        with tempfile.TemporaryDirectory() as tmp:
+            exported = export_csv(self.db, tmp, yield_per=7, **kwargs)
+            rows = {}
+            for name in exported:
+                with open(os.path.join(tmp, f"{name}.csv"), newline="") as file:
+                    rows[name] = list(csv.DictReader(file))
+                self.assertEqual(exported[name], len(rows[name]))
+        return rows
+
+    def test_full_export(self):
+        tickets = self.ndjson()
+        self.assertEqual([ticket["id"] for ticket in tickets], list(range(1, 31)))
+        self.assertEqual(sum(len(t["attachments"]) for t in tickets), 20)
+        self.assertEqual(sum(len(t["messages"]) for t in tickets), 90)
+        for ticket in tickets:
+            for message in ticket["messages"]:
+                self.assertEqual(message["ticket_id"], ticket["id"])
+
+        rows = self.csv_rows()
+        self.assertEqual(
+            {name: len(table) for name, table in rows.items()},
+            {"tickets": 30, "attachments": 20, "messages": 90},
+        )
+        statuses = {row["status"] for row in rows["tickets"]}
+        self.assertLessEqual(statuses, {status.value for status in TicketStatus})
+
+    def test_incremental_export(self):
+        # a margin before now: the changes below are after it whatever the
+        # resolution of the database's timestamps
+        watermark = export_watermark(self.db)
+        self.db.rollback()
+        self.assertEqual(self.ndjson(since=watermark), [])
+
+        crud.update_ticket(self.db, 3, schemas.TicketUpdate(title="Changed"))
+        crud.create_message(
+            self.db,
+            schemas.MessageCreate(
+                ticket_id=5, sender_id=1, receiver_id=2, content="new"
+            ),
+        )
+
+        # the changed ticket, and the ticket with a new message in full
+        tickets = self.ndjson(since=watermark)
+        self.assertEqual([ticket["id"] for ticket in tickets], [3, 5])
+        self.assertEqual(tickets[0]["title"], "Changed")
+        self.assertIn("new", [message["content"] for message in tickets[1]["messages"]])
+
+        rows = self.csv_rows(since=watermark)
+        self.assertEqual([row["id"] for row in rows["tickets"]], ["3"])
+        self.assertEqual(rows["attachments"], [])
+        self.assertEqual([row["content"] for row in rows["messages"]], ["new"])
@@ -0,0 +1,53 @@
+import unittest
+
+from alembic import command
+from alembic.autogenerate import compare_metadata
+from alembic.config import Config
+from alembic.migration import MigrationContext
+from alembic.script import ScriptDirectory
+from sqlalchemy import inspect, text
+from app.db import ALEMBIC_INI, engine, reset_db, upgrade_db
+from app.models import Base
+
+
+def alembic_config(connection) -> Config:
+    config = Config(ALEMBIC_INI)
+    config.attributes["connection"] = connection
+    return config
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        reset_db(engine)
+
+    def tearDown(self):
+        reset_db(engine)
+
+    def assertMatchesModels(self):
+        with engine.connect() as connection:
+            context = MigrationContext.configure(connection)
+            self.assertEqual(compare_metadata(context, Base.metadata), [])
+            head = ScriptDirectory.from_config(Config(ALEMBIC_INI)).get_current_head()
+            self.assertEqual(context.get_current_revision(), head)
+
+    def test_head_matches_models(self):
+        self.assertMatchesModels()
+
+    def test_downgrade_and_upgrade(self):
+        with engine.begin() as connection:
+            command.downgrade(alembic_config(connection), "base")
+        self.assertEqual(inspect(engine).get_table_names(), ["alembic_version"])
+        upgrade_db(engine)
+        self.assertMatchesModels()
+
+    def test_database_without_migrations(self):
+        # made by create_all before the migrations: stamped as the baseline first
+        with engine.begin() as connection:
+            command.downgrade(alembic_config(connection), "0001")
+            connection.execute(text("DROP TABLE alembic_version"))
+        indexes = {index["name"] for index in inspect(engine).get_indexes("tickets")}
+        self.assertIn("ix_tickets_assignee_id", indexes)
+        self.assertNotIn("ix_tickets_created_at_id", indexes)
+        upgrade_db(engine)
+        self.assertMatchesModels()
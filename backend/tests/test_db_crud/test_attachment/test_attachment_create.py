@@ -3,17 +3,16 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
 
 
-class TestDBCreateAttachment(unittest.TestCase):
+class TestDBCreateAttachment(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +23,7 @@ class TestDBCreateAttachment(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -58,10 +57,6 @@ class TestDBCreateAttachment(unittest.TestCase):
             "updated_at": datetime.datetime.now().astimezone().isoformat(),
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         invalid_args = ["lksdjfd", None, 4.8]
         attachment_create = schemas.AttachmentCreate.model_validate(
@@ -87,6 +82,56 @@ class TestDBCreateAttachment(unittest.TestCase):
         _, status_code = crud.create_attachment(self.db, attachment_create)
         self.assertEqual(status_code, constants.StatusCode.TICKET_NOT_FOUND)
 
+    def test_one_statement(self):
+        if self.db.get_bind().dialect.name == "sqlite":
+            self.skipTest("sqlite looks the ticket up, its foreign keys are off")
+        test_attachment_dict = self.test_attachment_dict.copy()
+        for ticket_id, expected in [
+            (-100, constants.StatusCode.TICKET_NOT_FOUND),
+            (test_attachment_dict["ticket_id"], constants.StatusCode.SUCCESS),
+        ]:
+            with self.subTest(ticket_id=ticket_id):
+                test_attachment_dict["ticket_id"] = ticket_id
+                attachment_create = schemas.AttachmentCreate.model_validate(
+                    test_attachment_dict
+                )
+                with count_statements(self.db.get_bind()) as statements:
+                    _, status_code = crud.create_attachment(self.db, attachment_create)
+                self.assertEqual(status_code, expected)
+                self.assertEqual(
+                    [statement.split()[0] for statement in statements], ["INSERT"]
+                )
+
+    def test_file_already_exist(self):
+        attachment_create = schemas.AttachmentCreate.model_validate(
+            self.test_attachment_dict
+        )
+        _, status_code = crud.create_attachment(self.db, attachment_create)
+        self.assertEqual(status_code, constants.StatusCode.SUCCESS)
+        result_attachment, status_code = crud.create_attachment(
+            self.db, attachment_create
+        )
+        self.assertIsNone(result_attachment)
+        self.assertEqual(status_code, constants.StatusCode.FILE_ALREADY_EXIST)
+
+        # the same file on another ticket is fine
+        ticket, _ = crud.create_ticket(
+            self.db,
+            schemas.TicketCreate(
+                issuer_id=1,
+                title="Printer jammed",
+                status=constants.TicketStatus.OPEN,
+                description="The printer on the second floor is jammed.",
+            ),
+        )
+        test_attachment_dict = self.test_attachment_dict.copy()
+        test_attachment_dict["ticket_id"] = ticket.id
+        result_attachment, status_code = crud.create_attachment(
+            self.db, schemas.AttachmentCreate.model_validate(test_attachment_dict)
+        )
+        self.assertEqual(status_code, constants.StatusCode.SUCCESS)
+        self.assertEqual(result_attachment.as_dict()["ticket_id"], ticket.id)
+
     def test_with_dates(self):
         attachment_create = schemas.AttachmentCreate.model_validate(
             self.test_attachment_dict
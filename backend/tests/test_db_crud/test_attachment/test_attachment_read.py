@@ -2,18 +2,17 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
 
 
 # read
-class TestDBReadAttachment(unittest.TestCase):
+class TestDBReadAttachment(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +23,7 @@ class TestDBReadAttachment(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -60,10 +59,6 @@ class TestDBReadAttachment(unittest.TestCase):
             schemas.AttachmentCreate.model_validate(self.existing_attachment_dict),
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         if self.existing_attachment is None:
             self.skipTest("existing attachment was not created")
@@ -129,6 +124,17 @@ class TestDBReadAttachment(unittest.TestCase):
             self.existing_attachment_dict["filesize"],
         )
 
+    def test_single_statement(self):
+        if self.existing_attachment is None:
+            self.skipTest("existing attachment was not created")
+        attachment_id = self.existing_attachment.id
+
+        for read_id in [attachment_id, attachment_id + 100]:
+            with self.subTest(read_id=read_id):
+                with count_statements(self.db.get_bind()) as statements:
+                    crud.get_attachment_good(self.db, read_id)
+                self.assertEqual(len(statements), 1)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,79 @@
+import unittest
+
+import pydantic
+from app import crud, schemas, constants
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
+
+
+class TestDBReadManyAttachment(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # sample data
+        create_user(
+            self.db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+        crud.create_ticket(
+            self.db,
+            schemas.TicketCreate.model_validate(
+                {
+                    "issuer_id": 1,
+                    "title": "Computer won't start after power outage",
+                    "status": constants.TicketStatus.OPEN,
+                    "description": "My desktop computer refuses to turn on.",
+                }
+            ),
+        )
+        for filename in ["a.pdf", "b.pdf"]:
+            crud.create_attachment(
+                self.db,
+                schemas.AttachmentCreate.model_validate(
+                    {
+                        "ticket_id": 1,
+                        "filename": filename,
+                        "filetype": "pdf",
+                        "filesize": 1020,
+                    }
+                ),
+            )
+
+    def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_attachments_many(arg, [1])
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_attachments_many(self.db, arg)
+
+    def test_one_statement(self):
+        with count_statements(self.db.get_bind()) as statements:
+            results = crud.get_attachments_many(self.db, [2, 100, 1])
+        self.assertEqual(len(statements), 1)
+
+        self.assertEqual(
+            [status_code for _, status_code in results],
+            [
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.FILE_NOT_FOUND,
+                constants.StatusCode.SUCCESS,
+            ],
+        )
+        self.assertEqual(
+            [(out.filename, out.ticket.id) for out, _ in results if out],
+            [("b.pdf", 1), ("a.pdf", 1)],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
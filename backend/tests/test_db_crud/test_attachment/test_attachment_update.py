@@ -2,17 +2,15 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
-class TestDBUpdateUser(unittest.TestCase):
+class TestDBUpdateUser(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -23,7 +21,7 @@ class TestDBUpdateUser(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -66,10 +64,6 @@ class TestDBUpdateUser(unittest.TestCase):
             "filesize": 1020,
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         if self.existing_attachment is None:
             self.skipTest("existing attachment was not created")
@@ -118,6 +112,22 @@ class TestDBUpdateUser(unittest.TestCase):
         _, status_code = crud.update_attachment(self.db, test_id, attachment_update)
         self.assertEqual(status_code, constants.StatusCode.TICKET_NOT_FOUND)
 
+    def test_file_already_exist(self):
+        if self.existing_attachment is None:
+            self.skipTest("existing attachment was not created")
+
+        test_attachment, _ = crud.create_attachment(
+            self.db, schemas.AttachmentCreate.model_validate(self.test_attachment_dict)
+        )
+        attachment_update = schemas.AttachmentUpdate(filename="myfile.pdf")
+        result_attachment, status_code = crud.update_attachment(
+            self.db, test_attachment.id, attachment_update
+        )
+        self.assertIsNone(result_attachment)
+        self.assertEqual(status_code, constants.StatusCode.FILE_ALREADY_EXIST)
+        attachment_out, _ = crud.get_attachment_good(self.db, test_attachment.id)
+        self.assertEqual(attachment_out.filename, "myfile2.pdf")
+
     def test_optional_field_on_attachment_update_basemodel(self):
         if self.existing_attachment is None:
             self.skipTest("existing attachment was not created")
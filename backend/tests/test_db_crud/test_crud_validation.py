@@ -0,0 +1,60 @@
+import unittest
+
+import pydantic
+from app import crud
+
+
+def make_pair(mode: str):
+    def inner(value: int) -> int:
+        return value
+
+    inner = crud.validated(inner, mode)
+
+    def outer(value: int, inner_value) -> int:
+        return inner(inner_value)
+
+    return crud.validated(outer, mode), inner
+
+
+class TestCrudValidation(unittest.TestCase):
+
+    def test_boundary_validates_outer_call(self):
+        outer, inner = make_pair("boundary")
+        with self.assertRaises(pydantic.ValidationError):
+            outer("lksdjfd", 1)
+        with self.assertRaises(pydantic.ValidationError):
+            inner("lksdjfd")
+
+    def test_boundary_trusts_nested_call(self):
+        outer, _ = make_pair("boundary")
+        # not coerced to int because the nested call is not validated
+        self.assertEqual(outer(1, "2"), "2")
+
+    def test_strict_validates_nested_call(self):
+        outer, _ = make_pair("strict")
+        self.assertEqual(outer(1, "2"), 2)
+        with self.assertRaises(pydantic.ValidationError):
+            outer(1, "lksdjfd")
+
+    def test_flag_reset_after_error(self):
+        _, inner = make_pair("boundary")
+
+        def failing(value: int) -> int:
+            raise RuntimeError("failed partway")
+
+        failing = crud.validated(failing, "boundary")
+
+        def outer(value: int) -> int:
+            inner(value)
+            return failing(value)
+
+        outer = crud.validated(outer, "boundary")
+        with self.assertRaises(RuntimeError):
+            outer(1)
+        # a new top-level call is validated again
+        with self.assertRaises(pydantic.ValidationError):
+            inner("lksdjfd")
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -3,17 +3,15 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
-class TestDBCreateMessage(unittest.TestCase):
+class TestDBCreateMessage(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +22,7 @@ class TestDBCreateMessage(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -58,10 +56,6 @@ class TestDBCreateMessage(unittest.TestCase):
             "edited_at": datetime.datetime.now().astimezone().isoformat(),
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         invalid_args = ["lksdjfd", None, 4.8]
         message_create = schemas.MessageCreate.model_validate(self.test_message_dict)
@@ -2,18 +2,16 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
 # delete
-class TestDBDeleteMessage(unittest.TestCase):
+class TestDBDeleteMessage(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +22,7 @@ class TestDBDeleteMessage(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -60,10 +58,6 @@ class TestDBDeleteMessage(unittest.TestCase):
             schemas.MessageCreate.model_validate(self.existing_message_dict),
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         print(self.existing_message)
         if self.existing_message is None:
@@ -2,18 +2,17 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
 
 
 # read
-class TestDBReadMessage(unittest.TestCase):
+class TestDBReadMessage(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +23,7 @@ class TestDBReadMessage(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -60,10 +59,6 @@ class TestDBReadMessage(unittest.TestCase):
             schemas.MessageCreate.model_validate(self.existing_message_dict),
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         if self.existing_message is None:
             self.skipTest("existing message was not created")
@@ -122,6 +117,17 @@ class TestDBReadMessage(unittest.TestCase):
             result_message_dict["content"], self.existing_message_dict["content"]
         )
 
+    def test_single_statement(self):
+        if self.existing_message is None:
+            self.skipTest("existing message was not created")
+        message_id = self.existing_message.id
+
+        for read_id in [message_id, message_id + 100]:
+            with self.subTest(read_id=read_id):
+                with count_statements(self.db.get_bind()) as statements:
+                    crud.get_message_good(self.db, read_id)
+                self.assertEqual(len(statements), 1)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,90 @@
+import unittest
+
+import pydantic
+from app import crud, schemas, constants
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
+
+
+class TestDBReadManyMessage(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # sample data
+        roles = [constants.UserRole.CLIENT, constants.UserRole.SUPPORT]
+        for i, role in enumerate(roles):
+            create_user(
+                self.db,
+                schemas.UserCreate.model_validate(
+                    {
+                        "username": f"user{i + 1}",
+                        "email": f"user{i + 1}@gmail.com",
+                        "password": "123",
+                        "role": role,
+                    }
+                ),
+            )
+        crud.create_ticket(
+            self.db,
+            schemas.TicketCreate.model_validate(
+                {
+                    "issuer_id": 1,
+                    "assignee_id": 2,
+                    "title": "Computer won't start after power outage",
+                    "status": constants.TicketStatus.OPEN,
+                    "description": "My desktop computer refuses to turn on.",
+                }
+            ),
+        )
+        for sender_id, receiver_id in [(1, 2), (2, 1)]:
+            crud.create_message(
+                self.db,
+                schemas.MessageCreate.model_validate(
+                    {
+                        "ticket_id": 1,
+                        "sender_id": sender_id,
+                        "receiver_id": receiver_id,
+                        "content": f"from user{sender_id}",
+                    }
+                ),
+            )
+
+    def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_messages_many(arg, [1])
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_messages_many(self.db, arg)
+
+    def test_one_statement(self):
+        with count_statements(self.db.get_bind()) as statements:
+            results = crud.get_messages_many(self.db, [1, 2, 100])
+        self.assertEqual(len(statements), 1)
+
+        self.assertEqual(
+            [status_code for _, status_code in results],
+            [
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.MESSAGE_NOT_FOUND,
+            ],
+        )
+        first, second, _ = [message for message, _ in results]
+        if first is None or second is None:
+            self.fail("read messages failed")
+        self.assertEqual(first.sender.username, "user1")
+        self.assertEqual(first.receiver.username, "user2")
+        self.assertEqual(second.sender.username, "user2")
+        self.assertEqual(second.ticket.id, 1)
+
+    def test_matches_single_read(self):
+        message_out, _ = crud.get_message_good(self.db, 1)
+        results = crud.get_messages_many(self.db, [1])
+        self.assertEqual(results, [(message_out, constants.StatusCode.SUCCESS)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -2,17 +2,15 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
-class TestDBUpdateUser(unittest.TestCase):
+class TestDBUpdateUser(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -23,7 +21,7 @@ class TestDBUpdateUser(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -66,10 +64,6 @@ class TestDBUpdateUser(unittest.TestCase):
             "content": "yoww, wassup",
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         if self.existing_message is None:
             self.skipTest("existing message was not created")
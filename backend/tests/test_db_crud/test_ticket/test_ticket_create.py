@@ -3,17 +3,15 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
-class TestDBCreateTicket(unittest.TestCase):
+class TestDBCreateTicket(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +22,7 @@ class TestDBCreateTicket(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -47,10 +45,6 @@ class TestDBCreateTicket(unittest.TestCase):
             "updated_at": datetime.datetime.now().astimezone().isoformat(),
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         invalid_args = ["lksdjfd", None, 4.8]
         ticket_create = schemas.TicketCreate.model_validate(self.test_ticket_dict)
@@ -2,18 +2,16 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
 # read
-class TestDBDeleteTicket(unittest.TestCase):
+class TestDBDeleteTicket(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +22,7 @@ class TestDBDeleteTicket(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -49,10 +47,6 @@ class TestDBDeleteTicket(unittest.TestCase):
             schemas.TicketCreate.model_validate(self.existing_ticket_dict),
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         print(self.existing_ticket)
         if self.existing_ticket is None:
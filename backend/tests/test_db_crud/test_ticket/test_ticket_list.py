@@ -0,0 +1,120 @@
+import datetime
+import unittest
+
+import pydantic
+from app import crud, schemas, constants
+from tests.fixtures import RollbackTestCase, create_user
+
+
+class TestDBListTicket(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # sample data
+        create_user(
+            self.db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+        create_user(
+            self.db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user2",
+                    "email": "user2@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.SUPPORT,
+                }
+            ),
+        )
+        self.start = datetime.datetime(2024, 1, 1, tzinfo=datetime.timezone.utc)
+        statuses = [constants.TicketStatus.OPEN, constants.TicketStatus.CLOSED]
+        self.ticket_count = 7
+        for i in range(self.ticket_count):
+            crud.create_ticket(
+                self.db,
+                schemas.TicketCreate.model_validate(
+                    {
+                        "issuer_id": 1,
+                        "assignee_id": 2 if i % 2 else None,
+                        "title": f"ticket {i}",
+                        "status": statuses[i % 2],
+                        "description": "description",
+                        # two tickets share each timestamp to exercise the id tiebreak
+                        "created_at": self.start + datetime.timedelta(days=i // 2),
+                    }
+                ),
+            )
+
+    def list_all(self, **query_args) -> list[schemas.TicketOut]:
+        items = []
+        cursor = None
+        while True:
+            query = schemas.TicketQuery(limit=3, cursor=cursor, **query_args)
+            page, status_code = crud.list_tickets(self.db, query)
+            if page is None:
+                self.fail(f"listing failed with {status_code}")
+            self.assertLessEqual(len(page.items), 3)
+            items.extend(page.items)
+            if page.next_cursor is None:
+                return items
+            cursor = page.next_cursor
+
+    def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.list_tickets(arg, schemas.TicketQuery())
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.list_tickets(self.db, arg)
+
+    def test_descending_pages(self):
+        items = self.list_all()
+        keys = [(item.created_at, item.id) for item in items]
+        self.assertEqual(len(items), self.ticket_count)
+        self.assertEqual(keys, sorted(keys, reverse=True))
+
+    def test_ascending_pages(self):
+        items = self.list_all(sort=constants.TicketSort.CREATED_AT_ASC)
+        keys = [(item.created_at, item.id) for item in items]
+        self.assertEqual(len(items), self.ticket_count)
+        self.assertEqual(keys, sorted(keys))
+
+    def test_users_resolved(self):
+        for item in self.list_all():
+            self.assertEqual(item.issuer.username, "user1")
+            if item.assignee is not None:
+                self.assertEqual(item.assignee.username, "user2")
+
+    def test_filters(self):
+        closed = self.list_all(status=constants.TicketStatus.CLOSED)
+        self.assertEqual(len(closed), 3)
+        assigned = self.list_all(assignee_id=2)
+        self.assertEqual([item.assignee.id for item in assigned], [2, 2, 2])
+        in_range = self.list_all(
+            created_after=self.start + datetime.timedelta(days=1),
+            created_before=self.start + datetime.timedelta(days=3),
+        )
+        self.assertEqual(len(in_range), 4)
+        active = self.list_all(active=True)
+        self.assertEqual(
+            [item.status for item in active], [constants.TicketStatus.OPEN] * 4
+        )
+
+    def test_invalid_cursor(self):
+        query = schemas.TicketQuery(cursor="not a cursor")
+        result, status_code = crud.list_tickets(self.db, query)
+        self.assertIsNone(result)
+        self.assertEqual(status_code, constants.StatusCode.INVALID_CURSOR)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -2,18 +2,17 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
 
 
 # read
-class TestDBReadTicket(unittest.TestCase):
+class TestDBReadTicket(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         # sample data
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -24,7 +23,7 @@ class TestDBReadTicket(unittest.TestCase):
                 }
             ),
         )
-        crud.create_user(
+        create_user(
             self.db,
             schemas.UserCreate.model_validate(
                 {
@@ -49,10 +48,6 @@ class TestDBReadTicket(unittest.TestCase):
             schemas.TicketCreate.model_validate(self.existing_ticket_dict),
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         if self.existing_ticket is None:
             self.skipTest("existing ticket was not created")
@@ -118,6 +113,17 @@ class TestDBReadTicket(unittest.TestCase):
             result_ticket_dict["description"], self.existing_ticket_dict["description"]
         )
 
+    def test_single_statement(self):
+        if self.existing_ticket is None:
+            self.skipTest("existing ticket was not created")
+        ticket_id = self.existing_ticket.id
+
+        for read_id in [ticket_id, ticket_id + 100]:
+            with self.subTest(read_id=read_id):
+                with count_statements(self.db.get_bind()) as statements:
+                    crud.get_ticket_good(self.db, read_id)
+                self.assertEqual(len(statements), 1)
+
 
 if __name__ == "__main__":
     unittest.main(verbosity=2)
@@ -0,0 +1,80 @@
+import unittest
+
+import pydantic
+from app import crud, schemas, constants
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
+
+
+class TestDBReadManyTicket(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        # sample data
+        roles = [constants.UserRole.CLIENT, constants.UserRole.SUPPORT]
+        for i, role in enumerate(roles):
+            create_user(
+                self.db,
+                schemas.UserCreate.model_validate(
+                    {
+                        "username": f"user{i + 1}",
+                        "email": f"user{i + 1}@gmail.com",
+                        "password": "123",
+                        "role": role,
+                    }
+                ),
+            )
+        for assignee_id in [None, 2]:
+            crud.create_ticket(
+                self.db,
+                schemas.TicketCreate.model_validate(
+                    {
+                        "issuer_id": 1,
+                        "assignee_id": assignee_id,
+                        "title": f"assigned to {assignee_id}",
+                        "status": constants.TicketStatus.OPEN,
+                        "description": "description",
+                    }
+                ),
+            )
+
+    def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_tickets_many(arg, [1])
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_tickets_many(self.db, arg)
+
+    def test_one_statement(self):
+        with count_statements(self.db.get_bind()) as statements:
+            results = crud.get_tickets_many(self.db, [2, 100, 1, 2])
+        self.assertEqual(len(statements), 1)
+
+        statuses = [status_code for _, status_code in results]
+        self.assertEqual(
+            statuses,
+            [
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.TICKET_NOT_FOUND,
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.SUCCESS,
+            ],
+        )
+        assigned, _, unassigned, _ = [ticket for ticket, _ in results]
+        if assigned is None or unassigned is None:
+            self.fail("read tickets failed")
+        self.assertEqual(assigned.issuer.username, "user1")
+        self.assertEqual(assigned.assignee.username, "user2")
+        self.assertIsNone(unassigned.assignee)
+
+    def test_matches_single_read(self):
+        ticket_out, _ = crud.get_ticket_good(self.db, 2)
+        results = crud.get_tickets_many(self.db, [2])
+        self.assertEqual(results, [(ticket_out, constants.StatusCode.SUCCESS)])
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
@@ -3,15 +3,13 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase
 
 
-class TestDBCreateUser(unittest.TestCase):
+class TestDBCreateUser(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         self.test_user_dict = {
             "username": "old",
             "email": "old@gmail.com",
@@ -21,10 +19,6 @@ class TestDBCreateUser(unittest.TestCase):
             "updated_at": datetime.datetime.now().astimezone().isoformat(),
         }
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         invalid_args = ["lksdjfd", None, 4.8]
         user_create = schemas.UserCreate.model_validate(self.test_user_dict)
@@ -63,6 +57,26 @@ class TestDBCreateUser(unittest.TestCase):
         self.assertIsNone(result_user)
         self.assertEqual(status_code, constants.StatusCode.EMAIL_ALREADY_EXIST)
 
+    def test_existing_in_another_case(self):
+        user_create = schemas.UserCreate.model_validate(self.test_user_dict)
+        existing_user, _ = crud.create_user(self.db, user_create)
+        if existing_user is None:
+            self.skipTest("dummy user not created")
+        # username
+        user_create = schemas.UserCreate.model_validate(self.test_user_dict)
+        user_create.username = "OLD"
+        user_create.email = "new@gmail.com"
+        _, status_code = crud.create_user(self.db, user_create)
+        self.assertEqual(status_code, constants.StatusCode.UNAME_ALREADY_EXIST)
+        # email
+        user_create.username = "new"
+        user_create.email = "Old@Gmail.com"
+        _, status_code = crud.create_user(self.db, user_create)
+        self.assertEqual(status_code, constants.StatusCode.EMAIL_ALREADY_EXIST)
+        # and the stored case still logs in
+        user = crud.authenticate_user(self.db, "Old", self.test_user_dict["password"])
+        self.assertEqual(user.id, existing_user.id)
+
     def test_with_dates(self):
         user_create = schemas.UserCreate.model_validate(self.test_user_dict)
         result_user, _ = crud.create_user(self.db, user_create)
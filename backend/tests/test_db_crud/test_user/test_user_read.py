@@ -2,16 +2,14 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
 # read
-class TestDBReadUser(unittest.TestCase):
+class TestDBReadUser(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         self.test_user_dict = {
             "username": "new",
             "email": "new@gmail.com",
@@ -24,14 +22,10 @@ class TestDBReadUser(unittest.TestCase):
             "password": "123",
             "role": constants.UserRole.CLIENT,
         }
-        self.existing_user, _ = crud.create_user(
+        self.existing_user = create_user(
             self.db, schemas.UserCreate.model_validate(self.existing_user_dict)
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_id(self):
         if self.existing_user is None:
             self.skipTest("existing user was not created")
@@ -0,0 +1,63 @@
+import unittest
+
+import pydantic
+from app import crud, schemas, constants
+from tests.fixtures import RollbackTestCase, create_user
+from tests.query_counter import count_statements
+
+
+class TestDBReadManyUser(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        for i in range(3):
+            create_user(
+                self.db,
+                schemas.UserCreate.model_validate(
+                    {
+                        "username": f"user{i}",
+                        "email": f"user{i}@gmail.com",
+                        "password": "123",
+                        "role": constants.UserRole.CLIENT,
+                    }
+                ),
+            )
+
+    def test_invalid_arg(self):
+        invalid_args = ["lksdjfd", None, 4.8]
+        for arg in invalid_args:
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_users_many(arg, [1])
+            with self.subTest(arg=arg):
+                with self.assertRaises(pydantic.ValidationError):
+                    crud.get_users_many(self.db, arg)
+
+    def test_one_statement(self):
+        with count_statements(self.db.get_bind()) as statements:
+            results = crud.get_users_many(self.db, [3, 1, 100, 2])
+        self.assertEqual(len(statements), 1)
+
+        self.assertEqual(
+            [status_code for _, status_code in results],
+            [
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.SUCCESS,
+                constants.StatusCode.USER_NOT_FOUND,
+                constants.StatusCode.SUCCESS,
+            ],
+        )
+        self.assertEqual(
+            [user.username for user, _ in results if user],
+            ["user2", "user0", "user1"],
+        )
+
+    def test_empty_ids(self):
+        with count_statements(self.db.get_bind()) as statements:
+            results = crud.get_users_many(self.db, [])
+        self.assertEqual(results, [])
+        self.assertEqual(len(statements), 0)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)
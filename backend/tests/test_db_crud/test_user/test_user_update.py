@@ -2,15 +2,13 @@ import unittest
 
 import pydantic
 from app import crud, schemas, constants
-from app.db import get_db, reset_db
+from tests.fixtures import RollbackTestCase, create_user
 
 
-class TestDBUpdateUser(unittest.TestCase):
+class TestDBUpdateUser(RollbackTestCase):
 
     def setUp(self):
-        self.db = next(get_db())
-        # reset db
-        reset_db(bind=self.db.get_bind())
+        super().setUp()
         self.test_user_dict = {
             "username": "new",
             "email": "new@gmail.com",
@@ -23,14 +21,10 @@ class TestDBUpdateUser(unittest.TestCase):
             "password": "123",
             "role": constants.UserRole.CLIENT,
         }
-        self.existing_user, _ = crud.create_user(
+        self.existing_user = create_user(
             self.db, schemas.UserCreate.model_validate(self.existing_user_dict)
         )
 
-    def tearDown(self):
-        # just to make sure
-        self.db.close()  # not necessary since get_db closes it on success/fail
-
     def test_invalid_arg(self):
         if self.existing_user is None:
             self.skipTest("existing user was not created")
@@ -55,24 +49,42 @@ class TestDBUpdateUser(unittest.TestCase):
     def test_existing_username(self):
         if self.existing_user is None:
             self.skipTest("existing user was not created")
-        user_id = self.existing_user.id
-        user_update = schemas.UserUpdate.model_validate(self.test_user_dict)
-        user_update.username = "old"
+        test_user, _ = crud.create_user(
+            self.db, schemas.UserCreate.model_validate(self.test_user_dict)
+        )
+        user_update = schemas.UserUpdate(username="OLD")
 
-        result_user, status_code = crud.update_user(self.db, user_id, user_update)
-        self.assertIsNone(result_user, "user w/ existing username was created")
+        result_user, status_code = crud.update_user(
+            self.db, test_user.id, user_update
+        )
+        self.assertIsNone(result_user, "user w/ existing username was updated")
         self.assertEqual(status_code, constants.StatusCode.UNAME_ALREADY_EXIST)
 
     def test_existing_email(self):
+        if self.existing_user is None:
+            self.skipTest("existing user was not created")
+        test_user, _ = crud.create_user(
+            self.db, schemas.UserCreate.model_validate(self.test_user_dict)
+        )
+        user_update = schemas.UserUpdate(email="old@gmail.com")
+
+        result_user, status_code = crud.update_user(
+            self.db, test_user.id, user_update
+        )
+        self.assertIsNone(result_user, "user w/ existing email was updated")
+        self.assertEqual(status_code, constants.StatusCode.EMAIL_ALREADY_EXIST)
+
+    def test_own_username_and_email(self):
         if self.existing_user is None:
             self.skipTest("existing user was not created")
         user_id = self.existing_user.id
-        user_update = schemas.UserUpdate.model_validate(self.test_user_dict)
-        user_update.email = "old@gmail.com"
+        user_update = schemas.UserUpdate(
+            username="old", email="old@gmail.com", role=constants.UserRole.SUPPORT
+        )
 
         result_user, status_code = crud.update_user(self.db, user_id, user_update)
-        self.assertIsNone(result_user, "user w/ existing email was created")
-        self.assertEqual(status_code, constants.StatusCode.EMAIL_ALREADY_EXIST)
+        self.assertEqual(status_code, constants.StatusCode.SUCCESS)
+        self.assertEqual(result_user.as_dict()["role"], constants.UserRole.SUPPORT)
 
     def test_optional_field_on_user_update_basemodel(self):
         if self.existing_user is None:
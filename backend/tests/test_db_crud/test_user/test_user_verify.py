@@ -0,0 +1,45 @@
+from sqlalchemy import select
+from app import crud, models, schemas, constants, security
+from app.config import BCRYPT_ROUNDS
+from tests.fixtures import RollbackTestCase, create_user
+
+
+class TestDBVerifyUser(RollbackTestCase):
+
+    def setUp(self):
+        super().setUp()
+        create_user(
+            self.db,
+            schemas.UserCreate.model_validate(
+                {
+                    "username": "user1",
+                    "email": "user1@gmail.com",
+                    "password": "123",
+                    "role": constants.UserRole.CLIENT,
+                }
+            ),
+        )
+
+    def stored_hash(self) -> str:
+        return self.db.scalar(
+            select(models.User.hashed_password).where(models.User.id == 1)
+        )
+
+    def test_verify(self):
+        self.assertTrue(crud.verify_user_account(self.db, "user1", "123"))
+        self.assertFalse(crud.verify_user_account(self.db, "user1", "1234"))
+        self.assertFalse(crud.verify_user_account(self.db, "user2", "123"))
+        self.assertEqual(security.hash_rounds(self.stored_hash()), BCRYPT_ROUNDS)
+
+    def test_rehash_outdated_cost(self):
+        user = self.db.get(models.User, 1)
+        user.hashed_password = security.hash_password("123", rounds=4)
+        self.db.commit()
+
+        # a failed login leaves the hash alone
+        self.assertFalse(crud.verify_user_account(self.db, "user1", "1234"))
+        self.assertEqual(security.hash_rounds(self.stored_hash()), 4)
+
+        self.assertTrue(crud.verify_user_account(self.db, "user1", "123"))
+        self.assertEqual(security.hash_rounds(self.stored_hash()), BCRYPT_ROUNDS)
+        self.assertTrue(security.verify_password("123", self.stored_hash()))
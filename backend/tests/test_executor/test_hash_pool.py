@@ -0,0 +1,28 @@
+import asyncio
+import unittest
+
+from app import executor, security
+
+
+class TestHashPool(unittest.IsolatedAsyncioTestCase):
+
+    async def asyncTearDown(self):
+        executor.shutdown_executors()
+
+    async def test_hash_and_verify(self):
+        hashed = await executor.run_hash(security.hash_password, "secret")
+        results = await asyncio.gather(
+            executor.run_hash(security.verify_password, "secret", hashed),
+            executor.run_hash(security.verify_password, "wrong", hashed),
+        )
+        self.assertEqual(results, [True, False])
+
+    async def test_status(self):
+        before = executor.hash_pool_status()["completed"]
+        await asyncio.gather(
+            *(executor.run_hash(security.hash_password, "pw") for _ in range(4))
+        )
+        status = executor.hash_pool_status()
+        self.assertEqual(status["completed"], before + 4)
+        self.assertEqual(status["in_flight"], 0)
+        self.assertEqual(status["waiting"], 0)
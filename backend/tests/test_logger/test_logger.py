@@ -0,0 +1,77 @@
+import json
+import logging
+import unittest
+
+from app import config, logger, schemas
+
+
+class ListHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records: list[logging.LogRecord] = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+class TestLogResponse(unittest.TestCase):
+
+    def setUp(self):
+        self.route = "test_route"
+        self.route_logger = logger.route_logger(self.route)
+        self.handler = ListHandler()
+        self.route_logger.addHandler(self.handler)
+
+    def tearDown(self):
+        self.route_logger.removeHandler(self.handler)
+        self.route_logger.setLevel(logging.NOTSET)
+
+    def test_disabled_route_logs_nothing(self):
+        self.route_logger.setLevel(logging.INFO)
+        logger.log_response(self.route, {"status_code": 0})
+        self.assertEqual(self.handler.records, [])
+
+    def test_enabled_route_keeps_payload(self):
+        self.route_logger.setLevel(logging.DEBUG)
+        payload = schemas.UserRef(id=1, username="user1")
+        logger.log_response(self.route, payload)
+        self.assertEqual(len(self.handler.records), 1)
+        self.assertIs(self.handler.records[0].payload, payload)
+
+    def test_route_levels_spec(self):
+        spec = "get_ticket_good=debug, verify_user=WARNING,x"
+        levels = logger._parse_route_levels(spec)
+        self.assertEqual(
+            levels, {"get_ticket_good": "DEBUG", "verify_user": "WARNING"}
+        )
+
+
+class TestJSONFormatter(unittest.TestCase):
+
+    def make_record(self, payload) -> logging.LogRecord:
+        record = logging.LogRecord(
+            "app.api.x", logging.DEBUG, "", 0, "response", (), None
+        )
+        record.fields = {"route": "x"}
+        record.payload = payload
+        return record
+
+    def test_structured_entry(self):
+        entry = json.loads(
+            logger.JSONFormatter().format(
+                self.make_record(schemas.UserRef(id=1, username="user1"))
+            )
+        )
+        self.assertEqual(entry["level"], "DEBUG")
+        self.assertEqual(entry["route"], "x")
+        self.assertEqual(entry["payload"], {"id": 1, "username": "user1"})
+
+    def test_truncated_payload(self):
+        payload = {"content": "a" * (config.LOG_PAYLOAD_MAX_CHARS * 2)}
+        entry = json.loads(logger.JSONFormatter().format(self.make_record(payload)))
+        self.assertIsInstance(entry["payload"], str)
+        self.assertLess(len(entry["payload"]), config.LOG_PAYLOAD_MAX_CHARS + 50)
+
+
+if __name__ == "__main__":
+    unittest.main(verbosity=2)